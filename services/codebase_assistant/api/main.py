@@ -1,8 +1,8 @@
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import os
 
-from services.codebase_assistant.llm.llm_service import LLMService
+from services.codebase_assistant.llm.llm_service import LLMService, MAX_BATCH_ITEMS, MAX_BATCH_CONCURRENCY
 from services.codebase_assistant.ingestion.ingest import ingest_github
 from services.codebase_assistant.vectorstore.chroma_store import ChromaStore
 from fastapi.responses import HTMLResponse
@@ -18,7 +18,13 @@ app = FastAPI(
 
 
 # Initialize services once (singleton)
-llm_service = LLMService()
+# RERANK_ENABLED=1 turns on the cross-encoder rerank stage
+# GRAPH_EXPAND_MODE=ppr ranks graph neighbours by personalized PageRank
+llm_service = LLMService(
+    rerank=os.getenv("RERANK_ENABLED") == "1",
+    rerank_budget_ms=float(os.getenv("RERANK_BUDGET_MS", "300")),
+    expand_mode=os.getenv("GRAPH_EXPAND_MODE", "bfs")
+)
 
 vector_store = ChromaStore()
 
@@ -39,8 +45,28 @@ class AnswerResponse(BaseModel):
     answer: str
 
 
+class BatchQuestionRequest(BaseModel):
+    items: list[QuestionRequest] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+    max_concurrency: int = Field(8, ge=1, le=MAX_BATCH_CONCURRENCY)
+
+
+class BatchAnswerItem(BaseModel):
+    repo_name: str
+    question: str
+    answer: str | None = None
+    error: str | None = None
+
+
+class BatchAnswerResponse(BaseModel):
+    results: list[BatchAnswerItem]
+    count: int
+    failed: int
+
+
 class GitHubIngestRequest(BaseModel):
     github_url: str
+    incremental: bool = False
+    ref: str | None = None
 
 
 class IngestResponse(BaseModel):
@@ -80,14 +106,18 @@ def ingest_github_repo(request: GitHubIngestRequest):
         print(f"\nIngesting GitHub repo: {repo_name}")
         print(f"URL: {github_url}")
 
-        chunks = ingest_github(github_url)
+        total_chunks = ingest_github(
+            github_url,
+            incremental=request.incremental,
+            ref=request.ref
+        )
 
-        print(f"Chunks ingested: {len(chunks)}")
+        print(f"Chunks ingested: {total_chunks}")
 
         return IngestResponse(
             status="success",
             repo_name=repo_name,
-            chunks_ingested=len(chunks),
+            chunks_ingested=total_chunks,
             message=f"Repository '{repo_name}' ingested successfully"
         )
 
@@ -133,6 +163,47 @@ def ask_question(request: QuestionRequest):
             status_code=500,
             detail=str(e)
         )
+
+
+# =====================================
+# BATCH QUESTIONS (MULTI-REPO)
+# =====================================
+
+@app.post("/ask/batch", response_model=BatchAnswerResponse)
+def ask_batch(request: BatchQuestionRequest):
+
+    try:
+
+        items = [
+            {
+                "repo_name": item.repo_name.strip(),
+                "question": item.question.strip()
+            }
+            for item in request.items
+        ]
+
+        # Per-item failures come back in the results, not as a 500
+        results = llm_service.ask_batch(
+            items,
+            max_concurrency=request.max_concurrency
+        )
+
+        return BatchAnswerResponse(
+            results=[BatchAnswerItem(**result) for result in results],
+            count=len(results),
+            failed=sum(1 for result in results if result["error"])
+        )
+
+    except Exception as e:
+
+        print(f"ERROR during batch question answering: {str(e)}")
+
+        raise HTTPException(
+            status_code=500,
+            detail=str(e)
+        )
+
+
 # =====================================
 # LIST ALL INGESTED REPOS
 # =====================================
@@ -144,7 +215,8 @@ def list_repos():
 
         print("\nFetching list of repos from vector DB...")
 
-        results = vector_store.collection.get()
+        # Metadata only; documents and embeddings never leave Chroma
+        results = vector_store.collection.get(include=["metadatas"])
 
         metadatas = results.get("metadatas", [])
 
@@ -173,6 +245,26 @@ def list_repos():
             status_code=500,
             detail=str(e)
         )
+
+
+# =====================================
+# CACHE STATS
+# =====================================
+
+@app.get("/cache/stats")
+def cache_stats():
+
+    # Hit rate and estimated memory of the query-side caches
+    return llm_service.retriever.cache_stats()
+
+
+@app.get("/stats/timings")
+def timing_stats():
+
+    # Per-stage latency of /ask, incl. time saved by speculative retrieval
+    return llm_service.timing_stats.stats()
+
+
 @app.get("/", response_class=HTMLResponse)
 def ui():
 
@@ -1,18 +1,67 @@
-import re
-import json
-import os
+import time
 from typing import List, Dict
 
+from services.codebase_assistant.graph.graph_store import GraphStore
+from services.codebase_assistant.graph.python_symbols import PythonSymbolExtractor, module_name
+from services.codebase_assistant.graph.symbol_state import SymbolState
+
+
+# Chunk types that correspond to one class / function definition
+DEFINITION_CHUNK_TYPES = ("class", "function", "api")
+
+# How far self.attr types and base classes are followed
+MAX_RESOLVE_DEPTH = 5
+
 
 class DependencyExtractor:
+    """
+    Import-aware dependency graph over one repo's chunks.
+
+    Every Python file is parsed once, by the extraction worker that
+    chunks it, into its imports, definitions and references
+    (PythonSymbolExtractor); add_file() takes them off the file chunk.
+    Records and the repo symbol table (pkg.module.Class.method -> chunk
+    id) live in SymbolState, and each reference is resolved through the
+    file's imports, module-level names, self.<attr> types and base
+    classes.
 
-    def __init__(self, output_path="data/graph/graph.json"):
+    A full build resolves every file and writes a fresh CSR graph. An
+    incremental run opens the stored graph once, re-resolves only the
+    changed files and the files that import them or point into them,
+    and patches the graph overlay; no other file is read or resolved.
+    """
 
-        self.output_path = output_path
+    def __init__(self, repo_name: str, repo_root: str = None, base_dir="data/graph"):
+
+        # Module names are file paths relative to this directory
+        self.repo_root = repo_root
+
+        # Each repo gets its own CSR store, so ingests never clobber
+        # another repo's graph
+        self.store = GraphStore(repo_name, base_dir=base_dir)
+
+        self.state = SymbolState(repo_name, base_dir=base_dir)
+
+        self.symbol_extractor = PythonSymbolExtractor()
 
         self.graph = {}
 
-        self.class_method_map = {}
+        # has_state() loads the store; finalize() reuses it
+        self.store_loaded = False
+
+        self.full_rebuild = False
+
+        # file_path -> record before this run (None for new files)
+        self.changed = {}
+
+        # Files whose records were (re)written in this run
+        self.pending = set()
+
+        # Lookup memos, valid for one finalize()
+        self._symbols = {}
+        self._classes = {}
+        self._records = {}
+        self._chunk_files = {}
 
     # =====================================
     # BUILD GRAPH ENTRYPOINT
@@ -22,98 +71,458 @@ class DependencyExtractor:
 
         print("\nBuilding dependency graph...")
 
-        # Step 1: Build lookup map
-        self._build_component_lookup(chunks)
+        self.reset()
 
-        # Step 2: Extract dependencies
-        for chunk in chunks:
+        self.add_chunks(chunks)
 
-            component_id = chunk["component_id"]
+        return self.finalize()
 
-            code = chunk["code"]
+    def reset(self):
 
-            dependencies = self._extract_dependencies(code)
+        # Full ingest: forget all symbol state, write a fresh graph
+        self.state.reset()
 
-            resolved = self._resolve_dependencies(dependencies)
+        self.full_rebuild = True
 
-            self.graph[component_id] = resolved
+    def has_state(self):
 
-        # Step 3: Save graph
-        self._save_graph()
+        if self.state.file_count() == 0:
+            return False
 
-        print(f"Graph built with {len(self.graph)} nodes")
+        self.store_loaded = self.store.load() is not None
 
-        return self.graph
+        return self.store_loaded
 
     # =====================================
-    # BUILD LOOKUP MAP
+    # STREAMING API
     # =====================================
 
-    def _build_component_lookup(self, chunks):
+    def add_chunks(self, chunks: List[Dict]):
+
+        # Group by file so each one is parsed exactly once
+        by_file = {}
+
+        for chunk in chunks:
+            by_file.setdefault(chunk["metadata"]["file_path"], []).append(chunk)
+
+        for file_path, file_chunks in by_file.items():
+
+            meta = file_chunks[0]["metadata"]
+
+            self.add_file({
+                "repo_name": meta["repo_name"],
+                "file_path": file_path,
+                "file_name": meta["file_name"],
+                "language": meta.get("language")
+            }, file_chunks)
+
+    def add_file(self, file_info: Dict, chunks: List[Dict]):
+
+        if file_info.get("language") != "python" or not chunks:
+            return
+
+        file_path = file_info["file_path"]
+
+        file_chunk = None
+        parsed = None
+        by_line = {}
 
         for chunk in chunks:
 
-            component_id = chunk["component_id"]
+            meta = chunk["metadata"]
+
+            if meta.get("chunk_type") == "file":
+
+                file_chunk = chunk["chunk_id"]
+
+                # Symbols from the extraction worker's parse; dropped from
+                # the chunk so they are not carried into the store batches
+                parsed = chunk.pop("symbols", None)
+
+                code = chunk.get("code", "")
+
+            elif meta.get("chunk_type") in DEFINITION_CHUNK_TYPES and meta.get("start_line"):
+                by_line[meta["start_line"]] = chunk["chunk_id"]
+
+        if file_chunk is None:
+            return
+
+        if parsed is not None:
+
+            module = parsed["module"]
+            symbols = parsed["symbols"]
+
+        else:
+
+            # Chunks from another extractor: parse the file chunk's text,
+            # never the file on disk
+            module, is_package = module_name(file_path, self.repo_root)
+
+            symbols = self.symbol_extractor.extract(code, module, is_package)
+
+        # Unparseable files are still importable as a module
+        symbols = symbols or {
+            "imports": {}, "defs": {}, "classes": {}, "globals": {}, "refs": []
+        }
+
+        record = {
+            "module": module,
+            "file_chunk": file_chunk,
+            "by_line": by_line,
+            **symbols
+        }
+
+        aliases = self._module_aliases(module)
+
+        names = [(name, file_chunk) for name in aliases]
 
-            metadata = chunk["metadata"]
+        for qualname, start_line in symbols["defs"].items():
+
+            chunk_id = by_line.get(start_line)
+
+            if chunk_id is not None:
+                names.extend((f"{name}.{qualname}", chunk_id) for name in aliases)
+
+        classes = [
+            (f"{name}.{qualname}", qualname)
+            for qualname in symbols["classes"]
+            for name in aliases
+        ]
+
+        if not self.full_rebuild and file_path not in self.changed:
+            self.changed[file_path] = self.state.get_record(file_path)
+
+        self.state.put_file(file_path, record, names, classes)
+
+        self.pending.add(file_path)
+
+    def remove_files(self, file_paths):
+
+        for file_path in file_paths:
+
+            record = self.state.remove_file(file_path)
+
+            if record is not None:
+                self.changed.setdefault(file_path, record)
+
+    def finalize(self):
+
+        start = time.perf_counter()
+
+        if self.full_rebuild:
+            sources = set(self.pending)
+        else:
+            sources = self._affected_files()
+
+        # Resolve once every file has contributed to the symbol table
+        edges = {}
+
+        for file_path in sources:
+
+            record = self._record(file_path)
+
+            if record is None:
+                continue
+
+            file_edges, target_files = self._resolve_file(record)
+
+            edges.update(file_edges)
+
+            self.state.set_edges(file_path, target_files - {file_path})
+
+        if self.full_rebuild:
+
+            self.graph = edges
+
+            self._save_graph()
+
+            self.store_loaded = True
+
+        else:
+
+            # Every node of an affected file gets its full edge list
+            # replaced; nodes of deleted chunks become empty
+            updates = {}
+
+            for file_path in sources | set(self.changed):
+
+                for record in (self.changed.get(file_path), self._record(file_path)):
+
+                    if record is not None:
+
+                        for node in self._record_nodes(record):
+                            updates[node] = edges.get(node, [])
+
+            if not self.store_loaded:
+                self.store_loaded = self.store.load() is not None
+
+            self.store.patch(updates)
+
+            self.graph = updates
+
+        self.state.commit()
+
+        edge_count = sum(len(targets) for targets in edges.values())
+
+        print(
+            f"Graph {'built' if self.full_rebuild else 'updated'}: "
+            f"{len(sources)} files resolved, {edge_count} edges "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+
+        self.full_rebuild = False
+        self.changed = {}
+        self.pending = set()
+
+        self._symbols = {}
+        self._classes = {}
+        self._records = {}
+        self._chunk_files = {}
+
+        return self.graph
 
-            class_name = metadata.get("class_name")
+    def _affected_files(self):
 
-            method_name = metadata.get("method_name")
+        modules = set()
 
-            if class_name and method_name:
+        for file_path, old in self.changed.items():
 
-                key = f"{class_name}.{method_name}"
+            for record in (old, self._record(file_path)):
 
-                self.class_method_map[key] = component_id
+                if record is not None:
+                    modules.update(self._module_aliases(record["module"]))
+
+        dependents = self.state.dependents(self.changed, modules)
+
+        return self.pending | dependents
+
+    def _resolve_file(self, record):
+
+        edges = {}
+        target_files = set()
+
+        for owner_line, class_name, dotted, kind in record["refs"]:
+
+            source = record["by_line"].get(owner_line, record["file_chunk"])
+
+            target = self._resolve(record, class_name, dotted, kind)
+
+            if target is None or target == source:
+                continue
+
+            targets = edges.setdefault(source, [])
+
+            if target not in targets:
+                targets.append(target)
+                target_files.add(self._chunk_files[target])
+
+        return edges, target_files
+
+    def _record_nodes(self, record):
+
+        return [record["file_chunk"], *record["by_line"].values()]
 
     # =====================================
-    # EXTRACT RAW DEPENDENCIES
+    # STATE LOOKUPS (MEMOIZED)
     # =====================================
 
-    def _extract_dependencies(self, code: str):
+    def _symbol(self, name):
+
+        if name not in self._symbols:
+
+            row = self.state.symbol(name)
+
+            self._symbols[name] = row[0] if row else None
+
+            if row:
+                self._chunk_files[row[0]] = row[1]
+
+        return self._symbols[name]
+
+    def _class(self, class_path):
+
+        if class_path not in self._classes:
 
-        pattern = r"(\w+)\.(\w+)\("
+            row = self.state.class_entry(class_path)
 
-        matches = re.findall(pattern, code)
+            record = self._record(row[0]) if row else None
 
-        dependencies = []
+            self._classes[class_path] = (record, row[1]) if record else None
 
-        for match in matches:
+        return self._classes[class_path]
 
-            class_name = match[0]
-            method_name = match[1]
+    def _record(self, file_path):
 
-            dependencies.append(f"{class_name}.{method_name}")
+        if file_path not in self._records:
+            self._records[file_path] = self.state.get_record(file_path)
 
-        return dependencies
+        return self._records[file_path]
 
     # =====================================
-    # RESOLVE TO VALID COMPONENTS
+    # RESOLUTION
     # =====================================
 
-    def _resolve_dependencies(self, dependencies):
+    def _resolve(self, record, class_name, dotted, kind):
+
+        # Import targets are already absolute
+        if kind == "import":
+            return self._lookup(dotted)
+
+        head, _, rest = dotted.partition(".")
+        rest = rest.split(".") if rest else []
+
+        if class_name is not None and head in ("self", "cls"):
+
+            return self._resolve_member(
+                f"{record['module']}.{class_name}", rest, MAX_RESOLVE_DEPTH
+            )
+
+        if class_name is not None and head == "super":
+
+            for base in self._bases(f"{record['module']}.{class_name}"):
+
+                target = self._resolve_member(base, rest, MAX_RESOLVE_DEPTH)
+
+                if target is not None:
+                    return target
+
+            return None
+
+        qualified = self._qualify(record, dotted)
+
+        return self._lookup(qualified) if qualified else None
+
+    def _resolve_member(self, class_path, rest, depth):
+
+        entry = self._class(class_path)
+
+        if depth <= 0 or entry is None:
+            return None
+
+        if not rest:
+            return self._symbol(class_path)
+
+        attr = rest[0]
+
+        # A method defined on the class itself
+        method = self._symbol(f"{class_path}.{attr}")
+
+        if method is not None:
+            return method
+
+        record, qualname = entry
+
+        # self.attr = SomeClass(...) -> continue on SomeClass
+        attr_type = record["classes"][qualname]["attrs"].get(attr)
 
-        resolved = []
+        if attr_type:
 
-        for dep in dependencies:
+            type_path = self._qualify(record, attr_type)
 
-            if dep in self.class_method_map:
+            if type_path:
 
-                resolved.append(dep)
+                if self._class(type_path) is not None:
+                    return self._resolve_member(type_path, rest[1:], depth - 1)
 
-        return resolved
+                return self._lookup(".".join([type_path] + rest[1:]))
+
+        # Inherited method
+        for base in self._bases(class_path):
+
+            target = self._resolve_member(base, rest, depth - 1)
+
+            if target is not None:
+                return target
+
+        return None
+
+    def _bases(self, class_path):
+
+        entry = self._class(class_path)
+
+        if entry is None:
+            return []
+
+        record, qualname = entry
+
+        return [
+            qualified
+            for qualified in (
+                self._qualify(record, base)
+                for base in record["classes"][qualname]["bases"]
+            )
+            if qualified
+        ]
+
+    def _qualify(self, record, dotted, depth=MAX_RESOLVE_DEPTH):
+
+        # Turns a name as written in a file into a repo-wide dotted path
+        head, dot, rest = dotted.partition(".")
+
+        if depth <= 0:
+            return None
+
+        if head in record["imports"]:
+            return record["imports"][head] + dot + rest
+
+        if head in record["defs"]:
+            return f"{record['module']}.{dotted}"
+
+        # app = FastAPI() at module level, then app.get(...)
+        if head in record["globals"]:
+
+            base = self._qualify(record, record["globals"][head], depth - 1)
+
+            return base + dot + rest if base else None
+
+        return None
+
+    def _lookup(self, dotted):
+
+        # Longest known prefix: pkg.mod.Class.attr -> Class if attr is
+        # a data attribute, pkg.mod.name -> module if name is not a def
+        parts = dotted.split(".")
+
+        for end in range(len(parts), 0, -1):
+
+            chunk_id = self._symbol(".".join(parts[:end]))
+
+            if chunk_id is not None:
+                return chunk_id
+
+        return None
 
     # =====================================
-    # SAVE GRAPH
+    # MODULE NAMES
     # =====================================
 
-    def _save_graph(self):
+    def _module_aliases(self, module):
+
+        # src/ layouts import without the src. prefix
+        if module.startswith("src."):
+            return [module, module[len("src."):]]
+
+        return [module]
 
-        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+    # =====================================
+    # LOAD EXISTING GRAPH
+    # =====================================
 
-        with open(self.output_path, "w") as f:
+    def load_graph(self):
 
-            json.dump(self.graph, f, indent=2)
+        self.store_loaded = self.store.load() is not None
+
+        if not self.store_loaded:
+            self.graph = {}
+        else:
+            self.graph = self.store.to_dict()
+
+        return self.graph
+
+    # =====================================
+    # SAVE GRAPH
+    # =====================================
+
+    def _save_graph(self):
 
-        print(f"Graph saved to {self.output_path}")
\ No newline at end of file
+        self.store.save(self.graph)
@@ -0,0 +1,657 @@
+import json
+import os
+import shutil
+import time
+from bisect import bisect_left
+from typing import List, Dict
+
+import numpy as np
+
+from services.codebase_assistant.utils.persistence import ReloadingRegistry, atomic_write_json, file_mtime
+
+
+# Flat files of graphs written before versioned directories existed
+LEGACY_FILES = (
+    "nodes.json", "offsets.npy", "edges.npy",
+    "rev_offsets.npy", "rev_edges.npy", "overlay.json"
+)
+
+
+# ==========================================
+# SORTED STRING TABLE
+# ==========================================
+
+class StringTable:
+    """
+    Sorted strings packed into one UTF-8 byte array plus an int64
+    offsets array: string i is blob[offsets[i]:offsets[i + 1]].
+
+    Both arrays can be memory-mapped, so a table of millions of chunk
+    ids costs no Python objects until a string is actually read.
+    Supports len(), indexing, iteration and `in` (binary search).
+    """
+
+    def __init__(self, blob, offsets):
+
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, strings: List[str]):
+
+        # strings must already be sorted
+        encoded = [string.encode("utf-8", errors="surrogatepass") for string in strings]
+
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+
+        i = int(i)
+
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode(
+            "utf-8", errors="surrogatepass"
+        )
+
+    def __iter__(self):
+
+        for i in range(len(self)):
+            yield self[i]
+
+    def __contains__(self, value):
+
+        return self.index(value) is not None
+
+    def index(self, value: str):
+
+        i = bisect_left(self, value)
+
+        if i < len(self) and self[i] == value:
+            return i
+
+        return None
+
+
+def name_keys(node_id: str):
+    """
+    Names a node is found by: its component, every dotted suffix of it
+    (Class.method is found as Class.method and as method) and, for a
+    module, the file name without .py.
+    """
+
+    component = node_id.rpartition(":")[2].split("@")[0]
+
+    parts = component.split(".")
+
+    keys = {".".join(parts[start:]) for start in range(len(parts))}
+
+    if component.endswith(".py"):
+        keys.add(component[:-len(".py")])
+
+    return keys
+
+
+# ==========================================
+# PER-REPO CSR GRAPH
+# ==========================================
+
+class GraphStore:
+    """
+    One repo's dependency graph in compressed sparse row form.
+
+    data/graph/<repo>/
+        CURRENT       name of the live version directory, swapped with
+                      os.replace so readers see the old graph or the
+                      new one, never a mix or nothing
+        v<ns>/
+            nodes.npy, node_offsets.npy
+                          sorted chunk ids as a StringTable; a node's
+                          index is its position
+            offsets.npy   int64[n + 1], edges of node i are
+                          edges[offsets[i]:offsets[i + 1]]
+            edges.npy     int32 target node indexes
+
+            rev_offsets.npy, rev_edges.npy
+                          the same layout over reversed edges: who
+                          points at node i (callers, importers,
+                          subclasses)
+
+            names.npy, name_offsets.npy, name_starts.npy, name_nodes.npy
+                          find() index: sorted name keys as a
+                          StringTable, and the node indexes of key k in
+                          name_nodes[name_starts[k]:name_starts[k + 1]]
+
+            overlay.json  incremental patches: node -> full replacement
+                          neighbour list, consulted before the CSR arrays
+
+    Every array is memory-mapped on load, so opening a graph with
+    millions of nodes and edges costs a handful of mmaps; pages are read
+    only when a node, its neighbours or a name are actually looked up.
+    The previous version directory is kept for readers still opening
+    it. Once the overlay grows past max_overlay nodes it is folded back
+    into a fresh CSR build.
+    """
+
+    def __init__(self, repo_name: str, base_dir="data/graph", max_overlay: int = 5000):
+
+        self.repo_name = repo_name
+
+        self.path = os.path.join(base_dir, repo_name)
+
+        self.max_overlay = max_overlay
+
+        # Version directory name; None until loaded or saved
+        self.version = None
+
+        self.nodes = StringTable.build([])
+
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.edges = np.zeros(0, dtype=np.int32)
+
+        self.rev_offsets = np.zeros(1, dtype=np.int64)
+        self.rev_edges = np.zeros(0, dtype=np.int32)
+
+        self.names = StringTable.build([])
+        self.name_starts = np.zeros(1, dtype=np.int64)
+        self.name_nodes = np.zeros(0, dtype=np.int32)
+
+        self.overlay = {}
+
+        # target -> overlay sources pointing at it, rebuilt with overlay
+        self.overlay_reverse = {}
+
+        # name -> overlay-only node ids for find(); built on first use
+        self._overlay_names = None
+
+    def __len__(self):
+
+        return len(self.nodes)
+
+    @property
+    def edge_count(self):
+
+        return int(self.offsets[-1])
+
+    # ======================================
+    # LOOKUP
+    # ======================================
+
+    def index(self, node_id: str):
+
+        # nodes is sorted, so no id -> index dict has to be held in memory
+        return self.nodes.index(node_id)
+
+    def neighbors(self, node_id: str) -> List[str]:
+
+        if node_id in self.overlay:
+            return list(self.overlay[node_id])
+
+        i = self.index(node_id)
+
+        if i is None:
+            return []
+
+        return [
+            self.nodes[j]
+            for j in self.edges[self.offsets[i]:self.offsets[i + 1]]
+        ]
+
+    def callers(self, node_id: str) -> List[str]:
+
+        callers = []
+
+        i = self.index(node_id)
+
+        if i is not None:
+
+            for j in self.rev_edges[self.rev_offsets[i]:self.rev_offsets[i + 1]]:
+
+                source = self.nodes[j]
+
+                # A patched source's CSR edges are stale; the overlay
+                # entry below speaks for it
+                if source not in self.overlay:
+                    callers.append(source)
+
+        callers.extend(self.overlay_reverse.get(node_id, []))
+
+        return callers
+
+    def find(self, name: str) -> List[str]:
+        """
+        Live nodes whose component is name, ends in .name (a method or
+        nested class), or is the module file name.py.
+        """
+
+        node_ids = []
+
+        k = self.names.index(name)
+
+        if k is not None:
+            node_ids = [
+                self.nodes[i]
+                for i in self.name_nodes[self.name_starts[k]:self.name_starts[k + 1]]
+            ]
+
+        if self._overlay_names is None:
+            self._overlay_names = self._index_overlay_names()
+
+        node_ids.extend(self._overlay_names.get(name, []))
+
+        return [node_id for node_id in dict.fromkeys(node_ids) if self._is_live(node_id)]
+
+    def _index_overlay_names(self):
+
+        # Only nodes the CSR name index does not know yet
+        names = {}
+
+        for node_id in dict.fromkeys(list(self.overlay) + list(self.overlay_reverse)):
+
+            if self.index(node_id) is not None:
+                continue
+
+            for key in name_keys(node_id):
+                names.setdefault(key, []).append(node_id)
+
+        return names
+
+    def _is_live(self, node_id):
+
+        # A tombstone is an emptied overlay entry nothing points at:
+        # its definition was deleted since the last full build
+        if self.overlay.get(node_id, True) != []:
+            return True
+
+        return bool(self.callers(node_id))
+
+    def get(self, node_id: str, default=None):
+
+        # Same shape as the old {node: [neighbours]} dict lookups
+        if node_id not in self.overlay and self.index(node_id) is None:
+            return default
+
+        return self.neighbors(node_id)
+
+    def subgraph(self, seeds: List[str], max_hops: int, max_nodes: int, deadline: float = None):
+        """
+        Breadth-first neighbourhood of the seeds, stopped at max_hops,
+        max_nodes or the perf_counter() deadline, whichever comes first.
+
+        Returns (node_ids, sources, targets): local edge lists indexing
+        into node_ids, ready for vectorized walks.
+        """
+
+        position = {}
+        node_ids = []
+
+        for node_id in seeds:
+
+            if node_id not in position and len(node_ids) < max_nodes:
+                position[node_id] = len(node_ids)
+                node_ids.append(node_id)
+
+        sources = []
+        targets = []
+
+        frontier = list(node_ids)
+
+        for _ in range(max_hops):
+
+            next_frontier = []
+
+            for node_id in frontier:
+
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+
+                source = position[node_id]
+
+                for target_id in self.neighbors(node_id):
+
+                    if target_id not in position:
+
+                        # Budget spent: keep edges among known nodes only
+                        if len(node_ids) >= max_nodes:
+                            continue
+
+                        position[target_id] = len(node_ids)
+                        node_ids.append(target_id)
+                        next_frontier.append(target_id)
+
+                    sources.append(source)
+                    targets.append(position[target_id])
+
+            frontier = next_frontier
+
+            if not frontier or (deadline is not None and time.perf_counter() > deadline):
+                break
+
+        return (
+            node_ids,
+            np.asarray(sources, dtype=np.int64),
+            np.asarray(targets, dtype=np.int64)
+        )
+
+    def to_dict(self) -> Dict[str, List[str]]:
+
+        graph = {node_id: self.neighbors(node_id) for node_id in self.nodes}
+
+        graph.update(self.overlay)
+
+        return graph
+
+    # ======================================
+    # INCREMENTAL PATCHES
+    # ======================================
+
+    def patch(self, updates: Dict[str, List[str]]):
+
+        for node_id, targets in updates.items():
+
+            # A node that never reached the CSR needs no tombstone
+            if not targets and self.index(node_id) is None:
+                self.overlay.pop(node_id, None)
+            else:
+                self.overlay[node_id] = list(targets)
+
+        self._index_overlay()
+
+        # No CSR on disk yet to hang an overlay off: write one
+        if self.version is None or len(self.overlay) > self.max_overlay:
+
+            print(f"Graph overlay has {len(self.overlay)} nodes, compacting")
+
+            # Tombstones are dropped; targets are re-added by save()
+            self.save({
+                node_id: targets
+                for node_id, targets in self.to_dict().items()
+                if targets
+            })
+
+            return
+
+        atomic_write_json(os.path.join(self.path, self.version, "overlay.json"), self.overlay)
+
+        print(f"Graph patched: {len(updates)} nodes ({len(self.overlay)} in overlay)")
+
+    # ======================================
+    # PERSISTENCE
+    # ======================================
+
+    def save(self, graph: Dict[str, List[str]]):
+
+        # Targets become nodes too, so every edge has an index
+        nodes = sorted(set(graph).union(
+            target for targets in graph.values() for target in targets
+        ))
+
+        position = {node_id: i for i, node_id in enumerate(nodes)}
+
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+
+        edges = []
+
+        for i, node_id in enumerate(nodes):
+
+            # Duplicate edges dropped, first-seen order kept
+            targets = dict.fromkeys(graph.get(node_id, []))
+
+            edges.extend(position[target] for target in targets)
+
+            offsets[i + 1] = len(edges)
+
+        edges = np.asarray(edges, dtype=np.int32)
+
+        node_table = StringTable.build(nodes)
+
+        rev_offsets, rev_edges = self._reverse(offsets, edges)
+
+        names, name_starts, name_nodes = self._index_names(nodes)
+
+        version = self._write({
+            "nodes": node_table.blob,
+            "node_offsets": node_table.offsets,
+            "offsets": offsets,
+            "edges": edges,
+            "rev_offsets": rev_offsets,
+            "rev_edges": rev_edges,
+            "names": names.blob,
+            "name_offsets": names.offsets,
+            "name_starts": name_starts,
+            "name_nodes": name_nodes
+        })
+
+        self.version = version
+
+        self.nodes = node_table
+        self.offsets = offsets
+        self.edges = edges
+
+        self.rev_offsets = rev_offsets
+        self.rev_edges = rev_edges
+
+        self.names = names
+        self.name_starts = name_starts
+        self.name_nodes = name_nodes
+
+        self.overlay = {}
+        self._index_overlay()
+
+        print(f"Graph saved to {self.path} ({len(nodes)} nodes, {len(edges)} edges)")
+
+    def _reverse(self, offsets, edges):
+
+        # Sort edges by target: sources in that order are the reverse
+        # CSR edges, per-target counts its offsets
+        n = len(offsets) - 1
+
+        sources = np.repeat(np.arange(n, dtype=np.int32), np.diff(offsets))
+
+        order = np.argsort(edges, kind="stable")
+
+        rev_offsets = np.zeros(n + 1, dtype=np.int64)
+        rev_offsets[1:] = np.cumsum(np.bincount(edges, minlength=n))
+
+        return rev_offsets, sources[order].astype(np.int32)
+
+    def _index_names(self, nodes):
+
+        # nodes sorted -> (name key table, postings offsets, node indexes)
+        postings = {}
+
+        for i, node_id in enumerate(nodes):
+
+            for key in name_keys(node_id):
+                postings.setdefault(key, []).append(i)
+
+        keys = sorted(postings)
+
+        starts = np.zeros(len(keys) + 1, dtype=np.int64)
+        starts[1:] = np.cumsum([len(postings[key]) for key in keys])
+
+        node_indexes = np.asarray(
+            [i for key in keys for i in postings[key]], dtype=np.int32
+        )
+
+        return StringTable.build(keys), starts, node_indexes
+
+    def _index_overlay(self):
+
+        self.overlay_reverse = {}
+        self._overlay_names = None
+
+        for source, targets in self.overlay.items():
+
+            for target in targets:
+                self.overlay_reverse.setdefault(target, []).append(source)
+
+    def _write(self, arrays: Dict[str, np.ndarray]) -> str:
+
+        previous = self.current_version()
+
+        version = f"v{time.time_ns()}"
+
+        directory = os.path.join(self.path, version)
+
+        os.makedirs(directory)
+
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+
+        # One atomic rename publishes the new version; readers holding
+        # the old one keep it until the next swap prunes it
+        tmp_path = os.path.join(self.path, "CURRENT.tmp")
+
+        with open(tmp_path, "w") as f:
+            f.write(version)
+
+        os.replace(tmp_path, os.path.join(self.path, "CURRENT"))
+
+        self._prune(keep={version, previous})
+
+        return version
+
+    def _prune(self, keep):
+
+        for entry in os.scandir(self.path):
+
+            if entry.is_dir() and entry.name.startswith("v") and entry.name not in keep:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+        # The flat layout is superseded once a version is live; readers
+        # of it already mapped what they need
+        if "" not in keep:
+
+            for name in LEGACY_FILES:
+
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    pass
+
+    def current_version(self):
+        """
+        Live version directory name, "" for a graph in the flat layout
+        written before versioned directories, None when there is none.
+        """
+
+        try:
+            with open(os.path.join(self.path, "CURRENT")) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            pass
+
+        if os.path.isfile(os.path.join(self.path, "nodes.json")):
+            return ""
+
+        return None
+
+    def load(self):
+
+        version = self.current_version()
+
+        if version is None:
+            return None
+
+        directory = os.path.join(self.path, version)
+
+        def array(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+        try:
+
+            offsets = array("offsets")
+            edges = array("edges")
+
+            if version:
+                nodes = StringTable(array("nodes"), array("node_offsets"))
+            else:
+                with open(os.path.join(directory, "nodes.json")) as f:
+                    nodes = StringTable.build(json.load(f))
+
+        # A version pruned between reading CURRENT and opening it
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            return None
+
+        try:
+            rev_offsets = array("rev_offsets")
+            rev_edges = array("rev_edges")
+        except (FileNotFoundError, ValueError):
+            # Graph written before the reverse index existed
+            rev_offsets, rev_edges = self._reverse(offsets, edges)
+
+        try:
+            names = StringTable(array("names"), array("name_offsets"))
+            name_starts = array("name_starts")
+            name_nodes = array("name_nodes")
+        except (FileNotFoundError, ValueError):
+            # Flat-layout graph: no stored name index
+            names, name_starts, name_nodes = self._index_names(list(nodes))
+
+        try:
+            with open(os.path.join(directory, "overlay.json")) as f:
+                overlay = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            overlay = {}
+
+        self.version = version
+
+        self.nodes = nodes
+        self.offsets = offsets
+        self.edges = edges
+
+        self.rev_offsets = rev_offsets
+        self.rev_edges = rev_edges
+
+        self.names = names
+        self.name_starts = name_starts
+        self.name_nodes = name_nodes
+
+        self.overlay = overlay
+
+        self._index_overlay()
+
+        return self
+
+
+# ==========================================
+# IN-MEMORY REGISTRY
+# ==========================================
+
+class GraphStoreRegistry(ReloadingRegistry):
+    """
+    Opens a repo's graph on first use and reopens it when a re-ingest
+    publishes a new version directory or patches the overlay.
+    """
+
+    def __init__(self, base_dir="data/graph"):
+
+        super().__init__()
+
+        self.base_dir = base_dir
+
+    def _open(self, repo_name):
+
+        return GraphStore(repo_name, base_dir=self.base_dir)
+
+    def _version(self, graph):
+
+        version = graph.current_version()
+
+        if version is None:
+            return None
+
+        return (version, file_mtime(os.path.join(graph.path, version, "overlay.json")))
+
+    def _loaded(self, repo_name, graph):
+
+        print(
+            f"Graph for {repo_name} loaded ({len(graph)} nodes, {graph.edge_count} edges, "
+            f"{len(graph.overlay)} patched)"
+        )
@@ -0,0 +1,278 @@
+import ast
+import os
+from typing import Dict, Optional
+
+
+def module_name(file_path: str, repo_root: str = None):
+    """
+    Dotted module for a file, from its path relative to repo_root:
+    services/app/main.py -> ("services.app.main", False),
+    services/app/__init__.py -> ("services.app", True).
+    """
+
+    rel_path = file_path
+
+    if repo_root:
+        rel_path = os.path.relpath(rel_path, repo_root)
+
+    parts = rel_path.replace(os.sep, "/").split("/")
+    parts[-1] = parts[-1][:-len(".py")] if parts[-1].endswith(".py") else parts[-1]
+
+    is_package = parts[-1] == "__init__"
+
+    if is_package:
+        parts = parts[:-1]
+
+    return ".".join(part for part in parts if part), is_package
+
+
+class PythonSymbolExtractor:
+    """
+    One AST pass over a Python file, recording what the dependency
+    graph needs to resolve references across the repo:
+
+        imports   local alias -> absolute dotted target
+        defs      qualname -> first line (decorators included)
+        classes   qualname -> base expressions and self.<attr> types
+        globals   module-level name -> type expression (x = Foo())
+        refs      (owner line, class qualname, dotted expr, kind)
+
+    The owner line is the start line of the innermost enclosing
+    class or function, which is also its chunk's start_line; 0 means
+    module level (the file chunk). Dotted expressions are left
+    unresolved here: resolution needs every file's symbols.
+    """
+
+    def extract(self, code: str, module: str, is_package: bool = False, tree=None) -> Optional[Dict]:
+
+        # Callers that already parsed the file pass its tree in
+        if tree is None:
+
+            try:
+                tree = ast.parse(code)
+            except (SyntaxError, ValueError):
+                return None
+
+        # Package that relative imports are resolved against
+        self._package = module if is_package else module.rpartition(".")[0]
+
+        self._result = {
+            "imports": {},
+            "defs": {},
+            "classes": {},
+            "globals": {},
+            "refs": []
+        }
+
+        try:
+
+            for node in tree.body:
+                self._visit(node, owner=0, prefix="", class_name=None, local_types=None)
+
+        except RecursionError:
+            # Pathologically nested expressions (generated code)
+            return None
+
+        finally:
+            result, self._result = self._result, None
+
+        return result
+
+    # ==============================
+    # WALK
+    # ==============================
+
+    def _visit(self, node, owner, prefix, class_name, local_types):
+
+        if isinstance(node, ast.ClassDef):
+            self._visit_class(node, prefix, local_types)
+            return
+
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            self._visit_function(node, prefix, class_name)
+            return
+
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            self._visit_import(node, owner, class_name)
+            return
+
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            self._record_assignment(node, class_name, local_types)
+
+        elif isinstance(node, ast.Call):
+
+            dotted = self._dotted(node.func, local_types)
+
+            if dotted:
+                self._result["refs"].append((owner, class_name, dotted, "call"))
+
+        for child in ast.iter_child_nodes(node):
+            self._visit(child, owner, prefix, class_name, local_types)
+
+    def _visit_class(self, node, prefix, local_types):
+
+        qualname = f"{prefix}.{node.name}" if prefix else node.name
+        start_line = self._start_line(node)
+
+        self._result["defs"].setdefault(qualname, start_line)
+
+        bases = [
+            dotted for dotted in (self._dotted(base, local_types) for base in node.bases)
+            if dotted
+        ]
+
+        self._result["classes"].setdefault(qualname, {"bases": bases, "attrs": {}})
+
+        for base in bases:
+            self._result["refs"].append((start_line, qualname, base, "inherit"))
+
+        for decorator in node.decorator_list:
+            self._visit(decorator, start_line, prefix, qualname, local_types)
+
+        for child in node.body:
+            self._visit(child, start_line, qualname, qualname, None)
+
+    def _visit_function(self, node, prefix, class_name):
+
+        qualname = f"{prefix}.{node.name}" if prefix else node.name
+        start_line = self._start_line(node)
+
+        self._result["defs"].setdefault(qualname, start_line)
+
+        # Annotated parameters type the names used in the body
+        local_types = {}
+
+        arguments = node.args.posonlyargs + node.args.args + node.args.kwonlyargs
+
+        for arg in arguments:
+
+            dotted = self._dotted(arg.annotation, None) if arg.annotation else None
+
+            if dotted:
+                local_types[arg.arg] = dotted
+
+        for decorator in node.decorator_list:
+            self._visit(decorator, start_line, prefix, class_name, None)
+
+        for child in node.body:
+            self._visit(child, start_line, qualname, class_name, local_types)
+
+    def _visit_import(self, node, owner, class_name):
+
+        if isinstance(node, ast.Import):
+
+            for alias in node.names:
+
+                # "import a.b" binds a; "import a.b as c" binds c to a.b
+                local = alias.asname or alias.name.split(".")[0]
+                target = alias.name if alias.asname else local
+
+                self._result["imports"][local] = target
+                self._result["refs"].append((owner, class_name, alias.name, "import"))
+
+            return
+
+        base = self._import_base(node)
+
+        if base is None:
+            return
+
+        for alias in node.names:
+
+            if alias.name == "*":
+                continue
+
+            target = f"{base}.{alias.name}" if base else alias.name
+
+            self._result["imports"][alias.asname or alias.name] = target
+            self._result["refs"].append((owner, class_name, target, "import"))
+
+    def _import_base(self, node):
+
+        if not node.level:
+            return node.module or ""
+
+        parts = self._package.split(".") if self._package else []
+
+        # level 1 is the current package, each extra dot one parent up
+        if node.level - 1 > len(parts):
+            return None
+
+        parts = parts[:len(parts) - (node.level - 1)]
+
+        if node.module:
+            parts.append(node.module)
+
+        return ".".join(parts)
+
+    # ==============================
+    # TYPES FROM ASSIGNMENTS
+    # ==============================
+
+    def _record_assignment(self, node, class_name, local_types):
+
+        if isinstance(node, ast.AnnAssign):
+            targets = [node.target]
+            dotted = self._dotted(node.annotation, local_types)
+        else:
+            targets = node.targets
+            dotted = None
+
+        # x = Foo(...) types x as Foo
+        if isinstance(node.value, ast.Call):
+            dotted = self._dotted(node.value.func, local_types) or dotted
+
+        if not dotted:
+            return
+
+        for target in targets:
+
+            if isinstance(target, ast.Name):
+
+                if local_types is not None:
+                    local_types[target.id] = dotted
+
+                elif class_name is None:
+                    self._result["globals"][target.id] = dotted
+
+            elif (
+                isinstance(target, ast.Attribute)
+                and isinstance(target.value, ast.Name)
+                and target.value.id == "self"
+                and class_name is not None
+            ):
+                self._result["classes"].setdefault(
+                    class_name, {"bases": [], "attrs": {}}
+                )["attrs"][target.attr] = dotted
+
+    # ==============================
+    # HELPERS
+    # ==============================
+
+    def _dotted(self, expr, local_types) -> Optional[str]:
+
+        if isinstance(expr, ast.Name):
+
+            # A local typed by assignment or annotation stands for its type
+            if local_types and expr.id in local_types:
+                return local_types[expr.id]
+
+            return expr.id
+
+        if isinstance(expr, ast.Attribute):
+
+            value = expr.value
+
+            # Foo().bar and super().bar: the call stands for an instance
+            if isinstance(value, ast.Call):
+                value = value.func
+
+            base = self._dotted(value, local_types)
+
+            return f"{base}.{expr.attr}" if base else None
+
+        return None
+
+    def _start_line(self, node) -> int:
+
+        return min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
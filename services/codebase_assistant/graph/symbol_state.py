@@ -0,0 +1,184 @@
+import json
+import os
+import sqlite3
+from typing import List, Dict, Iterable, Optional, Tuple
+
+
+class SymbolState:
+    """
+    Persistent per-repo symbol state for incremental graph updates.
+
+    Holds each Python file's symbol record, the repo symbol table, the
+    modules every file imports and which files its resolved edges point
+    into. With that, a changed file only needs its own record rebuilt
+    and the edges of the files that depend on it re-resolved; nothing
+    else in the repo is read.
+    """
+
+    def __init__(self, repo_name: str, base_dir="data/graph"):
+
+        self.path = os.path.join(base_dir, f"{repo_name}.symbols.sqlite")
+
+        os.makedirs(base_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path)
+
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "file_path TEXT PRIMARY KEY, module TEXT NOT NULL, record TEXT NOT NULL);"
+
+            "CREATE TABLE IF NOT EXISTS symbols ("
+            "name TEXT PRIMARY KEY, chunk_id TEXT NOT NULL, file_path TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_path);"
+
+            "CREATE TABLE IF NOT EXISTS classes ("
+            "name TEXT PRIMARY KEY, file_path TEXT NOT NULL, qualname TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_classes_file ON classes(file_path);"
+
+            "CREATE TABLE IF NOT EXISTS imports (file_path TEXT NOT NULL, module TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_imports_module ON imports(module);"
+            "CREATE INDEX IF NOT EXISTS idx_imports_file ON imports(file_path);"
+
+            "CREATE TABLE IF NOT EXISTS edges (source_file TEXT NOT NULL, target_file TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target_file);"
+            "CREATE INDEX IF NOT EXISTS idx_edges_source ON edges(source_file);"
+        )
+
+    # =====================================
+    # WRITE
+    # =====================================
+
+    def reset(self):
+
+        for table in ("files", "symbols", "classes", "imports", "edges"):
+            self._conn.execute(f"DELETE FROM {table}")
+
+    def put_file(
+        self,
+        file_path: str,
+        record: Dict,
+        symbols: List[Tuple[str, str]],
+        classes: List[Tuple[str, str]]
+    ):
+
+        self._delete_file_rows(file_path)
+
+        # JSON object keys are strings, so line numbers travel as pairs
+        stored = dict(record, by_line=list(record["by_line"].items()))
+
+        self._conn.execute(
+            "INSERT INTO files (file_path, module, record) VALUES (?, ?, ?)",
+            (file_path, record["module"], json.dumps(stored))
+        )
+
+        # First definition of a name wins, as in a full build
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO symbols (name, chunk_id, file_path) VALUES (?, ?, ?)",
+            [(name, chunk_id, file_path) for name, chunk_id in symbols]
+        )
+
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO classes (name, file_path, qualname) VALUES (?, ?, ?)",
+            [(name, file_path, qualname) for name, qualname in classes]
+        )
+
+        # "import a.b" binds only a, so the import refs are kept as well
+        modules = set(record["imports"].values()).union(
+            dotted for _, _, dotted, kind in record["refs"] if kind == "import"
+        )
+
+        self._conn.executemany(
+            "INSERT INTO imports (file_path, module) VALUES (?, ?)",
+            [(file_path, module) for module in modules]
+        )
+
+    def remove_file(self, file_path: str) -> Optional[Dict]:
+
+        record = self.get_record(file_path)
+
+        self._delete_file_rows(file_path)
+
+        return record
+
+    def set_edges(self, source_file: str, target_files: Iterable[str]):
+
+        self._conn.execute("DELETE FROM edges WHERE source_file = ?", (source_file,))
+
+        self._conn.executemany(
+            "INSERT INTO edges (source_file, target_file) VALUES (?, ?)",
+            [(source_file, target_file) for target_file in set(target_files)]
+        )
+
+    def commit(self):
+
+        self._conn.commit()
+
+    def _delete_file_rows(self, file_path):
+
+        for table in ("files", "symbols", "classes", "imports"):
+            self._conn.execute(f"DELETE FROM {table} WHERE file_path = ?", (file_path,))
+
+        self._conn.execute("DELETE FROM edges WHERE source_file = ?", (file_path,))
+
+    # =====================================
+    # READ
+    # =====================================
+
+    def file_count(self) -> int:
+
+        return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def get_record(self, file_path: str) -> Optional[Dict]:
+
+        row = self._conn.execute(
+            "SELECT record FROM files WHERE file_path = ?", (file_path,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        record = json.loads(row[0])
+        record["by_line"] = {int(line): chunk_id for line, chunk_id in record["by_line"]}
+
+        return record
+
+    def symbol(self, name: str) -> Optional[Tuple[str, str]]:
+
+        return self._conn.execute(
+            "SELECT chunk_id, file_path FROM symbols WHERE name = ?", (name,)
+        ).fetchone()
+
+    def class_entry(self, name: str) -> Optional[Tuple[str, str]]:
+
+        return self._conn.execute(
+            "SELECT file_path, qualname FROM classes WHERE name = ?", (name,)
+        ).fetchone()
+
+    def dependents(self, file_paths: Iterable[str], modules: Iterable[str]) -> set:
+        """
+        Files that import one of the modules (or anything inside them)
+        or have resolved edges into one of the files.
+        """
+
+        result = set()
+
+        for module in set(modules):
+
+            # module itself, or module.<anything>: '/' sorts right after '.'
+            rows = self._conn.execute(
+                "SELECT file_path FROM imports "
+                "WHERE module = ? OR (module >= ? AND module < ?)",
+                (module, f"{module}.", f"{module}/")
+            )
+
+            result.update(row[0] for row in rows)
+
+        for file_path in set(file_paths):
+
+            rows = self._conn.execute(
+                "SELECT source_file FROM edges WHERE target_file = ?", (file_path,)
+            )
+
+            result.update(row[0] for row in rows)
+
+        return result
@@ -1,11 +1,26 @@
+import ast
+import io
 import re
 from typing import List, Dict
 
+from services.codebase_assistant.ingestion.python_ast_extractor import PythonAstExtractor
+from services.codebase_assistant.ingestion.token_splitter import TokenWindowSplitter
+from services.codebase_assistant.graph.python_symbols import PythonSymbolExtractor, module_name
+
 
 class ChunkExtractor:
 
-    def __init__(self):
-        pass
+    def __init__(self, repo_root: str = None):
+
+        self.ast_extractor = PythonAstExtractor()
+
+        # Dependency-graph symbols come from the same parse as the
+        # chunks; module names are relative to repo_root
+        self.symbol_extractor = PythonSymbolExtractor()
+        self.repo_root = repo_root
+
+        # Whole-file chunks above one window are split for embedding
+        self.splitter = TokenWindowSplitter()
 
 
     # ==============================
@@ -37,7 +52,8 @@ class ChunkExtractor:
                 return f.read()
 
         except Exception as e:
-            print(f"Error reading file {file_path}: {e}")
+            # flush so errors from pool workers show up immediately
+            print(f"Error reading file {file_path}: {e}", flush=True)
             return ""
 
 
@@ -53,6 +69,63 @@ class ChunkExtractor:
         return f"{repo}:{path}:{component_id}"
 
 
+    # ==============================
+    # TOKEN WINDOWS FOR WHOLE-FILE CHUNKS
+    # ==============================
+
+    def _split_file_chunk(self, file_info: Dict, chunk: Dict) -> List[Dict]:
+
+        windows, truncated = self.splitter.split(chunk["code"])
+
+        if len(windows) == 1 and not truncated:
+            return [chunk]
+
+        parent_id = chunk["chunk_id"]
+
+        # Parent keeps its id, type, metadata and full text so overview,
+        # setup and API lookups still hand the LLM the whole file; only
+        # its embedding is limited to the first window
+        chunk["embed_text"] = windows[0]
+        chunk["metadata"]["part_count"] = len(windows)
+        chunk["metadata"]["truncated"] = truncated
+
+        if truncated:
+            print(
+                f"Warning: {file_info['file_path']} exceeds {len(windows)} windows, "
+                f"tail is stored but not embedded",
+                flush=True
+            )
+
+        parts = [chunk]
+
+        for index, window in enumerate(windows[1:], start=1):
+
+            component_id = f"{chunk['component_id']}#part{index}"
+
+            metadata = {
+                key: value
+                for key, value in chunk["metadata"].items()
+                if key not in ("api_routes", "start_line", "end_line", "truncated")
+            }
+
+            metadata.update({
+                "component_id": component_id,
+                "chunk_type": "file_part",
+                "is_api": False,
+                "parent_id": parent_id,
+                "part_index": index
+            })
+
+            parts.append({
+                "component_id": component_id,
+                "chunk_id": self._generate_chunk_id(file_info, component_id),
+                "code": window,
+                "metadata": metadata
+            })
+
+        return parts
+
+
     # ==============================
     # FASTAPI ROUTE EXTRACTOR
     # ==============================
@@ -89,8 +162,20 @@ class ChunkExtractor:
 
         chunks = []
 
-        class_name = self._extract_python_class_name(code)
-        functions = self._extract_python_functions(code)
+        # Parsed once for both chunks and graph symbols; regex only for
+        # files that do not parse
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            tree = None
+
+        definitions = None
+
+        if tree is not None:
+            definitions = self.ast_extractor.extract(code, tree=tree)
+
+        if definitions is None:
+            definitions = self._extract_python_definitions_regex(code)
 
         # Detect all API routes at file level
         api_routes = self._extract_fastapi_routes(code)
@@ -99,50 +184,71 @@ class ChunkExtractor:
 
 
         # ==============================
-        # FUNCTION CHUNKS
+        # CLASS / FUNCTION CHUNKS
         # ==============================
 
-        for func in functions:
+        for definition in definitions:
 
-            if class_name:
-                component_id = f"{class_name}.{func['function_name']}"
-            else:
-                component_id = func["function_name"]
+            component_id = definition["component_id"]
 
             chunk_id = self._generate_chunk_id(file_info, component_id)
 
-            func_routes = self._extract_fastapi_routes(func["function_code"])
+            if definition["kind"] == "class":
 
-            metadata = {
-                "repo_name": file_info["repo_name"],
-                "file_path": file_path,
-                "file_name": file_info["file_name"],
-                "language": "python",
+                metadata = {
+                    "repo_name": file_info["repo_name"],
+                    "file_path": file_path,
+                    "file_name": file_info["file_name"],
+                    "language": "python",
 
-                "component_id": component_id,
-                "function_name": func["function_name"],
-                "class_name": class_name,
+                    "component_id": component_id,
+                    "class_name": definition["name"],
 
-                "chunk_type": "api" if func_routes else "function",
-                "is_api": bool(func_routes),
+                    "chunk_type": "class",
+                    "is_api": False,
 
-                "framework": "fastapi" if func_routes else None
-            }
+                    "framework": None
+                }
+
+            else:
+
+                func_routes = self._extract_fastapi_routes(definition["code"])
+
+                metadata = {
+                    "repo_name": file_info["repo_name"],
+                    "file_path": file_path,
+                    "file_name": file_info["file_name"],
+                    "language": "python",
+
+                    "component_id": component_id,
+                    "function_name": definition["name"],
+                    "class_name": definition["class_name"],
+
+                    "chunk_type": "api" if func_routes else "function",
+                    "is_api": bool(func_routes),
 
-            # CRITICAL FIX: store api_routes as STRING (not list/dict)
-            if func_routes:
+                    "framework": "fastapi" if func_routes else None
+                }
 
-                routes_str = []
+                # CRITICAL FIX: store api_routes as STRING (not list/dict)
+                if func_routes:
 
-                for route in func_routes:
-                    routes_str.append(f"{route['method']} {route['path']}")
+                    routes_str = []
 
-                metadata["api_routes"] = ", ".join(routes_str)
+                    for route in func_routes:
+                        routes_str.append(f"{route['method']} {route['path']}")
+
+                    metadata["api_routes"] = ", ".join(routes_str)
+
+            if definition.get("start_line"):
+
+                metadata["start_line"] = definition["start_line"]
+                metadata["end_line"] = definition["end_line"]
 
             chunks.append({
                 "component_id": component_id,
                 "chunk_id": chunk_id,
-                "code": func["function_code"],
+                "code": definition["code"],
                 "metadata": metadata
             })
 
@@ -165,7 +271,10 @@ class ChunkExtractor:
             "chunk_type": "file",
             "is_api": is_api_file,
 
-            "framework": "fastapi" if is_api_file else None
+            "framework": "fastapi" if is_api_file else None,
+
+            "start_line": 1,
+            "end_line": len(io.StringIO(code).readlines())
         }
 
         # CRITICAL FIX: store api_routes as STRING
@@ -178,20 +287,58 @@ class ChunkExtractor:
 
             file_metadata["api_routes"] = ", ".join(routes_str)
 
-        chunks.append({
+        chunks.extend(self._split_file_chunk(file_info, {
             "component_id": component_id,
             "chunk_id": chunk_id,
             "code": code,
-            "metadata": file_metadata
-        })
+            "metadata": file_metadata,
+
+            # Consumed (and removed) by the dependency extractor
+            "symbols": self._python_symbols(file_info, code, tree)
+        }))
 
         return chunks
 
+    def _python_symbols(self, file_info: Dict, code: str, tree):
+
+        module, is_package = module_name(file_info["file_path"], self.repo_root)
+
+        symbols = None
+
+        if tree is not None:
+            symbols = self.symbol_extractor.extract(code, module, is_package, tree=tree)
+
+        return {"module": module, "is_package": is_package, "symbols": symbols}
+
 
     # ==============================
-    # PYTHON HELPERS
+    # PYTHON HELPERS (REGEX FALLBACK)
     # ==============================
 
+    def _extract_python_definitions_regex(self, code: str):
+
+        class_name = self._extract_python_class_name(code)
+
+        definitions = []
+
+        for func in self._extract_python_functions(code):
+
+            if class_name:
+                component_id = f"{class_name}.{func['function_name']}"
+            else:
+                component_id = func["function_name"]
+
+            definitions.append({
+                "kind": "function",
+                "name": func["function_name"],
+                "component_id": component_id,
+                "class_name": class_name,
+                "code": func["function_code"]
+            })
+
+        return definitions
+
+
     def _extract_python_class_name(self, code: str):
 
         match = re.search(r"class\s+(\w+)\s*:", code)
@@ -258,7 +405,7 @@ class ChunkExtractor:
         component_id = file_info["file_name"]
         chunk_id = self._generate_chunk_id(file_info, component_id)
 
-        return [{
+        return self._split_file_chunk(file_info, {
             "component_id": component_id,
             "chunk_id": chunk_id,
             "code": code,
@@ -270,7 +417,7 @@ class ChunkExtractor:
                 "component_id": component_id,
                 "chunk_type": "file"
             }
-        }]
+        })
 
 
     # ==============================
@@ -289,7 +436,7 @@ class ChunkExtractor:
         component_id = class_name
         chunk_id = self._generate_chunk_id(file_info, component_id)
 
-        return [{
+        return self._split_file_chunk(file_info, {
             "component_id": component_id,
             "chunk_id": chunk_id,
             "code": code,
@@ -301,7 +448,7 @@ class ChunkExtractor:
                 "component_id": component_id,
                 "chunk_type": "class"
             }
-        }]
+        })
 
 
     def _extract_java_class_name(self, code: str):
@@ -1,5 +1,10 @@
+import fnmatch
 import os
-from typing import List, Dict
+import re
+from collections import Counter
+from typing import List, Dict, Iterator
+
+from services.codebase_assistant.ingestion.gitignore import is_ignored, load_rules
 
 
 # ==========================================
@@ -78,50 +83,256 @@ EXCLUDED_DIRS = {
 }
 
 
+# ==========================================
+# GENERATED / VENDORED FILE PATTERNS
+# ==========================================
+
+GENERATED_PATTERNS = [
+
+    # Lockfiles
+    "package-lock.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "poetry.lock",
+    "Pipfile.lock",
+    "composer.lock",
+    "Cargo.lock",
+
+    # Minified bundles and source maps
+    "*.min.js",
+    "*.min.css",
+    "*.bundle.js",
+    "*.map",
+
+    # Generated code
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.generated.*"
+]
+
+# Tool-style headers of generated files; a hand-written comment
+# like "do not edit these defaults" must not match
+GENERATED_MARKERS = [
+    re.compile(r"@generated\b"),
+    re.compile(r"\bcode generated\b.*\bdo not edit\b", re.I),
+    re.compile(r"\bauto-?generated by\b", re.I)
+]
+
+# Only this many leading lines are searched for a marker
+MARKER_LINES = 5
+
+# Bytes sniffed from the start of each file
+SNIFF_BYTES = 8192
+
+# Lines longer than this in the sniffed head mean minified output;
+# prose and source files legitimately have long lines
+MAX_LINE_LENGTH = 1000
+
+MINIFIABLE_EXTENSIONS = (".js", ".mjs", ".cjs", ".css", ".json", ".map")
+
+
 # ==========================================
 # FILE SCANNER CLASS
 # ==========================================
 
 class FileScanner:
 
-    def __init__(self, root_path: str, repo_name: str):
+    def __init__(
+        self,
+        root_path: str,
+        repo_name: str,
+        include: List[str] = None,
+        exclude: List[str] = None,
+        max_file_size: int = 1_000_000,
+        use_gitignore: bool = True
+    ):
 
         self.root_path = root_path
         self.repo_name = repo_name
 
+        # Globs matched against the repo-relative path and the file name
+        self.include = include or []
+        self.exclude = exclude or []
+
+        self.max_file_size = max_file_size
+        self.use_gitignore = use_gitignore
+
+        self.skip_stats = Counter()
+
     # ======================================
     # MAIN SCAN FUNCTION
     # ======================================
 
     def scan(self) -> List[Dict]:
 
-        file_list = []
+        file_list = list(self.iter_files())
 
-        for root, dirs, files in os.walk(self.root_path):
+        print(f"Found {len(file_list)} supported files")
 
-            # Remove excluded dirs in-place
-            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        return file_list
 
-            for file in files:
+    # ======================================
+    # STREAMING SCAN
+    # ======================================
+
+    def iter_files(self) -> Iterator[Dict]:
+
+        self.skip_stats = Counter()
+
+        root_rules = self._load_gitignore(self.root_path, "")
+
+        # (absolute dir, repo-relative dir, active .gitignore rule sets)
+        stack = [(self.root_path, "", [root_rules] if root_rules else [])]
+
+        while stack:
+
+            directory, rel_dir, rule_sets = stack.pop()
+
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                print(f"Error scanning directory {directory}: {e}")
+                continue
 
-                full_path = os.path.join(root, file)
+            subdirs = []
 
-                language = self._detect_language(file)
+            for entry in entries:
 
-                if language:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
 
-                    file_info = {
+                # Symlinked directories are not descended into, so a link
+                # back up the tree cannot loop; symlinked files are read
+                # like any other file, as os.walk did
+                if entry.is_dir(follow_symlinks=False):
+
+                    reason = self._skip_dir_reason(entry.name, rel_path, rule_sets)
+
+                    if reason:
+                        self.skip_stats[reason] += 1
+                        continue
+
+                    subdirs.append((entry.path, rel_path))
+
+                elif entry.is_file():
+
+                    language = self._detect_language(entry.name)
+
+                    reason = self._skip_file_reason(entry, rel_path, language, rule_sets)
+
+                    if reason:
+                        self.skip_stats[reason] += 1
+                        continue
+
+                    yield {
                         "repo_name": self.repo_name,
-                        "file_path": full_path,
-                        "file_name": file,
+                        "file_path": entry.path,
+                        "file_name": entry.name,
                         "language": language
                     }
 
-                    file_list.append(file_info)
+            # Reversed so directories are visited in name order
+            for path, rel_path in reversed(subdirs):
 
-        print(f"Found {len(file_list)} supported files")
+                nested = self._load_gitignore(path, rel_path)
 
-        return file_list
+                stack.append((path, rel_path, rule_sets + [nested] if nested else rule_sets))
+
+        if self.skip_stats:
+
+            summary = ", ".join(
+                f"{reason}={count}" for reason, count in sorted(self.skip_stats.items())
+            )
+
+            print(f"Skipped: {summary}")
+
+    # ======================================
+    # FILTERS
+    # ======================================
+
+    def _skip_dir_reason(self, name: str, rel_path: str, rule_sets):
+
+        if name in EXCLUDED_DIRS:
+            return "excluded_dir"
+
+        if self.use_gitignore and is_ignored(rule_sets, rel_path, is_dir=True):
+            return "gitignored"
+
+        if self._matches(self.exclude, rel_path, name):
+            return "excluded"
+
+        return None
+
+    def _skip_file_reason(self, entry, rel_path: str, language, rule_sets):
+
+        if not language:
+            return "unsupported"
+
+        if self.use_gitignore and is_ignored(rule_sets, rel_path, is_dir=False):
+            return "gitignored"
+
+        if self.include and not self._matches(self.include, rel_path, entry.name):
+            return "not_included"
+
+        if self._matches(self.exclude, rel_path, entry.name):
+            return "excluded"
+
+        if self._matches(GENERATED_PATTERNS, rel_path, entry.name):
+            return "generated"
+
+        try:
+            size = entry.stat().st_size
+        except OSError:
+            return "unreadable"
+
+        if size > self.max_file_size:
+            return "too_large"
+
+        return self._sniff(entry.path, entry.name)
+
+    def _sniff(self, file_path: str, name: str):
+
+        try:
+            with open(file_path, "rb") as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return "unreadable"
+
+        if b"\0" in head:
+            return "binary"
+
+        text = head.decode("utf-8", errors="ignore")
+
+        header = text.split("\n", MARKER_LINES)[:MARKER_LINES]
+
+        if any(marker.search(line) for line in header for marker in GENERATED_MARKERS):
+            return "generated"
+
+        if not name.lower().endswith(MINIFIABLE_EXTENSIONS):
+            return None
+
+        # Ignore a possibly cut-off last line
+        lines = text.split("\n")[:-1] if len(head) == SNIFF_BYTES else text.split("\n")
+
+        if any(len(line) > MAX_LINE_LENGTH for line in lines):
+            return "generated"
+
+        return None
+
+    def _matches(self, patterns, rel_path: str, name: str) -> bool:
+
+        return any(
+            fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern)
+            for pattern in patterns
+        )
+
+    def _load_gitignore(self, directory: str, rel_dir: str):
+
+        if not self.use_gitignore:
+            return None
+
+        return load_rules(directory, rel_dir)
 
     # ======================================
     # LANGUAGE DETECTION
@@ -1,44 +1,95 @@
 import os
 import shutil
-from git import Repo
+from git import Repo, InvalidGitRepositoryError, NoSuchPathError
 from urllib.parse import urlparse
 
 
 class GitHubLoader:
 
-    def __init__(self, base_dir="data/codebases"):
+    def __init__(self, base_dir="data/codebases", shallow=True):
 
         self.base_dir = base_dir
 
+        # Fetch only the requested commit instead of the full history
+        self.shallow = shallow
+
         os.makedirs(self.base_dir, exist_ok=True)
 
-    def clone_repo(self, github_url: str) -> str:
+    def clone_repo(self, github_url: str, ref: str = None) -> str:
 
         repo_name = self._extract_repo_name(github_url)
 
         clone_path = os.path.join(self.base_dir, repo_name)
 
-        # delete if exists
-        if os.path.exists(clone_path):
+        repo = self._open_existing(clone_path, github_url)
+
+        if repo is None:
+
+            # delete if exists (different remote or not a git checkout)
+            if os.path.exists(clone_path):
+
+                shutil.rmtree(clone_path)
+
+            print(f"Cloning repo: {github_url}")
 
-            shutil.rmtree(clone_path)
+            repo = Repo.init(clone_path)
 
-        print(f"Cloning repo: {github_url}")
+            repo.create_remote("origin", github_url)
 
-        Repo.clone_from(github_url, clone_path)
+        else:
 
-        print(f"Cloned to: {clone_path}")
+            print(f"Updating cached checkout: {clone_path}")
+
+        self._checkout(repo, ref)
+
+        print(f"Checked out {ref or 'HEAD'} at {repo.head.commit.hexsha[:12]} in: {clone_path}")
 
         return clone_path
 
+    # ======================================
+    # CACHED CHECKOUT
+    # ======================================
+
+    def _open_existing(self, clone_path: str, github_url: str):
+
+        try:
+            repo = Repo(clone_path)
+        except (InvalidGitRepositoryError, NoSuchPathError):
+            return None
+
+        # Only reuse a checkout that tracks the same remote
+        if "origin" not in [remote.name for remote in repo.remotes]:
+            return None
+
+        if repo.remotes.origin.url != github_url:
+            return None
+
+        return repo
+
+    def _checkout(self, repo: Repo, ref: str = None):
+
+        # Fetch a single ref (branch, tag or commit SHA); HEAD means the
+        # remote's default branch
+        fetch_args = ["origin", ref or "HEAD"]
+
+        if self.shallow:
+            fetch_args.insert(0, "--depth=1")
+
+        repo.git.fetch(*fetch_args)
+
+        repo.git.checkout("--force", "--detach", "FETCH_HEAD")
+
+        # Drop leftovers from the previous checkout
+        repo.git.clean("-ffdx")
+
     def _extract_repo_name(self, github_url):
 
         path = urlparse(github_url).path
 
-        repo_name = os.path.basename(path)
+        repo_name = os.path.basename(path.rstrip("/"))
 
         if repo_name.endswith(".git"):
 
             repo_name = repo_name[:-4]
 
-        return repo_name
\ No newline at end of file
+        return repo_name
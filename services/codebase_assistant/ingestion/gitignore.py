@@ -0,0 +1,211 @@
+import os
+import re
+from typing import List
+
+
+# ==========================================
+# .GITIGNORE RULES FOR ONE DIRECTORY
+# ==========================================
+
+class GitIgnoreRules:
+    """
+    Patterns from a single .gitignore file.
+
+    Implements the parts of gitignore(5) that matter for scanning:
+    comments, negation (!), directory-only patterns (trailing /),
+    anchoring (a / anywhere but the end), and *, ?, [...] and ** globs.
+    Paths are matched relative to the directory holding the file.
+    """
+
+    def __init__(self, base_dir: str, lines: List[str]):
+
+        # Repo-relative posix path of the directory ("" for the root)
+        self.base_dir = base_dir
+
+        self.rules = []
+
+        for line in lines:
+
+            rule = self._parse(line)
+
+            if rule:
+                self.rules.append(rule)
+
+    @classmethod
+    def from_file(cls, path: str, base_dir: str):
+
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                return cls(base_dir, f.read().splitlines())
+        except OSError:
+            return None
+
+    # ======================================
+    # MATCH
+    # ======================================
+
+    def match(self, rel_path: str, is_dir: bool):
+        """
+        True if ignored, False if re-included by a negation,
+        None if no rule in this file applies.
+        """
+
+        if self.base_dir:
+
+            prefix = self.base_dir + "/"
+
+            if not rel_path.startswith(prefix):
+                return None
+
+            rel_path = rel_path[len(prefix):]
+
+        result = None
+
+        # Last matching rule wins
+        for regex, negate, dir_only in self.rules:
+
+            if dir_only and not is_dir:
+                continue
+
+            if regex.match(rel_path):
+                result = not negate
+
+        return result
+
+    # ======================================
+    # PARSE
+    # ======================================
+
+    def _parse(self, line: str):
+
+        line = line.rstrip("\n")
+
+        if not line.strip() or line.startswith("#"):
+            return None
+
+        # Trailing spaces are ignored unless escaped
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+
+        negate = line.startswith("!")
+
+        if negate:
+            line = line[1:]
+
+        if line.startswith("\\"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+
+        line = line.rstrip("/")
+
+        if not line:
+            return None
+
+        anchored = "/" in line
+
+        line = line.lstrip("/")
+
+        pattern = self._translate(line)
+
+        if not anchored:
+            pattern = "(?:.*/)?" + pattern
+
+        # e.g. a reversed range [z-a]; git ignores such a pattern too
+        try:
+            regex = re.compile(f"^{pattern}$")
+        except re.error as e:
+            print(f"Skipping .gitignore pattern {line!r} in {self.base_dir or '.'}: {e}")
+            return None
+
+        return regex, negate, dir_only
+
+    def _translate(self, pattern: str) -> str:
+
+        parts = []
+        i = 0
+        n = len(pattern)
+
+        while i < n:
+
+            if pattern.startswith("**/", i):
+                parts.append("(?:.*/)?")
+                i += 3
+
+            elif pattern.startswith("/**", i) and i + 3 == n:
+                parts.append("/.*")
+                i += 3
+
+            elif pattern.startswith("**", i):
+                parts.append(".*")
+                i += 2
+
+            elif pattern[i] == "*":
+                parts.append("[^/]*")
+                i += 1
+
+            elif pattern[i] == "?":
+                parts.append("[^/]")
+                i += 1
+
+            elif pattern[i] == "[":
+
+                start = i + 1
+
+                negate = start < n and pattern[start] in "!^"
+
+                if negate:
+                    start += 1
+
+                # A ] right after [ or [! is a member, not the end
+                end = pattern.find("]", start + 1 if pattern.startswith("]", start) else start)
+
+                if end == -1:
+                    parts.append(re.escape("["))
+                    i += 1
+                    continue
+
+                # Members are literal except for - ranges, so ], \ and ^
+                # never reach the regex unescaped
+                body = "".join(
+                    "-" if char == "-" else re.escape(char)
+                    for char in pattern[start:end]
+                )
+
+                parts.append(f"[{'^' if negate else ''}{body}]")
+                i = end + 1
+
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+
+        return "".join(parts)
+
+
+# ==========================================
+# STACK OF RULES ALONG THE CURRENT PATH
+# ==========================================
+
+def is_ignored(rule_sets: List[GitIgnoreRules], rel_path: str, is_dir: bool) -> bool:
+
+    ignored = False
+
+    # Deeper .gitignore files override shallower ones
+    for rules in rule_sets:
+
+        result = rules.match(rel_path, is_dir)
+
+        if result is not None:
+            ignored = result
+
+    return ignored
+
+
+def load_rules(directory: str, rel_dir: str):
+
+    path = os.path.join(directory, ".gitignore")
+
+    if not os.path.isfile(path):
+        return None
+
+    return GitIgnoreRules.from_file(path, rel_dir)
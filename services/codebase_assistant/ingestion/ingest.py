@@ -2,98 +2,86 @@ import argparse
 import os
 
 from services.codebase_assistant.ingestion.github_loader import GitHubLoader
-from services.codebase_assistant.ingestion.file_scanner import FileScanner
-from services.codebase_assistant.ingestion.chunk_extractor import ChunkExtractor
+from services.codebase_assistant.ingestion.pipeline import IngestionPipeline
 from services.codebase_assistant.vectorstore.chroma_store import ChromaStore
-from services.codebase_assistant.graph.dependency_extractor import DependencyExtractor
 
 # ==========================================
 # LOCAL INGESTION PIPELINE
 # ==========================================
 
-def ingest_local(repo_path: str, repo_name: str):
+def ingest_local(
+    repo_path: str,
+    repo_name: str,
+    workers: int = 1,
+    chunksize: int = 64,
+    batch_size: int = 256,
+    vector_store: ChromaStore = None,
+    incremental: bool = False,
+    embed_processes: int = 1,
+    scan_options: dict = None
+) -> int:
 
     print(f"\nStarting ingestion for repo: {repo_name}")
     print(f"Repo path: {repo_path}")
 
-    # Step 1: Scan files
-    scanner = FileScanner(repo_path, repo_name)
-
-    files = scanner.scan()
-
-    print(f"Total supported files found: {len(files)}")
-
-    # Step 2: Extract chunks
-    extractor = ChunkExtractor()
-
-    all_chunks = []
-
-    for file_info in files:
-
-        chunks = extractor.extract_chunks(file_info)
-
-        all_chunks.extend(chunks)
-
-    print(f"\nTotal chunks extracted: {len(all_chunks)}")
-    # Step 3: Store in Vector DB
-    print("\nStoring chunks in vector DB...")
-    vector_store = ChromaStore()
-    try:
-        vector_store.store_chunks(all_chunks)
-    except Exception as e:
-        print("\nCHROMADB ERROR:", str(e))
-        raise e
-    
-    # Step 4: Build dependency graph
-    extractor = DependencyExtractor()
-    extractor.build_graph(all_chunks)
-
-    # Debug print first few chunks
-    print("\nSample chunks:")
-
-    for chunk in all_chunks[:5]:
-        print(f"  {chunk['component_id']}")
+    if vector_store is None:
+        vector_store = ChromaStore(embedding_processes=embed_processes)
+
+    # Scan -> extract -> embed -> upsert, streamed in bounded batches
+    # (workers > 1 extracts with a process pool, 0 = all cores)
+    pipeline = IngestionPipeline(
+        vector_store=vector_store,
+        workers=workers,
+        chunksize=chunksize,
+        batch_size=batch_size,
+        scan_options=scan_options
+    )
 
-    return all_chunks
+    return pipeline.run(repo_path, repo_name, incremental=incremental)
 
 
 # ==========================================
 # GITHUB INGESTION PIPELINE
 # ==========================================
 
-def ingest_github(github_url: str):
+def ingest_github(
+    github_url: str,
+    workers: int = 1,
+    chunksize: int = 64,
+    batch_size: int = 256,
+    incremental: bool = False,
+    ref: str = None,
+    embed_processes: int = 1,
+    scan_options: dict = None
+) -> int:
 
     loader = GitHubLoader()
 
-    local_path = loader.clone_repo(github_url)
+    local_path = loader.clone_repo(github_url, ref=ref)
 
     repo_name = os.path.basename(local_path)
 
     print(f"\nRe-ingesting repo: {repo_name}")
 
-    # NEW: delete existing repo data
-    store = ChromaStore()
-
-    results = store.collection.get()
-
-    ids_to_delete = []
-    metadatas = results.get("metadatas", [])
-    ids = results.get("ids", [])
+    store = ChromaStore(embedding_processes=embed_processes)
 
-    for i, meta in enumerate(metadatas):
-
-        if meta.get("repo_name") == repo_name:
-
-            ids_to_delete.append(ids[i])
-
-    if ids_to_delete:
-
-        print(f"Deleting {len(ids_to_delete)} old chunks")
-
-        store.collection.delete(ids=ids_to_delete)
+    # Full re-ingest drops every old chunk; incremental mode diffs
+    # against the manifest and only touches changed files
+    if not incremental:
+        store.delete_repo(repo_name)
 
     # continue ingestion
-    return ingest_local(local_path, repo_name)
+    return ingest_local(
+        local_path,
+        repo_name,
+        workers=workers,
+        chunksize=chunksize,
+        batch_size=batch_size,
+        vector_store=store,
+        incremental=incremental,
+        embed_processes=embed_processes,
+        scan_options=scan_options
+    )
 
 
 # ==========================================
@@ -119,19 +107,108 @@ def main():
         help="GitHub repository URL"
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Chunk extraction processes (0 = all CPU cores)"
+    )
+
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=64,
+        help="Files per extraction task sent to a worker"
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=256,
+        help="Chunks embedded and upserted per batch"
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-ingest files whose content changed since the last run"
+    )
+
+    parser.add_argument(
+        "--ref",
+        help="Branch, tag or commit SHA to ingest (default: remote HEAD)"
+    )
+
+    parser.add_argument(
+        "--embed-processes",
+        type=int,
+        default=1,
+        help="Embedding processes (0 = all CPU cores)"
+    )
+
+    parser.add_argument(
+        "--include",
+        action="append",
+        help="Only ingest files matching this glob (repeatable)"
+    )
+
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        help="Skip files and directories matching this glob (repeatable)"
+    )
+
+    parser.add_argument(
+        "--max-file-size",
+        type=int,
+        default=1_000_000,
+        help="Skip files larger than this many bytes"
+    )
+
+    parser.add_argument(
+        "--no-gitignore",
+        action="store_true",
+        help="Do not apply .gitignore rules while scanning"
+    )
+
     args = parser.parse_args()
 
+    scan_options = {
+        "include": args.include,
+        "exclude": args.exclude,
+        "max_file_size": args.max_file_size,
+        "use_gitignore": not args.no_gitignore
+    }
+
     if args.github:
 
-        chunks = ingest_github(args.github)
+        total = ingest_github(
+            args.github,
+            workers=args.workers,
+            chunksize=args.chunksize,
+            batch_size=args.batch_size,
+            incremental=args.incremental,
+            ref=args.ref,
+            embed_processes=args.embed_processes,
+            scan_options=scan_options
+        )
 
-        print(f"\nGitHub ingestion complete. Total chunks: {len(chunks)}")
+        print(f"\nGitHub ingestion complete. Total chunks: {total}")
 
     elif args.path and args.repo:
 
-        chunks = ingest_local(args.path, args.repo)
-
-        print(f"\nLocal ingestion complete. Total chunks: {len(chunks)}")
+        total = ingest_local(
+            args.path,
+            args.repo,
+            workers=args.workers,
+            chunksize=args.chunksize,
+            batch_size=args.batch_size,
+            incremental=args.incremental,
+            embed_processes=args.embed_processes,
+            scan_options=scan_options
+        )
+
+        print(f"\nLocal ingestion complete. Total chunks: {total}")
 
     else:
 
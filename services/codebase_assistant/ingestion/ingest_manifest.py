@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+from typing import Dict
+
+from services.codebase_assistant.utils.persistence import atomic_write_json
+
+
+# ==========================================
+# PER-REPO INGEST MANIFEST
+# ==========================================
+
+class IngestManifest:
+    """
+    Content hash of every file ingested for a repo, keyed by file_path.
+
+    Comparing a fresh scan against the manifest tells incremental
+    ingestion which files were added, modified or deleted since the
+    last successful run.
+    """
+
+    def __init__(self, repo_name: str, base_dir="data/manifests"):
+
+        self.repo_name = repo_name
+
+        self.path = os.path.join(base_dir, f"{repo_name}.json")
+
+        self.files = {}
+
+        self.exists = False
+
+    # ======================================
+    # LOAD / SAVE
+    # ======================================
+
+    def load(self):
+
+        try:
+            with open(self.path) as f:
+                self.files = json.load(f).get("files", {})
+            self.exists = True
+        except FileNotFoundError:
+            self.files = {}
+            self.exists = False
+
+        return self
+
+    def save(self, files: Dict[str, str]):
+
+        # Atomic swap so a crashed ingest never leaves a half-written manifest
+        atomic_write_json(self.path, {"repo_name": self.repo_name, "files": files})
+
+        self.files = files
+        self.exists = True
+
+        print(f"Manifest saved to {self.path}")
+
+    # ======================================
+    # HASHING
+    # ======================================
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+
+        digest = hashlib.sha256()
+
+        try:
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        except OSError as e:
+            print(f"Error hashing file {file_path}: {e}")
+            return ""
+
+        return digest.hexdigest()
@@ -0,0 +1,122 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterable, Iterator, Tuple
+
+from services.codebase_assistant.ingestion.chunk_extractor import ChunkExtractor
+
+
+# ==========================================
+# WORKER (runs inside pool processes)
+# ==========================================
+
+_worker_extractor = None
+
+
+def _extract_batch(file_batch: List[Dict], repo_root: str = None) -> List[List[Dict]]:
+
+    global _worker_extractor
+
+    # One extractor per worker process, reused across batches
+    if _worker_extractor is None or _worker_extractor.repo_root != repo_root:
+        _worker_extractor = ChunkExtractor(repo_root=repo_root)
+
+    return [_worker_extractor.extract_chunks(file_info) for file_info in file_batch]
+
+
+# ==========================================
+# PARALLEL CHUNK EXTRACTOR
+# ==========================================
+
+class ParallelChunkExtractor:
+
+    def __init__(self, workers: int = 1, chunksize: int = 64):
+
+        # workers <= 0 means "use every core"
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+
+        # Number of files sent to a worker per task
+        self.chunksize = max(1, chunksize)
+
+        # Bound the number of in-flight tasks so results never pile up
+        self.max_pending = self.workers * 2
+
+    # ======================================
+    # COLLECT EVERYTHING
+    # ======================================
+
+    def extract_all(self, files: Iterable[Dict], repo_root: str = None) -> List[Dict]:
+
+        all_chunks = []
+
+        for _, chunks in self.iter_extract(files, repo_root=repo_root):
+
+            all_chunks.extend(chunks)
+
+        return all_chunks
+
+    # ======================================
+    # STREAM (file_info, chunks) IN INPUT ORDER
+    # ======================================
+
+    def iter_extract(self, files: Iterable[Dict], repo_root: str = None) -> Iterator[Tuple[Dict, List[Dict]]]:
+
+        # repo_root: what Python module names are relative to
+        if self.workers == 1:
+
+            extractor = ChunkExtractor(repo_root=repo_root)
+
+            for file_info in files:
+
+                yield file_info, extractor.extract_chunks(file_info)
+
+            return
+
+        print(f"Extracting chunks with {self.workers} workers (chunksize={self.chunksize})")
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+
+            pending = deque()
+
+            for batch in self._batches(files):
+
+                pending.append((batch, pool.submit(_extract_batch, batch, repo_root)))
+
+                if len(pending) >= self.max_pending:
+
+                    yield from self._drain_one(pending)
+
+            while pending:
+
+                yield from self._drain_one(pending)
+
+    # ======================================
+    # HELPERS
+    # ======================================
+
+    def _batches(self, files: Iterable[Dict]) -> Iterator[List[Dict]]:
+
+        batch = []
+
+        for file_info in files:
+
+            batch.append(file_info)
+
+            if len(batch) >= self.chunksize:
+
+                yield batch
+
+                batch = []
+
+        if batch:
+
+            yield batch
+
+    def _drain_one(self, pending) -> Iterator[Tuple[Dict, List[Dict]]]:
+
+        # Oldest task first, so output order matches input order
+        batch, future = pending.popleft()
+
+        for file_info, chunks in zip(batch, future.result()):
+
+            yield file_info, chunks
@@ -0,0 +1,286 @@
+from typing import List, Dict, Iterable, Iterator
+
+from tqdm import tqdm
+
+from services.codebase_assistant.ingestion.file_scanner import FileScanner
+from services.codebase_assistant.ingestion.ingest_manifest import IngestManifest
+from services.codebase_assistant.ingestion.parallel_extractor import ParallelChunkExtractor
+from services.codebase_assistant.vectorstore.chroma_store import ChromaStore
+from services.codebase_assistant.vectorstore.repo_catalog import RepoCatalog
+from services.codebase_assistant.graph.dependency_extractor import DependencyExtractor
+from services.codebase_assistant.retrieval.lexical_index import LexicalIndex
+
+
+# ==========================================
+# STREAMING INGESTION PIPELINE
+# ==========================================
+
+class IngestionPipeline:
+    """
+    scan -> extract -> embed -> upsert, one bounded batch at a time.
+
+    Every stage is a generator pulled by the stage after it, so nothing
+    runs ahead of the vector store: while a batch is being embedded and
+    upserted no further files are scanned or extracted. At most one batch
+    of chunk text (capped by batch_size and max_batch_chars) plus the
+    extractor's in-flight tasks are held in memory at any time.
+    """
+
+    def __init__(
+        self,
+        vector_store: ChromaStore = None,
+        workers: int = 1,
+        chunksize: int = 64,
+        batch_size: int = 256,
+        max_batch_chars: int = 8_000_000,
+        show_progress: bool = True,
+        scan_options: Dict = None
+    ):
+
+        self.vector_store = vector_store
+        self.extractor = ParallelChunkExtractor(workers=workers, chunksize=chunksize)
+
+        self.batch_size = batch_size
+        self.max_batch_chars = max_batch_chars
+        self.show_progress = show_progress
+
+        # Passed through to FileScanner (include, exclude, max_file_size, ...)
+        self.scan_options = scan_options or {}
+
+    # ======================================
+    # RUN
+    # ======================================
+
+    def run(self, repo_path: str, repo_name: str, incremental: bool = False) -> int:
+
+        if self.vector_store is None:
+            self.vector_store = ChromaStore()
+
+        scanner = FileScanner(repo_path, repo_name, **self.scan_options)
+        manifest = IngestManifest(repo_name).load()
+        graph_extractor = DependencyExtractor(repo_name, repo_root=repo_path)
+        catalog = RepoCatalog(repo_name)
+        lexical_index = LexicalIndex(repo_name)
+
+        file_hashes = {}
+
+        # A repo ingested before catalogs / lexical indexes existed needs
+        # one full pass
+        if (
+            incremental
+            and manifest.exists
+            and catalog.load() is not None
+            and lexical_index.load() is not None
+            and graph_extractor.has_state()
+        ):
+
+            files, stale = self._plan_incremental(scanner, manifest, file_hashes)
+
+            if not files and not stale:
+                print("\nNo changes since last ingestion")
+                return 0
+
+            catalog.remove_files(stale)
+            lexical_index.remove_files(stale)
+
+            # Patch the existing graph instead of replacing it: only
+            # edges from / into the changed files are re-resolved
+            graph_extractor.remove_files(stale)
+
+        else:
+
+            if incremental:
+                print("No manifest or index found, running full ingestion")
+                self.vector_store.delete_repo(repo_name)
+
+            graph_extractor.reset()
+
+            files = self._hash_files(scanner.iter_files(), file_hashes)
+
+        progress = tqdm(
+            desc=f"Ingesting {repo_name}",
+            unit="file",
+            disable=not self.show_progress
+        )
+
+        total_chunks = 0
+        sample_ids = []
+
+        # One background writer for the whole run: batch N is upserted
+        # while batch N+1 is extracted and embedded
+        writer = self.vector_store.start_writer()
+        writer_closed = False
+
+        try:
+
+            chunk_stream = self._iter_chunks(files, progress, graph_extractor)
+
+            for batch in self._batches(chunk_stream):
+
+                try:
+                    self.vector_store.store_chunks(
+                        batch,
+                        batch_size=self.batch_size,
+                        writer=writer
+                    )
+                except Exception as e:
+                    print("\nCHROMADB ERROR:", str(e))
+                    raise e
+
+                catalog.add_chunks(batch)
+                lexical_index.add_chunks(batch)
+
+                total_chunks += len(batch)
+
+                sample_ids.extend(
+                    chunk["component_id"] for chunk in batch[:5 - len(sample_ids)]
+                )
+
+                progress.set_postfix(chunks=total_chunks)
+
+            # close() joins the thread even when it raises
+            writer_closed = True
+
+            try:
+                writer.close()
+            except Exception as e:
+                print("\nCHROMADB ERROR:", str(e))
+                raise e
+
+        finally:
+
+            # A failed run must not leave the thread upserting queued
+            # batches or blocked on its queue
+            if not writer_closed:
+                writer.abort()
+
+            progress.close()
+
+        print(f"\nTotal chunks ingested: {total_chunks}")
+
+        self._print_embedding_stats()
+
+        graph_extractor.finalize()
+        lexical_index.save()
+
+        # Saved last: its mtime is the repo's ingest version, which
+        # invalidates cached retrievals for this repo
+        catalog.save()
+
+        # Only record hashes once everything above succeeded
+        manifest.save(file_hashes)
+
+        print("\nSample chunks:")
+
+        for component_id in sample_ids:
+            print(f"  {component_id}")
+
+        return total_chunks
+
+    def _print_embedding_stats(self):
+
+        stats = self.vector_store.embedding_stats()
+
+        encoder = stats["encoder"]
+
+        print(
+            f"Embeddings computed: {encoder['chunks']} in {encoder['seconds']}s "
+            f"({encoder['chunks_per_sec']:.1f} chunks/sec)"
+        )
+
+        cache = stats["cache"]
+
+        if cache is not None:
+
+            print(
+                f"Embedding cache: {cache['hits']} hits, {cache['misses']} misses "
+                f"({cache['hit_rate']:.0%} hit rate), {cache['evictions']} evicted, "
+                f"{cache['entries']} entries"
+            )
+
+    # ======================================
+    # INCREMENTAL PLANNING
+    # ======================================
+
+    def _plan_incremental(self, scanner: FileScanner, manifest: IngestManifest, file_hashes: Dict):
+
+        changed = []
+        modified = []
+
+        for file_info in self._hash_files(scanner.iter_files(), file_hashes):
+
+            file_path = file_info["file_path"]
+            previous = manifest.files.get(file_path)
+
+            if previous == file_hashes[file_path]:
+                continue
+
+            changed.append(file_info)
+
+            if previous is not None:
+                modified.append(file_path)
+
+        removed = [path for path in manifest.files if path not in file_hashes]
+
+        print(
+            f"Incremental ingest: {len(changed) - len(modified)} added, "
+            f"{len(modified)} modified, {len(removed)} deleted, "
+            f"{len(file_hashes) - len(changed)} unchanged"
+        )
+
+        # Old chunks of modified files may have different ids than the new
+        # ones (renamed functions), so drop them before upserting
+        stale = modified + removed
+
+        if stale:
+            self.vector_store.delete_files(scanner.repo_name, stale)
+
+        return changed, stale
+
+    # ======================================
+    # STAGES
+    # ======================================
+
+    def _hash_files(self, files: Iterable[Dict], file_hashes: Dict) -> Iterator[Dict]:
+
+        for file_info in files:
+
+            file_hashes[file_info["file_path"]] = IngestManifest.hash_file(
+                file_info["file_path"]
+            )
+
+            yield file_info
+
+    def _iter_chunks(self, files: Iterable[Dict], progress, graph_extractor) -> Iterator[Dict]:
+
+        # Workers parse each Python file once, for chunks and graph symbols
+        for file_info, chunks in self.extractor.iter_extract(files, repo_root=graph_extractor.repo_root):
+
+            progress.update(1)
+
+            # Symbols are collected per file; edges resolve in finalize()
+            graph_extractor.add_file(file_info, chunks)
+
+            yield from chunks
+
+    def _batches(self, chunks: Iterable[Dict]) -> Iterator[List[Dict]]:
+
+        batch = []
+        batch_chars = 0
+
+        for chunk in chunks:
+
+            batch.append(chunk)
+            batch_chars += len(chunk["code"])
+
+            # Flush on count or on text volume, whichever comes first,
+            # so a handful of huge files cannot blow the memory ceiling
+            if len(batch) >= self.batch_size or batch_chars >= self.max_batch_chars:
+
+                yield batch
+
+                batch = []
+                batch_chars = 0
+
+        if batch:
+            yield batch
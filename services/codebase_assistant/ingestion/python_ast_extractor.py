@@ -0,0 +1,109 @@
+import ast
+import io
+from typing import List, Dict, Optional
+
+
+class PythonAstExtractor:
+    """
+    Single-pass Python definition extractor.
+
+    The file is parsed once and every class, method and (nested) function
+    is returned with its qualified name, enclosing class and exact line
+    span, decorators included. Source text is sliced from one list of
+    lines, so the cost is linear in file size.
+    """
+
+    # ==============================
+    # PUBLIC ENTRYPOINT
+    # ==============================
+
+    def extract(self, code: str, tree=None) -> Optional[List[Dict]]:
+
+        # Callers that already parsed the file pass its tree in
+        if tree is None:
+
+            try:
+                tree = ast.parse(code)
+            except (SyntaxError, ValueError):
+                # Caller falls back to the regex extractor
+                return None
+
+        # Split on "\n" only: str.splitlines() also breaks on form feeds
+        # and \u2028, which ast line numbers do not count
+        self._lines = io.StringIO(code).readlines()
+        self._definitions = []
+        self._seen = set()
+
+        self._visit_body(tree.body, prefix="", class_name=None)
+
+        definitions = self._definitions
+
+        self._lines = None
+        self._definitions = None
+        self._seen = None
+
+        return definitions
+
+
+    # ==============================
+    # WALK
+    # ==============================
+
+    def _visit_body(self, body, prefix: str, class_name: Optional[str]):
+
+        for node in body:
+
+            if isinstance(node, ast.ClassDef):
+
+                qualname = self._add(node, "class", prefix, node.name)
+
+                self._visit_body(node.body, prefix=qualname, class_name=node.name)
+
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+
+                qualname = self._add(node, "function", prefix, class_name)
+
+                # Nested functions keep the enclosing class, if any
+                self._visit_body(node.body, prefix=qualname, class_name=class_name)
+
+            else:
+
+                # Definitions inside if/try/with/for blocks at any level
+                for field in ("body", "orelse", "finalbody", "handlers"):
+
+                    nested = getattr(node, field, None)
+
+                    if isinstance(nested, list):
+                        self._visit_body(nested, prefix, class_name)
+
+
+    def _add(self, node, kind: str, prefix: str, class_name: Optional[str]) -> str:
+
+        qualname = f"{prefix}.{node.name}" if prefix else node.name
+
+        start_line = min(
+            [node.lineno] + [decorator.lineno for decorator in node.decorator_list]
+        )
+        end_line = node.end_lineno
+
+        # Redefinitions (property setters, conditional defs) must not
+        # collide on chunk id
+        component_id = qualname
+
+        if component_id in self._seen:
+            component_id = f"{qualname}@{start_line}"
+
+        self._seen.add(component_id)
+
+        self._definitions.append({
+            "kind": kind,
+            "name": node.name,
+            "qualname": qualname,
+            "component_id": component_id,
+            "class_name": class_name,
+            "start_line": start_line,
+            "end_line": end_line,
+            "code": "".join(self._lines[start_line - 1:end_line])
+        })
+
+        return qualname
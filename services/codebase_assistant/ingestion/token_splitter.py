@@ -0,0 +1,80 @@
+from typing import List, Tuple
+
+import tiktoken
+
+
+class TokenWindowSplitter:
+    """
+    Splits oversized text into overlapping token windows.
+
+    all-MiniLM-L6-v2 only looks at the first ~256 tokens of a document,
+    so embedding a whole large file wastes time and storage on a tail
+    the vector never sees. Windows are capped at max_windows per text;
+    anything past that is dropped and reported as truncated.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 256,
+        overlap: int = 32,
+        max_windows: int = 32,
+        encoding_name: str = "cl100k_base"
+    ):
+
+        if overlap >= max_tokens:
+            raise ValueError("overlap must be smaller than max_tokens")
+
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+        self.max_windows = max_windows
+        self.encoding_name = encoding_name
+
+        self._encoding = None
+
+    # ==============================
+    # PUBLIC ENTRYPOINT
+    # ==============================
+
+    def split(self, text: str) -> Tuple[List[str], bool]:
+
+        # A token is at least one character, so short text never needs
+        # to be encoded at all
+        if len(text) <= self.max_tokens:
+            return [text], False
+
+        stride = self.max_tokens - self.overlap
+
+        token_limit = self.max_tokens + (self.max_windows - 1) * stride
+
+        # Only encode the prefix that can end up in a window; ~4 chars per
+        # token on code, 10 leaves plenty of headroom
+        prefix = text[:token_limit * 10]
+
+        tokens = self.encoding.encode(prefix, disallowed_special=())
+
+        if len(tokens) <= self.max_tokens and len(prefix) == len(text):
+            return [text], False
+
+        truncated = len(prefix) < len(text) or len(tokens) > token_limit
+
+        tokens = tokens[:token_limit]
+
+        windows = []
+
+        for start in range(0, len(tokens), stride):
+
+            windows.append(self.encoding.decode(tokens[start:start + self.max_tokens]))
+
+            if start + self.max_tokens >= len(tokens):
+                break
+
+        return windows, truncated
+
+    @property
+    def encoding(self):
+
+        # Loaded lazily so pool workers that never split pay nothing
+        if self._encoding is None:
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+
+        return self._encoding
@@ -0,0 +1,124 @@
+from typing import List, Tuple, Dict
+
+import tiktoken
+
+
+class ContextPacker:
+    """
+    Fits retrieved chunks into a fixed prompt token budget.
+
+    Chunks arrive most relevant first. Exact duplicates and chunks whose
+    text already sits inside a larger chunk that will be kept whole are
+    dropped, over-long chunks are cut to max_chunk_tokens, and packing
+    stops adding a chunk once the budget cannot hold it.
+    """
+
+    TRUNCATION_MARKER = "\n... [truncated]"
+
+    def __init__(
+        self,
+        max_tokens: int = 6000,
+        max_chunk_tokens: int = 1500,
+        min_chunk_tokens: int = 64,
+        encoding_name: str = "o200k_base"
+    ):
+
+        self.max_tokens = max_tokens
+        self.max_chunk_tokens = max_chunk_tokens
+        self.min_chunk_tokens = min_chunk_tokens
+        self.encoding_name = encoding_name
+
+        self._encoding = None
+
+    # ==============================
+    # PUBLIC ENTRYPOINT
+    # ==============================
+
+    def pack(self, chunks: List[str], reserved_tokens: int = 0) -> Tuple[List[str], Dict]:
+
+        budget = self.max_tokens - reserved_tokens
+
+        # Exact duplicates first, keeping the best-ranked copy
+        candidates = [chunk for chunk in dict.fromkeys(chunks) if chunk and chunk.strip()]
+
+        tokens = [self._encode(chunk) for chunk in candidates]
+
+        # Only a chunk that goes in untrimmed can stand in for another
+        whole = [
+            chunk for chunk, chunk_tokens in zip(candidates, tokens)
+            if chunk_tokens[1] and len(chunk_tokens[0]) <= self.max_chunk_tokens
+        ]
+
+        packed = []
+        used = 0
+
+        stats = {
+            "chunks_in": len(chunks),
+            "duplicates": len(chunks) - len(candidates),
+            "contained": 0,
+            "trimmed": 0,
+            "skipped": 0
+        }
+
+        for chunk, (chunk_tokens, complete) in zip(candidates, tokens):
+
+            if any(len(other) > len(chunk) and chunk in other for other in whole):
+                stats["contained"] += 1
+                continue
+
+            limit = min(self.max_chunk_tokens, budget - used)
+
+            if complete and len(chunk_tokens) <= limit:
+
+                packed.append(chunk)
+                used += len(chunk_tokens)
+
+                continue
+
+            # Too long for the per-chunk cap or the space that is left:
+            # keep the head if enough room remains to be worth it
+            if limit < self.min_chunk_tokens:
+                stats["skipped"] += 1
+                continue
+
+            packed.append(self._trim(chunk_tokens, limit))
+            used += limit
+
+            stats["trimmed"] += 1
+
+        stats["chunks_packed"] = len(packed)
+        stats["tokens"] = used + reserved_tokens
+
+        return packed, stats
+
+    def count_tokens(self, text: str) -> int:
+
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    # ==============================
+    # HELPERS
+    # ==============================
+
+    def _encode(self, text: str):
+
+        # Nothing past max_chunk_tokens can be used, so only encode a
+        # prefix of long texts; ~4 chars per token on code, 10 is ample
+        prefix = text[:self.max_chunk_tokens * 10]
+
+        tokens = self.encoding.encode(prefix, disallowed_special=())
+
+        return tokens, len(prefix) == len(text)
+
+    def _trim(self, tokens, limit):
+
+        marker_tokens = self.count_tokens(self.TRUNCATION_MARKER)
+
+        return self.encoding.decode(tokens[:max(limit - marker_tokens, 0)]) + self.TRUNCATION_MARKER
+
+    @property
+    def encoding(self):
+
+        if self._encoding is None:
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+
+        return self._encoding
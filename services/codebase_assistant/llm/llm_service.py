@@ -1,9 +1,14 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from openai import OpenAI
 from dotenv import load_dotenv
 
 from services.codebase_assistant.retrieval.intent_router import IntentRouter
-from services.codebase_assistant.retrieval.hybrid_retriever import HybridRetriever
+from services.codebase_assistant.retrieval.hybrid_retriever import HybridRetriever, CATALOG_INTENTS, GRAPH_INTENTS
+from services.codebase_assistant.retrieval.reranker import CrossEncoderReranker
+from services.codebase_assistant.llm.context_packer import ContextPacker
+from services.codebase_assistant.utils.stage_timer import StageTimer, TimingStats
 
 
 # =====================================
@@ -13,13 +18,28 @@ from services.codebase_assistant.retrieval.hybrid_retriever import HybridRetriev
 load_dotenv()
 
 
+# /ask/batch limits, whatever the caller asks: questions per request and
+# concurrent intent / LLM calls per batch
+MAX_BATCH_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+MAX_BATCH_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+
+
 # =====================================
 # LLM SERVICE
 # =====================================
 
 class LLMService:
 
-    def __init__(self):
+    def __init__(
+        self,
+        context_tokens=6000,
+        chunk_tokens=1500,
+        rerank=False,
+        rerank_top_n=8,
+        rerank_budget_ms=300,
+        speculative_workers=40,
+        expand_mode="bfs"
+    ):
 
         print("Initializing LLM Service...")
 
@@ -27,9 +47,37 @@ class LLMService:
             api_key=os.getenv("OPENAI_API_KEY")
         )
 
-        self.retriever = HybridRetriever()
+        self.retriever = HybridRetriever(expand_mode=expand_mode)
+
+        # Classifies locally on the retriever's already-loaded MiniLM
+        self.intent_router = IntentRouter(vector_store=self.retriever.vector_store)
+
+        # Fits retrieved chunks into a prompt token budget
+        self.context_packer = ContextPacker(
+            max_tokens=context_tokens,
+            max_chunk_tokens=chunk_tokens
+        )
+
+        # Optional cross-encoder pass between retrieval and context
+        self.reranker = None
 
-        self.intent_router = IntentRouter()
+        if rerank:
+
+            self.reranker = CrossEncoderReranker(
+                top_n=rerank_top_n,
+                budget_ms=rerank_budget_ms
+            )
+
+        # Runs the speculative retrieval next to intent detection; sized
+        # like FastAPI's sync-endpoint thread pool (40), so concurrent
+        # requests do not queue behind each other's speculations
+        self._executor = ThreadPoolExecutor(
+            max_workers=speculative_workers,
+            thread_name_prefix="speculative-retrieval"
+        )
+
+        # Per-stage latency across requests
+        self.timing_stats = TimingStats()
 
         print("LLM Service ready")
 
@@ -45,11 +93,37 @@ class LLMService:
         print(f"Question: {question}")
         print("===================================")
 
-        # STEP 1: Detect intent
-        intent = self.intent_router.detect_intent(question)
+        timer = StageTimer()
+
+        try:
+            return self._ask(question, repo_name, timer)
+        finally:
+            timer.finish()
+            self.timing_stats.add(timer.stages)
+            print(f"Timings: {timer.summary()}")
+
+
+    def _ask(self, question, repo_name, timer):
+
+        # STEP 1: Detect intent, with a semantic retrieval running
+        # alongside it in case the intent turns out to need one
+        speculative = self._executor.submit(
+            self._timed_retrieve, question, repo_name, "specific"
+        )
+
+        with timer.stage("intent"):
+            intent = self.intent_router.detect_intent(question)
 
         print(f"Detected intent: {intent}")
 
+        # Catalog intents do not use the query and usage questions are
+        # answered from the graph; everything else takes the same
+        # semantic path the speculative retrieval did
+        keep_speculative = intent not in CATALOG_INTENTS + GRAPH_INTENTS
+
+        if not keep_speculative:
+            speculative.cancel()
+
 
         # =====================================
         # STEP 2: API INTENT → USE STRUCTURED SUMMARY
@@ -61,26 +135,10 @@ class LLMService:
 
             if api_summary:
 
-                prompt = f"""
-You are a senior backend architect.
-
-Use the API SUMMARY below to answer the question.
-
-API SUMMARY:
-{api_summary}
+                prompt = self._build_api_prompt(question, api_summary)
 
-QUESTION:
-{question}
-
-Instructions:
-- List APIs clearly
-- Include HTTP method and path
-- Do NOT hallucinate
-
-ANSWER:
-"""
-
-                return self._call_llm(prompt)
+                with timer.stage("llm"):
+                    return self._call_llm(prompt)
 
             else:
                 print("No API metadata found, falling back to retrieval")
@@ -90,23 +148,64 @@ ANSWER:
         # STEP 3: RETRIEVE CHUNKS
         # =====================================
 
+        # Still queued behind other requests' speculations: running it
+        # here is faster than waiting for a worker to pick it up
+        if keep_speculative and speculative.cancel():
+
+            print("Speculative retrieval not started, running inline")
+
+            keep_speculative = False
+
+        if keep_speculative:
+
+            with timer.stage("retrieval_wait"):
+                chunks, retrieval_ms = speculative.result()
+
+            timer.record("retrieval", retrieval_ms)
+
+            # Retrieval time hidden behind intent detection
+            timer.record("speculation_saved", retrieval_ms - timer.stages["retrieval_wait"])
+
+        else:
+
+            chunks, retrieval_ms = self._timed_retrieve(question, repo_name, intent)
+
+            timer.record("retrieval", retrieval_ms)
+
+        print(f"Chunks retrieved: {len(chunks)}")
+
+        if not chunks:
+            return "No relevant information found in this repository."
+
+        return self._answer_from_chunks(question, repo_name, chunks, timer, intent=intent)
+
+
+    def _timed_retrieve(self, question, repo_name, intent):
+
+        start = time.perf_counter()
+
         chunks = self.retriever.retrieve(
             query=question,
             repo_name=repo_name,
             intent=intent
         )
 
-        print(f"Chunks retrieved: {len(chunks)}")
+        return chunks, (time.perf_counter() - start) * 1000
 
-        if not chunks:
-            return "No relevant information found in this repository."
 
+    def _answer_from_chunks(self, question, repo_name, chunks, timer=None, intent=None):
+
+        timer = timer or StageTimer()
 
         # =====================================
         # STEP 4: BUILD CONTEXT
         # =====================================
 
-        context = self._build_context(chunks, repo_name)
+        with timer.stage("rerank"):
+            chunks = self._rerank(question, chunks, intent)
+
+        with timer.stage("context"):
+            context = self._build_context(chunks, repo_name)
 
         print("\nContext preview:")
         print(context[:500])
@@ -120,7 +219,151 @@ ANSWER:
 
 
         # STEP 6: CALL LLM
-        return self._call_llm(prompt)
+        with timer.stage("llm"):
+            return self._call_llm(prompt)
+
+
+    # =====================================
+    # BATCH ENTRYPOINT
+    # =====================================
+
+    def ask_batch(self, items, max_concurrency: int = 8):
+        """
+        items: [{"repo_name": ..., "question": ...}, ...]
+
+        Returns one {"repo_name", "question", "answer", "error"} dict per
+        item, in input order. A failing item records its error and never
+        fails the others.
+        """
+
+        print(f"\nBatch of {len(items)} questions")
+
+        results = [
+            {
+                "repo_name": item["repo_name"],
+                "question": item["question"],
+                "answer": None,
+                "error": None
+            }
+            for item in items
+        ]
+
+        max_concurrency = min(max(1, max_concurrency), MAX_BATCH_CONCURRENCY)
+
+        # STEP 1: every question through the embedding model in one call;
+        # intent detection and retrieval then hit the query cache
+        self.retriever.vector_store.embed_queries([item["question"] for item in items])
+
+        prompts = [None] * len(items)
+        pending = []
+
+        # Bounded so we stay under rate limits: intent detection may fall
+        # back to the LLM, and every answer is an LLM call
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+
+            # STEP 2: intents, then API-summary prompts where they apply
+            futures = {
+                executor.submit(self._detect_batch_intent, item): i
+                for i, item in enumerate(items)
+            }
+
+            for future in as_completed(futures):
+
+                i = futures[future]
+
+                try:
+                    intent, prompts[i] = future.result()
+                except Exception as e:
+                    results[i]["error"] = str(e)
+                    continue
+
+                if prompts[i] is None:
+                    pending.append((i, intent))
+
+            # Input order, so grouped retrieval is deterministic
+            pending.sort()
+
+            # STEP 3: grouped retrieval for everything else
+            retrieved = self._retrieve_batch(items, pending, results)
+
+            intents = dict(pending)
+
+            for i, chunks in retrieved.items():
+
+                if not chunks:
+                    results[i]["answer"] = "No relevant information found in this repository."
+                    continue
+
+                try:
+                    chunks = self._rerank(items[i]["question"], chunks, intents[i])
+                    context = self._build_context(chunks, items[i]["repo_name"])
+                    prompts[i] = self._build_prompt(items[i]["question"], context)
+                except Exception as e:
+                    results[i]["error"] = str(e)
+
+            # STEP 4: LLM calls in parallel
+            futures = {
+                executor.submit(self._call_llm, prompt): i
+                for i, prompt in enumerate(prompts)
+                if prompt is not None
+            }
+
+            for future in as_completed(futures):
+
+                i = futures[future]
+
+                try:
+                    results[i]["answer"] = future.result()
+                except Exception as e:
+                    results[i]["error"] = str(e)
+
+        failed = sum(1 for result in results if result["error"])
+
+        print(f"Batch done: {len(items) - failed} answered, {failed} failed")
+
+        return results
+
+    def _detect_batch_intent(self, item):
+
+        # -> (intent, API-summary prompt or None when retrieval is needed)
+        intent = self.intent_router.detect_intent(item["question"])
+
+        if intent == "api":
+
+            api_summary = self._build_api_summary(item["repo_name"])
+
+            if api_summary:
+                return intent, self._build_api_prompt(item["question"], api_summary)
+
+        return intent, None
+
+    def _retrieve_batch(self, items, pending, results):
+
+        requests = [
+            (items[i]["question"], items[i]["repo_name"], intent)
+            for i, intent in pending
+        ]
+
+        try:
+
+            chunk_lists = self.retriever.retrieve_batch(requests)
+
+            return {i: chunks for (i, _), chunks in zip(pending, chunk_lists)}
+
+        except Exception as e:
+
+            print(f"Batch retrieval failed ({e}), retrieving one by one")
+
+        retrieved = {}
+
+        for (i, intent), (query, repo_name, _) in zip(pending, requests):
+
+            try:
+                retrieved[i] = self.retriever.retrieve(query=query, repo_name=repo_name, intent=intent)
+            except Exception as e:
+                results[i]["error"] = str(e)
+
+        return retrieved
 
 
     # =====================================
@@ -151,55 +394,74 @@ ANSWER:
             ]
         )
 
+        usage = getattr(response, "usage", None)
+
+        if usage is not None:
+            print(
+                f"LLM tokens: prompt={usage.prompt_tokens} "
+                f"completion={usage.completion_tokens} total={usage.total_tokens}"
+            )
+
         return response.choices[0].message.content.strip()
 
 
     # =====================================
-    # BUILD CONTEXT
+    # RERANK
     # =====================================
 
-    def _build_context(self, chunks, repo_name):
+    def _rerank(self, question, chunks, intent=None):
 
-        results = self.retriever.vector_store.collection.get()
+        if self.reranker is None:
+            return chunks
 
-        metas = results.get("metadatas", [])
+        # Catalog chunks are picked by kind, not by the question, and a
+        # usage answer leads with its call-tree summary: a relevance
+        # score would only reorder or drop them
+        if intent in CATALOG_INTENTS + GRAPH_INTENTS:
+            return chunks
 
-        context_parts = []
+        try:
+            return self.reranker.rerank(question, chunks)
+        except Exception as e:
+            print(f"Rerank failed ({e}), keeping retrieval order")
+            return chunks[:self.reranker.top_n]
 
 
-        # STEP 1: ADD API SUMMARY
+    # =====================================
+    # BUILD CONTEXT
+    # =====================================
 
-        api_lines = []
+    def _build_context(self, chunks, repo_name):
 
-        for meta in metas:
+        context_parts = []
 
-            if meta.get("repo_name") != repo_name:
-                continue
 
-            routes = meta.get("api_routes")
+        # STEP 1: ADD API SUMMARY (catalog lookup, no DB scan)
 
-            if routes and isinstance(routes, list):
+        api_lines = self._api_routes(repo_name)
 
-                for route in routes:
+        if api_lines:
 
-                    method = route.get("method")
-                    path = route.get("path")
+            context_parts.append("API ENDPOINT SUMMARY:")
+            context_parts.append("\n".join(api_lines))
+            context_parts.append("\n")
 
-                    if method and path:
-                        api_lines.append(f"{method} {path}")
+        context_parts.append("RELEVANT CODE:")
 
 
-        if api_lines:
+        # STEP 2: PACK CODE INTO WHAT IS LEFT OF THE TOKEN BUDGET
 
-            context_parts.append("API ENDPOINT SUMMARY:")
-            context_parts.append("\n".join(sorted(set(api_lines))))
-            context_parts.append("\n")
+        reserved = self.context_packer.count_tokens("\n".join(context_parts))
 
+        packed, stats = self.context_packer.pack(chunks, reserved_tokens=reserved)
 
-        # STEP 2: ADD CODE
+        print(
+            f"Context: {stats['tokens']} tokens, {stats['chunks_packed']}/{stats['chunks_in']} chunks "
+            f"(duplicates {stats['duplicates']}, contained {stats['contained']}, "
+            f"trimmed {stats['trimmed']}, skipped {stats['skipped']})"
+        )
 
-        context_parts.append("RELEVANT CODE:")
-        context_parts.append("\n\n".join(chunks[:10]))
+        context_parts.append("\n\n".join(packed))
 
         return "\n".join(context_parts)
 
@@ -208,6 +470,28 @@ ANSWER:
     # BUILD PROMPT
     # =====================================
 
+    def _build_api_prompt(self, question, api_summary):
+
+        return f"""
+You are a senior backend architect.
+
+Use the API SUMMARY below to answer the question.
+
+API SUMMARY:
+{api_summary}
+
+QUESTION:
+{question}
+
+Instructions:
+- List APIs clearly
+- Include HTTP method and path
+- Do NOT hallucinate
+
+ANSWER:
+"""
+
+
     def _build_prompt(self, question, context):
 
         return f"""
@@ -246,41 +530,31 @@ ANSWER:
 
     def _build_api_summary(self, repo_name: str):
 
-        results = self.retriever.vector_store.collection.get()
-
-        metas = results.get("metadatas", [])
-
-        api_set = set()
-
-        for meta in metas:
+        api_list = self._api_routes(repo_name)
 
-            if meta.get("repo_name") != repo_name:
-                continue
-
-            routes = meta.get("api_routes")
-
-            if routes and isinstance(routes, list):
-
-                for route in routes:
+        if not api_list:
+            return None
 
-                    method = route.get("method")
-                    path = route.get("path")
+        summary = f"Total APIs: {len(api_list)}\n\n"
 
-                    if method and path:
-                        api_set.add(f"{method} {path}")
+        summary += "API Endpoints:\n"
 
+        for api in api_list:
+            summary += f"- {api}\n"
 
-        if not api_set:
-            return None
+        return summary
 
 
-        api_list = sorted(api_set)
+    # =====================================
+    # API ROUTES FROM CATALOG
+    # =====================================
 
-        summary = f"Total APIs: {len(api_list)}\n\n"
+    def _api_routes(self, repo_name: str):
 
-        summary += "API Endpoints:\n"
+        # Sorted "METHOD /path" strings recorded at ingest time
+        catalog = self.retriever.catalogs.get(repo_name)
 
-        for api in api_list:
-            summary += f"- {api}\n"
+        if catalog is None:
+            return []
 
-        return summary
\ No newline at end of file
+        return catalog.all_api_routes()
@@ -1,19 +1,85 @@
-import json
+import re
 from typing import List, Dict
 
 from services.codebase_assistant.vectorstore.chroma_store import ChromaStore
+from services.codebase_assistant.vectorstore.repo_catalog import CatalogRegistry
+from services.codebase_assistant.retrieval.lexical_index import LexicalIndexRegistry
+from services.codebase_assistant.graph.graph_store import GraphStoreRegistry
+from services.codebase_assistant.graph.graph_ranker import PersonalizedPageRank
+from services.codebase_assistant.utils.lru_cache import LRUCache
+
+
+# Intents served from the catalog; the query text does not change them
+CATALOG_INTENTS = ("overview", "setup", "api", "architecture", "dependency")
+
+# Intents answered from the graph's reverse index, without a vector query
+GRAPH_INTENTS = ("usage",)
+
+# Question words never taken for the symbol a usage question is about
+USAGE_STOPWORDS = {
+    "where", "who", "what", "which", "is", "are", "was", "does", "do", "the",
+    "a", "an", "of", "in", "by", "on", "from", "to", "all", "find", "show",
+    "used", "uses", "use", "usage", "usages", "called", "calls", "call",
+    "callers", "caller", "imported", "imports", "import", "depends", "site",
+    "sites", "function", "method", "class", "module", "would", "break",
+    "if", "changed", "change", "instantiated"
+}
 
 
 class HybridRetriever:
 
-    def __init__(self, graph_path="data/graph/graph.json"):
+    def __init__(
+        self,
+        graph_dir="data/graph",
+        cache_size=1024,
+        cache_ttl=600,
+        expand_mode="bfs",
+        graph_top_n=10,
+        graph_weight=1.0,
+        graph_max_nodes=2000,
+        graph_budget_ms=30,
+        usage_depth=3,
+        usage_limit=15
+    ):
 
         print("Initializing Hybrid Retriever...")
 
         self.vector_store = ChromaStore()
-        self.graph = self._load_graph(graph_path)
 
-        print(f"Graph loaded with {len(self.graph)} nodes")
+        # Per-repo CSR dependency graphs, memory-mapped on first use
+        self.graphs = GraphStoreRegistry(graph_dir)
+
+        # "bfs": every neighbour up to expand_k hops, unranked
+        # "ppr": top graph_top_n nodes by personalized PageRank from the
+        #        hits, fused into the final ranking by score; the best
+        #        node counts like a rank-1 hit times graph_weight
+        self.expand_mode = expand_mode
+        self.graph_top_n = graph_top_n
+        self.graph_weight = graph_weight
+
+        self.graph_ranker = PersonalizedPageRank(
+            max_nodes=graph_max_nodes,
+            budget_ms=graph_budget_ms
+        )
+
+        # Usage questions: callers followed up to usage_depth hops,
+        # at most usage_limit chunks returned
+        self.usage_depth = usage_depth
+        self.usage_limit = usage_limit
+
+        # Per-repo chunk-id catalogs for the intent paths
+        self.catalogs = CatalogRegistry()
+
+        # Per-repo BM25 indexes, fused with vector hits
+        self.lexical_indexes = LexicalIndexRegistry()
+
+        # (repo, ingest version, intent, query, top_k, expand_k) -> chunks
+        self.result_cache = LRUCache(max_entries=cache_size, ttl=cache_ttl)
+
+        # repo_name -> last ingest version seen
+        self._repo_versions = {}
+
+        print("Hybrid Retriever ready")
 
 
     # =====================================
@@ -33,6 +99,77 @@ class HybridRetriever:
         print(f"Repo: {repo_name}")
         print(f"Intent: {intent}")
 
+        key = self._cache_key(query, repo_name, intent, top_k, expand_k)
+
+        cached = self.result_cache.get(key)
+
+        if cached is not None:
+            print(f"Retrieval cache hit ({len(cached)} chunks)")
+            return list(cached)
+
+        chunks = self._retrieve(query, repo_name, intent, top_k, expand_k)
+
+        self.result_cache.put(key, list(chunks))
+
+        return chunks
+
+    def retrieve_batch(self, requests, top_k: int = 5, expand_k: int = 2):
+        """
+        requests: [(query, repo_name, intent), ...] -> chunk lists in order.
+
+        Semantic misses are grouped per repo so each repo costs one
+        embedding call and one Chroma query, however many questions.
+        """
+
+        results = [None] * len(requests)
+        keys = [None] * len(requests)
+
+        # Indexes of requests that missed the result cache
+        fresh = []
+
+        # repo_name -> indexes of uncached semantic requests
+        semantic = {}
+
+        for i, (query, repo_name, intent) in enumerate(requests):
+
+            keys[i] = self._cache_key(query, repo_name, intent, top_k, expand_k)
+
+            cached = self.result_cache.get(keys[i])
+
+            if cached is not None:
+                results[i] = list(cached)
+                continue
+
+            fresh.append(i)
+
+            if keys[i][2] == "semantic":
+                semantic.setdefault(repo_name, []).append(i)
+            else:
+                results[i] = self._retrieve(query, repo_name, intent, top_k, expand_k)
+
+        for repo_name, indexes in semantic.items():
+
+            hits = self.vector_store.search_batch(
+                [requests[i][0] for i in indexes],
+                repo_name,
+                top_k=top_k
+            )
+
+            for i, hit in zip(indexes, hits):
+
+                results[i] = self._retrieve_semantic_graph(
+                    requests[i][0], repo_name, top_k, expand_k, semantic=hit
+                )
+
+        for i in fresh:
+            self.result_cache.put(keys[i], list(results[i]))
+
+        print(f"Batch retrieved for {len(requests)} queries ({sum(len(v) for v in semantic.values())} semantic)")
+
+        return results
+
+    def _retrieve(self, query, repo_name, intent, top_k, expand_k):
+
         if intent == "overview":
             return self._retrieve_overview(repo_name)
 
@@ -48,18 +185,82 @@ class HybridRetriever:
         elif intent == "dependency":
             return self._retrieve_dependencies(repo_name)
 
+        elif intent == "usage":
+
+            chunks = self._retrieve_usages(query, repo_name)
+
+            if chunks:
+                return chunks
+
+            print("No usage target found in the graph, falling back to retrieval")
+
         return self._retrieve_semantic_graph(query, repo_name, top_k, expand_k)
 
 
+    # =====================================
+    # RESULT CACHE
+    # =====================================
+
+    def _cache_key(self, query, repo_name, intent, top_k, expand_k):
+
+        version = self.catalogs.version(repo_name)
+
+        # Re-ingested: drop every cached result for the old contents
+        if self._repo_versions.get(repo_name, version) != version:
+
+            dropped = self.result_cache.invalidate(lambda key: key[0] == repo_name)
+
+            print(f"Repo {repo_name} re-ingested, dropped {dropped} cached results")
+
+        self._repo_versions[repo_name] = version
+
+        if intent in CATALOG_INTENTS:
+            return (repo_name, version, intent, None, None, None)
+
+        # Usage answers depend on the exact symbol, so case is kept
+        if intent in GRAPH_INTENTS:
+            return (repo_name, version, intent, " ".join(query.split()), None, None)
+
+        # Every other intent takes the same semantic path; the embedding
+        # model and the BM25 tokenizer are both case-insensitive
+        normalized = " ".join(query.lower().split())
+
+        return (repo_name, version, "semantic", normalized, top_k, expand_k)
+
+    def cache_stats(self):
+
+        return {
+            "retrieval": self.result_cache.stats(),
+            "query_embeddings": self.vector_store.query_cache.stats()
+        }
+
+
     # =====================================
     # API RETRIEVAL — FIXED VERSION
     # =====================================
 
     def _retrieve_api(self, repo_name):
 
-        print("Scanning vector DB for API metadata...")
+        catalog = self.catalogs.get(repo_name)
 
-        results = self.vector_store.collection.get()
+        if catalog is not None:
+
+            results = self._fetch_ids(
+                repo_name,
+                catalog.ids("api", limit=20),
+                include=("documents", "metadatas")
+            )
+
+        else:
+
+            print("Querying vector DB for API metadata...")
+
+            # is_api is set exactly when api_routes is, so Chroma can filter
+            results = self.vector_store.get_repo_chunks(
+                repo_name,
+                where={"is_api": True},
+                limit=20
+            )
 
         docs = results.get("documents", [])
         metas = results.get("metadatas", [])
@@ -68,11 +269,7 @@ class HybridRetriever:
 
         for i, meta in enumerate(metas):
 
-            if meta.get("repo_name") != repo_name:
-                continue
-
             api_routes = meta.get("api_routes")
-            is_api = meta.get("is_api", False)
 
             # CRITICAL FIX: use api_routes metadata
             if api_routes and api_routes != "None":
@@ -103,30 +300,30 @@ CODE:
 
     def _retrieve_overview(self, repo_name):
 
-        results = self.vector_store.collection.get()
+        catalog = self.catalogs.get(repo_name)
 
-        docs = results["documents"]
-        metas = results["metadatas"]
+        if catalog is not None:
 
-        chunks = []
+            ids = catalog.ids("readme", "entrypoint", "file", "class", limit=15)
 
-        for i, meta in enumerate(metas):
+            chunks = self._fetch_ids(repo_name, ids)["documents"]
 
-            if meta["repo_name"] != repo_name:
-                continue
+        else:
 
-            file = meta.get("file_name", "").lower()
+            # README, main.py, app.py and server.py are all file-level
+            # chunks, so the file/class filter already covers them
+            results = self.vector_store.get_repo_chunks(
+                repo_name,
+                where={"chunk_type": {"$in": ["file", "class"]}},
+                include=("documents",),
+                limit=15
+            )
 
-            if (
-                "readme" in file
-                or file in ["main.py", "app.py", "server.py"]
-                or meta.get("chunk_type") in ["file", "class"]
-            ):
-                chunks.append(docs[i])
+            chunks = results["documents"]
 
         print(f"Overview chunks: {len(chunks)}")
 
-        return chunks[:15]
+        return chunks
 
 
     # =====================================
@@ -135,30 +332,15 @@ CODE:
 
     def _retrieve_setup(self, repo_name):
 
-        results = self.vector_store.collection.get()
-
-        docs = results["documents"]
-        metas = results["metadatas"]
-
-        chunks = []
-
-        for i, meta in enumerate(metas):
-
-            if meta["repo_name"] != repo_name:
-                continue
-
-            file = meta.get("file_name", "").lower()
-
-            if (
-                "readme" in file
-                or "requirements" in file
-                or "dockerfile" in file
-            ):
-                chunks.append(docs[i])
+        chunks = self._fetch_file_chunks_by_name(
+            repo_name,
+            ["readme", "requirements", "dockerfile"],
+            limit=15
+        )
 
         print(f"Setup chunks: {len(chunks)}")
 
-        return chunks[:15]
+        return chunks
 
 
     # =====================================
@@ -167,24 +349,28 @@ CODE:
 
     def _retrieve_architecture(self, repo_name):
 
-        results = self.vector_store.collection.get()
+        catalog = self.catalogs.get(repo_name)
 
-        docs = results["documents"]
-        metas = results["metadatas"]
+        if catalog is not None:
 
-        chunks = []
+            ids = catalog.ids("file", "class", limit=15)
 
-        for i, meta in enumerate(metas):
+            chunks = self._fetch_ids(repo_name, ids)["documents"]
 
-            if meta["repo_name"] != repo_name:
-                continue
+        else:
+
+            results = self.vector_store.get_repo_chunks(
+                repo_name,
+                where={"chunk_type": {"$in": ["file", "class"]}},
+                include=("documents",),
+                limit=15
+            )
 
-            if meta.get("chunk_type") in ["file", "class"]:
-                chunks.append(docs[i])
+            chunks = results["documents"]
 
         print(f"Architecture chunks: {len(chunks)}")
 
-        return chunks[:15]
+        return chunks
 
 
     # =====================================
@@ -193,71 +379,213 @@ CODE:
 
     def _retrieve_dependencies(self, repo_name):
 
-        results = self.vector_store.collection.get()
+        chunks = self._fetch_file_chunks_by_name(
+            repo_name,
+            ["requirements"],
+            limit=10
+        )
 
-        docs = results["documents"]
-        metas = results["metadatas"]
+        print(f"Dependency chunks: {len(chunks)}")
 
-        chunks = []
+        return chunks
 
-        for i, meta in enumerate(metas):
 
-            if meta["repo_name"] != repo_name:
-                continue
+    # =====================================
+    # FILE-NAME LOOKUP
+    # =====================================
+
+    def _fetch_file_chunks_by_name(self, repo_name, name_parts, limit):
+
+        # Catalog categories are named after the same file-name parts
+        catalog = self.catalogs.get(repo_name)
+
+        if catalog is not None:
+
+            ids = catalog.ids(*name_parts, limit=limit)
+
+            return self._fetch_ids(repo_name, ids)["documents"]
+
+        # Chroma has no substring filter on metadata, so project only the
+        # file_name of this repo's file-level chunks, match here, then
+        # fetch documents for the matching ids alone
+        results = self.vector_store.get_repo_chunks(
+            repo_name,
+            where={"chunk_type": "file"},
+            include=("metadatas",)
+        )
+
+        ids = []
+
+        for chunk_id, meta in zip(results["ids"], results["metadatas"]):
 
             file = meta.get("file_name", "").lower()
 
-            if "requirements" in file:
-                chunks.append(docs[i])
+            if any(part in file for part in name_parts):
+                ids.append(chunk_id)
 
-        print(f"Dependency chunks: {len(chunks)}")
+                if len(ids) >= limit:
+                    break
 
-        return chunks[:10]
+        return self._fetch_ids(repo_name, ids)["documents"]
 
 
     # =====================================
-    # SEMANTIC + GRAPH
+    # FETCH BY ID (KEEPS REQUESTED ORDER)
     # =====================================
 
-    def _retrieve_semantic_graph(self, query, repo_name, top_k, expand_k):
+    def _fetch_ids(self, repo_name, ids, include=("documents",)):
 
-        print("Using semantic retrieval")
+        # Chroma rejects a get() that names an id twice
+        ids = list(dict.fromkeys(ids))
 
-        semantic = self.vector_store.search(
-            query=query,
-            repo_name=repo_name,
-            top_k=top_k
+        if not ids:
+            return {"ids": [], **{field: [] for field in include}}
+
+        results = self.vector_store.get_repo_chunks(
+            repo_name,
+            ids=ids,
+            include=include
         )
 
-        docs = semantic.get("documents", [[]])[0]
-        metas = semantic.get("metadatas", [[]])[0]
+        position = {chunk_id: i for i, chunk_id in enumerate(results["ids"])}
+
+        found = [chunk_id for chunk_id in ids if chunk_id in position]
+
+        ordered = {"ids": found}
+
+        for field in include:
+            ordered[field] = [results[field][position[chunk_id]] for chunk_id in found]
+
+        return ordered
+
+
+    # =====================================
+    # SEMANTIC + GRAPH
+    # =====================================
+
+    def _retrieve_semantic_graph(self, query, repo_name, top_k, expand_k, semantic=None):
+
+        print("Using semantic + lexical retrieval")
+
+        # Batch callers pass in the vector hits they already queried
+        if semantic is None:
+
+            semantic = self.vector_store.search(
+                query=query,
+                repo_name=repo_name,
+                top_k=top_k
+            )
+
+        # Chroma ids are the canonical chunk ids the graph is keyed by
+        vector_ids = semantic.get("ids", [[]])[0]
+        docs_by_id = dict(zip(vector_ids, semantic.get("documents", [[]])[0]))
+
+        lexical_ids = [
+            chunk_id for chunk_id, _ in self._lexical_search(query, repo_name, top_k)
+        ]
+
+        seed_scores = self._rrf_scores([vector_ids, lexical_ids])
+
+        seeds = sorted(seed_scores, key=seed_scores.get, reverse=True)
 
-        component_ids = []
+        if self.expand_mode == "ppr":
 
-        for meta in metas:
-            comp = meta.get("component_id")
-            if comp:
-                component_ids.append(comp)
+            ranked = self._rank_graph(seed_scores, expand_k, repo_name)
 
-        expanded_ids = self._expand_graph(component_ids, expand_k)
+            expanded_ids = [chunk_id for chunk_id, _ in ranked]
 
-        expanded_docs = self._fetch_chunks(expanded_ids, repo_name)
+            # Graph centrality is a third signal next to vector and BM25
+            ordered_ids = self._fuse_graph_scores(seed_scores, ranked)
 
-        merged = list(dict.fromkeys(docs + expanded_docs))
+        else:
+
+            expanded_ids = self._expand_graph(seeds, expand_k, repo_name)
+
+            ordered_ids = list(dict.fromkeys(seeds + expanded_ids))
+
+        # One point lookup for lexical-only hits and new graph neighbours;
+        # expansion returns the seeds too, so each id is asked for once
+        fetched = self._fetch_chunks(
+            [
+                chunk_id for chunk_id in dict.fromkeys(seeds + expanded_ids)
+                if chunk_id not in docs_by_id
+            ],
+            repo_name
+        )
+
+        docs_by_id.update(fetched)
+
+        merged = list(dict.fromkeys(
+            docs_by_id[chunk_id] for chunk_id in ordered_ids if chunk_id in docs_by_id
+        ))
 
         print(f"Total chunks: {len(merged)}")
 
         return merged[:15]
 
 
+    # =====================================
+    # LEXICAL SEARCH + RANK FUSION
+    # =====================================
+
+    def _lexical_search(self, query, repo_name, top_k):
+
+        index = self.lexical_indexes.get(repo_name)
+
+        if index is None:
+            return []
+
+        return index.search(query, top_k=top_k)
+
+
+    def _fuse_graph_scores(self, seed_scores, ranked, k=60):
+
+        # PageRank scores are a distribution, so unlike BM25 and cosine
+        # they compare across nodes: each node adds its score relative
+        # to the best one, scaled to what a rank-1 RRF hit is worth.
+        # Two near-equal nodes stay near-equal instead of one rank apart
+        scores = dict(seed_scores)
+
+        if ranked:
+
+            top = ranked[0][1]
+
+            for chunk_id, score in ranked:
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + self.graph_weight * (score / top) / (k + 1)
+
+        return sorted(scores, key=scores.get, reverse=True)
+
+
+    def _rrf_scores(self, rankings, k=60):
+
+        # Reciprocal-rank fusion: only ranks matter, so BM25 and cosine
+        # scores never need to be put on the same scale
+        scores = {}
+
+        for ranking in rankings:
+
+            for rank, chunk_id in enumerate(ranking, start=1):
+
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+
+        return scores
+
+
     # =====================================
     # GRAPH EXPANSION
     # =====================================
 
-    def _expand_graph(self, component_ids, depth):
+    def _expand_graph(self, component_ids, depth, repo_name):
+
+        graph = self.graphs.get(repo_name)
+
+        # No graph yet: expansion only visits the seeds themselves
+        if graph is None:
+            return list(dict.fromkeys(component_ids)) if depth else []
 
-        visited = set()
-        stack = component_ids.copy()
+        # dict keeps discovery order so results are stable
+        visited = {}
+        stack = list(component_ids)
 
         for _ in range(depth):
 
@@ -268,44 +596,130 @@ CODE:
                 if node in visited:
                     continue
 
-                visited.add(node)
+                visited[node] = None
 
-                neighbors = self.graph.get(node, [])
-                next_nodes.extend(neighbors)
+                next_nodes.extend(graph.neighbors(node))
 
             stack = next_nodes
 
         return list(visited)
 
 
+    def _rank_graph(self, seed_scores, depth, repo_name):
+
+        graph = self.graphs.get(repo_name)
+
+        if graph is None or not depth:
+            return []
+
+        # Restart at the hits in proportion to their fused score
+        ranked = self.graph_ranker.rank(
+            graph,
+            seed_scores,
+            top_n=self.graph_top_n,
+            max_hops=depth
+        )
+
+        print(f"Graph ranking: {len(ranked)} nodes")
+
+        return ranked
+
+
     # =====================================
-    # FETCH CHUNKS
+    # USAGES (REVERSE GRAPH)
     # =====================================
 
-    def _fetch_chunks(self, component_ids, repo_name):
+    def _retrieve_usages(self, query, repo_name):
 
-        results = self.vector_store.collection.get()
+        graph = self.graphs.get(repo_name)
 
-        docs = results["documents"]
-        metas = results["metadatas"]
+        if graph is None:
+            return []
 
-        chunks = []
+        name, targets = self._usage_target(query, graph)
 
-        for i, meta in enumerate(metas):
+        if not targets:
+            return []
 
-            if meta["repo_name"] != repo_name:
-                continue
+        print(f"Usage target: {name} ({len(targets)} definitions)")
+
+        # Breadth-first over callers: direct users first, then theirs
+        depths = dict.fromkeys(targets, 0)
+        frontier = list(targets)
+
+        for depth in range(1, self.usage_depth + 1):
+
+            next_frontier = []
+
+            for node in frontier:
+
+                for caller in graph.callers(node):
+
+                    if caller not in depths:
+                        depths[caller] = depth
+                        next_frontier.append(caller)
 
-            if meta.get("component_id") in component_ids:
-                chunks.append(docs[i])
+            frontier = next_frontier
+
+            if not frontier:
+                break
+
+        ordered_ids = list(depths)[:self.usage_limit]
+
+        docs_by_id = self._fetch_chunks(ordered_ids, repo_name)
+
+        # The call tree itself, so the answer does not depend on which
+        # code chunks survive context packing
+        lines = [f"Usages of {name} (depth = hops from the definition):"]
+
+        for chunk_id in list(depths)[len(targets):]:
+            lines.append(f"- {chunk_id} (depth {depths[chunk_id]})")
+
+        if len(lines) == 1:
+            lines.append("- no callers found in the dependency graph")
+
+        chunks = ["\n".join(lines)] + [
+            docs_by_id[chunk_id] for chunk_id in ordered_ids if chunk_id in docs_by_id
+        ]
+
+        print(f"Usage chunks: {len(chunks)} ({len(depths) - len(targets)} callers)")
 
         return chunks
 
 
-    def _load_graph(self, graph_path):
+    def _usage_target(self, query, graph):
+
+        names = [
+            name.strip(".") for name in re.findall(r"[A-Za-z_][\w.]*", query)
+        ]
+
+        # Dotted and code-shaped names first, plain words last
+        candidates = sorted(
+            (name for name in names if name and name.lower() not in USAGE_STOPWORDS),
+            key=lambda name: (
+                "." not in name,
+                "_" not in name and name.islower()
+            )
+        )
+
+        for name in candidates:
+
+            targets = graph.find(name)
+
+            if targets:
+                return name, targets
+
+        return None, []
+
+
+    # =====================================
+    # FETCH CHUNKS
+    # =====================================
+
+    def _fetch_chunks(self, component_ids, repo_name):
+
+        # Single id-keyed point lookup -> {chunk_id: document}
+        results = self._fetch_ids(repo_name, list(component_ids))
+
+        return dict(zip(results["ids"], results["documents"]))
 
-        try:
-            with open(graph_path) as f:
-                return json.load(f)
-        except:
-            return {}
\ No newline at end of file
@@ -1,18 +1,63 @@
 import os
 from openai import OpenAI
 
+from services.codebase_assistant.retrieval.local_intent_classifier import LocalIntentClassifier
+
 
 class IntentRouter:
 
-    def __init__(self):
+    def __init__(self, vector_store=None, threshold: float = 0.35, min_margin: float = 0.05):
 
         self.client = OpenAI(
             api_key=os.getenv("OPENAI_API_KEY")
         )
 
+        # Below this local confidence, or this lead over the runner-up
+        # intent, the question goes to the LLM
+        self.threshold = threshold
+        self.min_margin = min_margin
+
+        # Without an embedding model every question goes to the LLM
+        self.local_classifier = None
+
+        if vector_store is not None:
+            self.local_classifier = LocalIntentClassifier(vector_store)
+
+        self.local_count = 0
+        self.llm_count = 0
+
 
     def detect_intent(self, question: str):
 
+        if self.local_classifier is not None:
+
+            intent, confidence, margin = self.local_classifier.classify(question)
+
+            if self.is_confident(confidence, margin):
+
+                self.local_count += 1
+
+                print(f"Detected intent: {intent} (local, confidence {confidence:.2f}, margin {margin:.2f})")
+
+                return intent
+
+            print(
+                f"Local intent {intent} not confident enough "
+                f"(confidence {confidence:.2f}, margin {margin:.2f}), asking LLM"
+            )
+
+        self.llm_count += 1
+
+        return self.detect_intent_llm(question)
+
+
+    def is_confident(self, confidence: float, margin: float) -> bool:
+
+        return confidence >= self.threshold and margin >= self.min_margin
+
+
+    def detect_intent_llm(self, question: str):
+
         prompt = f"""
 Classify the user question into ONE of these intent types:
 
@@ -21,9 +66,10 @@ api       → asking about APIs, endpoints, routes
 flow      → asking how something works or execution flow
 setup     → asking about installation, deployment, running
 specific  → asking about specific function or implementation
+usage     → asking where something is used, called or imported
 
 Return ONLY one word from:
-overview, api, flow, setup, specific
+overview, api, flow, setup, specific, usage
 
 Question:
 {question}
@@ -51,4 +97,4 @@ Question:
 
         print(f"Detected intent: {intent}")
 
-        return intent
\ No newline at end of file
+        return intent
@@ -0,0 +1,269 @@
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import List, Dict, Tuple
+
+from services.codebase_assistant.utils.persistence import ReloadingRegistry, atomic_write_json, file_mtime
+
+
+# ==========================================
+# TOKENIZER
+# ==========================================
+
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+CAMEL_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+# Keywords and question words that match nearly every chunk
+STOPWORDS = {
+    "a", "an", "and", "as", "at", "be", "by", "def", "do", "does", "else",
+    "for", "from", "how", "if", "import", "in", "is", "it", "none", "not",
+    "of", "on", "or", "return", "self", "the", "this", "to", "what", "where",
+    "which", "with", "why", "true", "false", "are", "can", "i", "we", "you"
+}
+
+
+def tokenize(text: str) -> List[str]:
+
+    terms = []
+
+    for identifier in IDENTIFIER_PATTERN.findall(text):
+
+        lowered = identifier.lower()
+
+        if len(lowered) > 1 and lowered not in STOPWORDS:
+            terms.append(lowered)
+
+        # store_chunks -> store, chunks; ChromaStore -> chroma, store
+        parts = [
+            part.lower()
+            for piece in identifier.split("_")
+            for part in CAMEL_PATTERN.findall(piece)
+        ]
+
+        if len(parts) > 1:
+
+            terms.extend(
+                part for part in parts
+                if len(part) > 1 and part not in STOPWORDS
+            )
+
+    return terms
+
+
+# ==========================================
+# PER-REPO BM25 INDEX
+# ==========================================
+
+class LexicalIndex:
+    """
+    In-process BM25 inverted index over one repo's chunks.
+
+    Catches exact identifier matches (store_chunks, ChromaStore) that
+    embedding search misses. Built at ingest alongside the vector store,
+    patched per file on incremental runs, persisted as JSON.
+    """
+
+    def __init__(self, repo_name: str, base_dir="db/lexical", k1: float = 1.2, b: float = 0.75):
+
+        self.repo_name = repo_name
+
+        self.path = os.path.join(base_dir, f"{repo_name}.json")
+
+        self.k1 = k1
+        self.b = b
+
+        # term -> {chunk_id: term frequency}
+        self.postings = {}
+
+        # chunk_id -> number of terms
+        self.doc_len = {}
+
+        # file_path -> chunk ids, for incremental removal
+        self.files = {}
+
+        # chunk_id -> its distinct terms, so removal touches only those
+        # postings; derived from postings on first removal after a load
+        self._doc_terms = None
+
+        self.total_len = 0
+
+    # ======================================
+    # BUILD
+    # ======================================
+
+    def add_chunks(self, chunks: List[Dict]):
+
+        for chunk in chunks:
+
+            chunk_id = chunk["chunk_id"]
+            meta = chunk["metadata"]
+
+            if chunk_id in self.doc_len:
+                self._remove_ids({chunk_id})
+
+            # Identifiers from the id and file name count as text too;
+            # a windowed file chunk is indexed at its embedded window,
+            # its parts cover the rest
+            terms = tokenize(
+                f"{chunk['component_id']} {meta.get('file_name', '')}\n{chunk.get('embed_text', chunk['code'])}"
+            )
+
+            counts = Counter(terms)
+
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[chunk_id] = tf
+
+            if self._doc_terms is not None:
+                self._doc_terms[chunk_id] = list(counts)
+
+            self.doc_len[chunk_id] = len(terms)
+            self.total_len += len(terms)
+
+            file_ids = self.files.setdefault(meta["file_path"], [])
+
+            # A re-added chunk keeps its one entry
+            if chunk_id not in file_ids:
+                file_ids.append(chunk_id)
+
+    def remove_files(self, file_paths):
+
+        removed = set()
+
+        for file_path in file_paths:
+            removed.update(self.files.pop(file_path, []))
+
+        self._remove_ids(removed)
+
+    def _remove_ids(self, chunk_ids):
+
+        if not chunk_ids:
+            return
+
+        doc_terms = self._terms_by_doc()
+
+        for chunk_id in chunk_ids:
+
+            self.total_len -= self.doc_len.pop(chunk_id, 0)
+
+            for term in doc_terms.pop(chunk_id, []):
+
+                posting = self.postings.get(term)
+
+                if posting is None:
+                    continue
+
+                posting.pop(chunk_id, None)
+
+                if not posting:
+                    del self.postings[term]
+
+    def _terms_by_doc(self):
+
+        # One pass over the postings, then every removal is per-term
+        if self._doc_terms is None:
+
+            self._doc_terms = {}
+
+            for term, posting in self.postings.items():
+
+                for chunk_id in posting:
+                    self._doc_terms.setdefault(chunk_id, []).append(term)
+
+        return self._doc_terms
+
+    # ======================================
+    # SEARCH
+    # ======================================
+
+    def search(self, query: str, top_k: int = 10, max_df_ratio: float = 0.5) -> List[Tuple[str, float]]:
+
+        n_docs = len(self.doc_len)
+
+        if not n_docs:
+            return []
+
+        avg_len = self.total_len / n_docs
+
+        scores = {}
+
+        for term in set(tokenize(query)):
+
+            posting = self.postings.get(term)
+
+            # Terms in most chunks carry ~zero IDF but cost the most to score
+            if not posting or len(posting) > max_df_ratio * n_docs:
+                continue
+
+            df = len(posting)
+
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+            for chunk_id, tf in posting.items():
+
+                norm = self.k1 * (1 - self.b + self.b * self.doc_len[chunk_id] / avg_len)
+
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    # ======================================
+    # PERSISTENCE
+    # ======================================
+
+    def save(self):
+
+        atomic_write_json(self.path, {
+            "repo_name": self.repo_name,
+            "postings": self.postings,
+            "doc_len": self.doc_len,
+            "files": self.files
+        })
+
+        print(f"Lexical index saved to {self.path} ({len(self.postings)} terms)")
+
+    def load(self):
+
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        self.postings = data.get("postings", {})
+        self.doc_len = data.get("doc_len", {})
+        self.files = data.get("files", {})
+
+        self.total_len = sum(self.doc_len.values())
+
+        self._doc_terms = None
+
+        return self
+
+
+# ==========================================
+# IN-MEMORY REGISTRY
+# ==========================================
+
+class LexicalIndexRegistry(ReloadingRegistry):
+    """
+    Loads a repo's index on first use and reloads it when the file on
+    disk changes (re-ingest in this or another process).
+    """
+
+    def __init__(self, base_dir="db/lexical"):
+
+        super().__init__()
+
+        self.base_dir = base_dir
+
+    def _open(self, repo_name):
+
+        return LexicalIndex(repo_name, base_dir=self.base_dir)
+
+    def _version(self, index):
+
+        return file_mtime(index.path)
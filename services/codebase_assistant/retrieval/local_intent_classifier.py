@@ -0,0 +1,172 @@
+import re
+from typing import List, Dict
+
+import numpy as np
+
+
+# ==========================================
+# LABELLED EXAMPLE QUESTIONS
+# ==========================================
+
+INTENT_EXAMPLES = {
+
+    "overview": [
+        "What does this project do?",
+        "Give me a summary of this repository",
+        "What is the purpose of this codebase?",
+        "Explain the overall architecture",
+        "What are the main components of the system?",
+        "Describe the high level design of this repo",
+        "What problem does this application solve?",
+        "How is the project structured?"
+    ],
+
+    "api": [
+        "What APIs are exposed?",
+        "List all the endpoints",
+        "Which REST routes does the server have?",
+        "What HTTP methods are supported?",
+        "Show me the API endpoints and their paths",
+        "What does the POST endpoint accept?",
+        "Which routes are defined in the FastAPI app?",
+        "What are the available GET requests?"
+    ],
+
+    "flow": [
+        "How does ingestion work?",
+        "Walk me through what happens when a request comes in",
+        "What is the execution flow of a question?",
+        "How does data move from the loader to the vector store?",
+        "What happens after a file is scanned?",
+        "Explain the step by step process of retrieval",
+        "How do the components interact at runtime?",
+        "What is the sequence of calls when answering a query?"
+    ],
+
+    "setup": [
+        "How do I install this project?",
+        "How do I run it locally?",
+        "What are the dependencies I need?",
+        "How do I deploy this with Docker?",
+        "Which environment variables must be set?",
+        "How do I start the server?",
+        "What are the installation steps?",
+        "How do I configure the application?"
+    ],
+
+    "specific": [
+        "What does the store_chunks function do?",
+        "How is the detect_intent method implemented?",
+        "Explain the HybridRetriever class",
+        "What arguments does clone_repo take?",
+        "Where is the embedding model loaded?",
+        "What does _expand_graph return?",
+        "How is the chunk id built in ChunkExtractor?",
+        "Why does search filter by repo_name?"
+    ],
+
+    "usage": [
+        "Where is ChromaStore.search used?",
+        "Who calls the retrieve method?",
+        "Which functions call store_chunks?",
+        "What uses the LexicalIndex class?",
+        "Find all callers of detect_intent",
+        "Where is GraphStore instantiated?",
+        "Which modules import the chunk extractor?",
+        "What would break if I changed clone_repo?"
+    ]
+}
+
+
+# ==========================================
+# KEYWORD RULES
+# ==========================================
+
+# High-precision phrases only; anything ambiguous goes to the centroids
+KEYWORD_RULES = [
+    ("api", re.compile(r"\b(endpoints?|routes?|apis?|http methods?)\b", re.I)),
+    ("setup", re.compile(r"\b(install\w*|set ?up|deploy\w*|docker\w*|requirements|run (it |this )?locally|env(ironment)? var\w*)\b", re.I)),
+    ("overview", re.compile(r"\b(overview|summary|summari[sz]e|purpose of|what does this (project|repo|repository|codebase) do)\b", re.I)),
+    ("usage", re.compile(r"\b(who|what|which \w+) (calls?|uses?|imports?|depends? on)\b|\bwhere (is|are) .+ (used|called|imported)\b|\b(callers|usages?|call sites?) of\b", re.I)),
+    ("flow", re.compile(r"\b(flow|walk me through|step by step|what happens (when|after|before))\b", re.I)),
+    # snake_case or call syntax names a concrete symbol
+    ("specific", re.compile(r"\b[a-z]\w*_\w+\b|\w+\(\)")),
+]
+
+
+# ==========================================
+# LOCAL CLASSIFIER
+# ==========================================
+
+class LocalIntentClassifier:
+    """
+    Nearest-centroid intent classifier on the MiniLM embedding model
+    the vector store already has loaded, plus keyword rules.
+
+    classify() returns (intent, confidence, margin): the cosine
+    similarity to the winning centroid and how far it is ahead of the
+    runner-up. The caller decides what is good enough and what to do
+    below it; a high score with a small margin is an ambiguous question.
+    """
+
+    def __init__(self, vector_store, examples: Dict[str, List[str]] = None):
+
+        self.vector_store = vector_store
+
+        examples = examples or INTENT_EXAMPLES
+
+        self.intents = list(examples)
+
+        # One unit-length centroid per intent, rows in self.intents order
+        self.centroids = np.stack([
+            self._normalize(
+                self._normalize(
+                    vector_store.embedding_model.encode(examples[intent])
+                ).mean(axis=0)
+            )
+            for intent in self.intents
+        ])
+
+        print(f"Local intent classifier ready ({len(self.intents)} intents)")
+
+    def classify(self, question: str):
+
+        rule_hits = {
+            intent for intent, pattern in KEYWORD_RULES
+            if pattern.search(question)
+        }
+
+        # Usage questions name a symbol too; the phrasing decides
+        if "usage" in rule_hits:
+            rule_hits.discard("specific")
+
+        # Rules alone are trusted only when they agree on a single intent
+        if len(rule_hits) == 1:
+            return rule_hits.pop(), 1.0, 1.0
+
+        # Goes through the query-embedding cache, so retrieval reuses it
+        vector = self._normalize(self.vector_store.embed_query(question))
+
+        scores = self.centroids @ vector
+
+        # Several rules fired: let the centroids pick among them
+        if rule_hits:
+            candidates = [i for i, intent in enumerate(self.intents) if intent in rule_hits]
+        else:
+            candidates = list(range(len(self.intents)))
+
+        ranked = sorted(candidates, key=lambda i: scores[i], reverse=True)
+
+        best = ranked[0]
+
+        margin = scores[best] - scores[ranked[1]] if len(ranked) > 1 else scores[best]
+
+        return self.intents[best], float(scores[best]), float(margin)
+
+    def _normalize(self, vectors):
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+        return vectors / np.maximum(norms, 1e-12)
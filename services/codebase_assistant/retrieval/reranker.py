@@ -0,0 +1,113 @@
+import time
+from typing import List
+
+from sentence_transformers import CrossEncoder
+
+
+RERANK_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class CrossEncoderReranker:
+    """
+    Reorders retrieved chunks by (question, chunk) cross-encoder score.
+
+    Scoring runs in batches against a per-request time budget. Batches
+    are sized from the measured per-pair cost so one batch fits in what
+    is left of the budget; the first request probes with a small one.
+    If the budget runs out before every candidate is scored, the first
+    top_n chunks are returned in retrieval order, so a slow request is
+    never worse than no reranking at all and never longer than a
+    reranked one.
+    """
+
+    def __init__(
+        self,
+        model_name: str = RERANK_MODEL_NAME,
+        top_n: int = 8,
+        batch_size: int = 16,
+        budget_ms: float = 300,
+        max_chars: int = 2000
+    ):
+
+        print(f"Loading reranker {model_name}...")
+
+        self.model = CrossEncoder(model_name, device="cpu")
+
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+
+        # The model reads ~512 tokens; longer text only costs time
+        self.max_chars = max_chars
+
+        # Running estimate of ms per scored pair; None until measured
+        self.pair_ms = None
+
+        self.reranked = 0
+        self.fallbacks = 0
+
+    def rerank(self, query: str, chunks: List[str], top_n: int = None) -> List[str]:
+
+        top_n = top_n or self.top_n
+
+        if len(chunks) <= 1:
+            return chunks
+
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000
+
+        pairs = [(query, chunk[:self.max_chars]) for chunk in chunks]
+
+        scores = []
+
+        while len(scores) < len(pairs):
+
+            size = self._batch_size((deadline - time.perf_counter()) * 1000)
+
+            if size:
+
+                batch_start = time.perf_counter()
+
+                scores.extend(self.model.predict(pairs[len(scores):len(scores) + size]))
+
+                self._observe(size, (time.perf_counter() - batch_start) * 1000)
+
+            # Checked after every batch, the last one included
+            if not size or time.perf_counter() > deadline:
+
+                self.fallbacks += 1
+
+                print(f"Rerank over budget ({self.budget_ms} ms), keeping retrieval order")
+
+                return chunks[:top_n]
+
+        order = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+
+        self.reranked += 1
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        print(f"Reranked {len(chunks)} chunks in {elapsed_ms:.0f} ms, keeping {min(top_n, len(chunks))}")
+
+        return [chunks[i] for i in order[:top_n]]
+
+    def _batch_size(self, remaining_ms):
+
+        if remaining_ms <= 0:
+            return 0
+
+        # Unmeasured yet: probe with a small batch
+        if self.pair_ms is None:
+            return min(self.batch_size, 4)
+
+        return min(self.batch_size, int(remaining_ms / self.pair_ms))
+
+    def _observe(self, size, elapsed_ms):
+
+        pair_ms = elapsed_ms / size
+
+        # Smoothed, so one slow batch does not starve the next requests
+        if self.pair_ms is None:
+            self.pair_ms = pair_ms
+        else:
+            self.pair_ms = 0.7 * self.pair_ms + 0.3 * pair_ms
@@ -0,0 +1,144 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimate_size(value) -> int:
+    """
+    Rough byte size of a cached value: numpy arrays by their buffer,
+    containers by their items, everything else by sys.getsizeof.
+    """
+
+    nbytes = getattr(value, "nbytes", None)
+
+    if nbytes is not None:
+        return int(nbytes)
+
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+
+    if isinstance(value, dict):
+
+        return sys.getsizeof(value) + sum(
+            estimate_size(key) + estimate_size(item) for key, item in value.items()
+        )
+
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache with an optional TTL.
+
+    Bounded by entry count and by estimated bytes, whichever is hit
+    first. Tracks hits, misses and evictions for the stats endpoint.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None, max_bytes: int = None):
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.bytes = 0
+
+        # key -> (expires_at, size, value), oldest first
+        self._entries = OrderedDict()
+
+        self._lock = threading.Lock()
+
+    # =====================================
+    # LOOKUP
+    # =====================================
+
+    def get(self, key):
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+                self._pop(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+
+            self.hits += 1
+
+            return entry[2]
+
+    def put(self, key, value):
+
+        size = estimate_size(value)
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+
+        with self._lock:
+
+            if key in self._entries:
+                self._pop(key)
+
+            self._entries[key] = (expires_at, size, value)
+            self.bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self.bytes > self.max_bytes)
+            ):
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    # =====================================
+    # INVALIDATION
+    # =====================================
+
+    def invalidate(self, predicate=None) -> int:
+
+        with self._lock:
+
+            keys = [
+                key for key in self._entries
+                if predicate is None or predicate(key)
+            ]
+
+            for key in keys:
+                self._pop(key)
+
+        return len(keys)
+
+    def _pop(self, key):
+
+        _, size, _ = self._entries.pop(key)
+
+        self.bytes -= size
+
+    # =====================================
+    # STATS
+    # =====================================
+
+    def stats(self):
+
+        with self._lock:
+
+            lookups = self.hits + self.misses
+
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,91 @@
+import json
+import os
+from abc import ABC, abstractmethod
+
+
+# ==========================================
+# ATOMIC JSON FILES
+# ==========================================
+
+def atomic_write_json(path: str, data):
+    """
+    Writes data as JSON to path through a temp file and os.replace, so
+    readers and crashed writers never see a half-written file.
+    """
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+
+    os.replace(tmp_path, path)
+
+
+def file_mtime(path: str):
+
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# ==========================================
+# RELOAD-ON-CHANGE REGISTRY
+# ==========================================
+
+class ReloadingRegistry(ABC):
+    """
+    Per-repo artifacts kept in memory and reloaded when their files
+    change on disk (a re-ingest in this or another process).
+
+    Subclasses say how to open a repo's artifact (_open, whose result
+    has load() returning itself or None) and what its on-disk version
+    is (_version, None when it does not exist).
+    """
+
+    def __init__(self):
+
+        # repo_name -> (version, artifact)
+        self._entries = {}
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    def get(self, repo_name: str):
+
+        artifact = self._open(repo_name)
+
+        version = self._version(artifact)
+
+        if version is None:
+            self._entries.pop(repo_name, None)
+            return None
+
+        cached = self._entries.get(repo_name)
+
+        if cached and cached[0] == version:
+            return cached[1]
+
+        if artifact.load() is None:
+            return None
+
+        self._entries[repo_name] = (version, artifact)
+
+        self._loaded(repo_name, artifact)
+
+        return artifact
+
+    @abstractmethod
+    def _open(self, repo_name: str):
+        pass
+
+    @abstractmethod
+    def _version(self, artifact):
+        pass
+
+    def _loaded(self, repo_name: str, artifact):
+
+        pass
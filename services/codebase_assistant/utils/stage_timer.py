@@ -0,0 +1,79 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Wall-clock milliseconds per named stage of one request.
+    """
+
+    def __init__(self):
+
+        self.start = time.perf_counter()
+
+        # stage name -> ms, in the order stages finished
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def record(self, name: str, ms: float):
+
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def finish(self):
+
+        self.stages["total"] = (time.perf_counter() - self.start) * 1000
+
+        return self.stages
+
+    def summary(self) -> str:
+
+        return ", ".join(f"{name}={ms:.0f}ms" for name, ms in self.stages.items())
+
+
+class TimingStats:
+    """
+    Running per-stage totals across requests, safe to update from
+    concurrent request threads.
+    """
+
+    def __init__(self):
+
+        # stage name -> [count, total ms, max ms]
+        self._stages = {}
+
+        self._lock = threading.Lock()
+
+    def add(self, stages):
+
+        with self._lock:
+
+            for name, ms in stages.items():
+
+                entry = self._stages.setdefault(name, [0, 0.0, 0.0])
+
+                entry[0] += 1
+                entry[1] += ms
+                entry[2] = max(entry[2], ms)
+
+    def stats(self):
+
+        with self._lock:
+
+            return {
+                name: {
+                    "count": count,
+                    "avg_ms": round(total / count, 1),
+                    "max_ms": round(max_ms, 1)
+                }
+                for name, (count, total, max_ms) in self._stages.items()
+            }
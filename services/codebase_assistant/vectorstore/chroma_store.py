@@ -1,10 +1,26 @@
 import chromadb
 from sentence_transformers import SentenceTransformer
 
+from services.codebase_assistant.vectorstore.embedding_cache import EmbeddingCache
+from services.codebase_assistant.vectorstore.embedding_engine import EmbeddingEngine
+from services.codebase_assistant.vectorstore.chroma_writer import ChromaBatchWriter
+from services.codebase_assistant.utils.lru_cache import LRUCache
+
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
 
 class ChromaStore:
 
-    def __init__(self, persist_dir="db/chroma"):
+    def __init__(
+        self,
+        persist_dir="db/chroma",
+        embedding_cache_path="data/cache/embeddings.sqlite",
+        embedding_batch_size=64,
+        embedding_processes=1,
+        query_cache_size=2048,
+        query_cache_ttl=3600
+    ):
 
         print("Initializing ChromaDB...")
 
@@ -20,55 +36,228 @@ class ChromaStore:
         print("Loading embedding model...")
 
         self.embedding_model = SentenceTransformer(
-            "sentence-transformers/all-MiniLM-L6-v2"
+            EMBEDDING_MODEL_NAME
         )
 
         print("Embedding model loaded")
 
+        # Length-bucketed batches; processes != 1 uses a multi-process pool
+        self.embedding_engine = EmbeddingEngine(
+            self.embedding_model,
+            batch_size=embedding_batch_size,
+            processes=embedding_processes
+        )
+
+        # None disables the on-disk embedding cache
+        self.embedding_cache = None
+
+        if embedding_cache_path:
+
+            self.embedding_cache = EmbeddingCache(
+                EMBEDDING_MODEL_NAME,
+                path=embedding_cache_path
+            )
+
+        # Query text -> vector. Depends only on the model, never on repo
+        # contents, so re-ingest does not need to clear it
+        self.query_cache = LRUCache(
+            max_entries=query_cache_size,
+            ttl=query_cache_ttl
+        )
+
     # =====================================
     # STORE CHUNKS
     # =====================================
 
-    def store_chunks(self, chunks):
+    def store_chunks(self, chunks, batch_size=256, writer=None):
 
         if not chunks:
             print("No chunks to store")
             return
 
+        # Callers streaming many calls pass their own writer so upserts
+        # overlap with embedding across calls, not just within one
+        own_writer = writer is None
+
+        if own_writer:
+            writer = self.start_writer()
+
+        try:
+
+            # Encode in fixed-size batches so peak memory does not grow
+            # with the number of chunks passed in
+            for start in range(0, len(chunks), batch_size):
+
+                self._store_batch(chunks[start:start + batch_size], writer)
+
+        except BaseException:
+
+            if own_writer:
+                writer.abort()
+
+            raise
+
+        if own_writer:
+            writer.close()
+            print(f"Successfully stored {len(chunks)} chunks")
+        else:
+            print(f"Queued {len(chunks)} chunks for upsert")
+
+    def start_writer(self):
+
+        return ChromaBatchWriter(
+            self.collection,
+            max_batch_size=self._max_batch_size()
+        )
+
+    def _max_batch_size(self):
+
+        # get_max_batch_size() on newer clients, max_batch_size on older ones
+        getter = getattr(self.client, "get_max_batch_size", None)
+
+        if getter is not None:
+            return getter()
+
+        return getattr(self.client, "max_batch_size", 5000)
+
+    def _store_batch(self, chunks, writer):
+
         documents = []
+        texts = []
         metadatas = []
         ids = []
 
         for chunk in chunks:
 
-            repo = chunk["metadata"]["repo_name"]
-            file_path = chunk["metadata"]["file_path"]
-            component = chunk["component_id"]
-
-            chunk_id = f"{repo}:{file_path}:{component}"
+            # Canonical id (repo:path:component), shared with the graph
+            chunk_id = chunk["chunk_id"]
 
             documents.append(chunk["code"])
 
+            # Large file chunks embed one window but store the full text
+            texts.append(chunk.get("embed_text", chunk["code"]))
+
             metadata = chunk["metadata"].copy()
             metadata["component_id"] = chunk_id
 
             metadatas.append(metadata)
             ids.append(chunk_id)
 
-        print(f"Generating embeddings for {len(documents)} chunks...")
+        embeddings = self._embed_documents(texts)
+
+        # Hands off to the writer thread; blocks only if it is behind
+        writer.submit(ids, documents, metadatas, embeddings)
+
+    # =====================================
+    # EMBED (WITH CACHE)
+    # =====================================
 
-        embeddings = self.embedding_model.encode(documents).tolist()
+    def _embed_documents(self, documents):
 
-        print("Storing in ChromaDB...")
+        if self.embedding_cache is None:
 
-        self.collection.upsert(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas,
-            embeddings=embeddings
+            print(f"Generating embeddings for {len(documents)} chunks...")
+
+            return self.embedding_engine.encode(documents).tolist()
+
+        vectors = self.embedding_cache.get_many(documents)
+
+        # Unique texts that still need a forward pass
+        missing = list(dict.fromkeys(
+            documents[i] for i, vector in enumerate(vectors) if vector is None
+        ))
+
+        print(
+            f"Generating embeddings for {len(missing)} chunks "
+            f"({len(documents) - len(missing)} from cache)..."
         )
 
-        print(f"Successfully stored {len(ids)} chunks")
+        if missing:
+
+            encoded = self.embedding_engine.encode(missing)
+
+            self.embedding_cache.put_many(missing, encoded)
+
+            by_text = dict(zip(missing, encoded))
+
+            vectors = [
+                vector if vector is not None else by_text[documents[i]]
+                for i, vector in enumerate(vectors)
+            ]
+
+        return [vector.tolist() for vector in vectors]
+
+    # =====================================
+    # EMBEDDING STATS
+    # =====================================
+
+    def embedding_stats(self):
+
+        # Cumulative for this store: one ingest run per ChromaStore
+        return {
+            "encoder": self.embedding_engine.stats(),
+            "cache": self.embedding_cache.stats() if self.embedding_cache else None
+        }
+
+    # =====================================
+    # FILTERED READS
+    # =====================================
+
+    def get_repo_chunks(
+        self,
+        repo_name,
+        where=None,
+        include=("documents", "metadatas"),
+        limit=None,
+        ids=None
+    ):
+
+        # Always scoped to one repo so Chroma filters before anything
+        # crosses into Python
+        conditions = [{"repo_name": repo_name}]
+
+        if where:
+            conditions.append(where)
+
+        kwargs = {
+            "where": conditions[0] if len(conditions) == 1 else {"$and": conditions},
+            "include": list(include)
+        }
+
+        if limit:
+            kwargs["limit"] = limit
+
+        if ids is not None:
+            kwargs["ids"] = ids
+
+        return self.collection.get(**kwargs)
+
+    # =====================================
+    # DELETE
+    # =====================================
+
+    def delete_repo(self, repo_name):
+
+        print(f"Deleting old chunks for repo: {repo_name}")
+
+        self.collection.delete(where={"repo_name": repo_name})
+
+    def delete_files(self, repo_name, file_paths, batch_size=256):
+
+        file_paths = list(file_paths)
+
+        for start in range(0, len(file_paths), batch_size):
+
+            self.collection.delete(
+                where={
+                    "$and": [
+                        {"repo_name": repo_name},
+                        {"file_path": {"$in": file_paths[start:start + batch_size]}}
+                    ]
+                }
+            )
+
+        print(f"Deleted chunks for {len(file_paths)} files")
 
     # =====================================
     # SEARCH
@@ -76,7 +265,7 @@ class ChromaStore:
 
     def search(self, query, repo_name=None, top_k=5):
 
-        query_embedding = self.embedding_model.encode([query]).tolist()
+        query_embedding = [self.embed_query(query).tolist()]
 
         if repo_name:
 
@@ -92,4 +281,58 @@ class ChromaStore:
             n_results=top_k
         )
 
-        return results
\ No newline at end of file
+        return results
+
+    def search_batch(self, queries, repo_name, top_k=5):
+
+        # One Chroma query for many questions against the same repo;
+        # returns one search()-shaped result per query, in order
+        if not queries:
+            return []
+
+        results = self.collection.query(
+            query_embeddings=[vector.tolist() for vector in self.embed_queries(queries)],
+            n_results=top_k,
+            where={"repo_name": repo_name}
+        )
+
+        return [
+            {
+                field: [values[i]]
+                for field, values in results.items()
+                if isinstance(values, list) and len(values) == len(queries)
+            }
+            for i in range(len(queries))
+        ]
+
+    def embed_queries(self, queries):
+
+        keys = [query.strip() for query in queries]
+
+        vectors = {key: self.query_cache.get(key) for key in dict.fromkeys(keys)}
+
+        missing = [key for key, vector in vectors.items() if vector is None]
+
+        # Every uncached query in a single forward pass
+        if missing:
+
+            for key, vector in zip(missing, self.embedding_model.encode(missing)):
+
+                self.query_cache.put(key, vector)
+                vectors[key] = vector
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, query):
+
+        key = query.strip()
+
+        vector = self.query_cache.get(key)
+
+        if vector is None:
+
+            vector = self.embedding_model.encode([key])[0]
+
+            self.query_cache.put(key, vector)
+
+        return vector
@@ -0,0 +1,145 @@
+import queue
+import threading
+import time
+
+
+class ChromaBatchWriter:
+    """
+    Background upserts into a Chroma collection.
+
+    Submitted rows are cut into batches no larger than Chroma's max batch
+    size and written by a single writer thread, so the caller can embed
+    the next batch while the previous one is being persisted. The queue
+    is bounded: when the writer falls behind, submit() blocks instead of
+    buffering unlimited embeddings. Each batch is retried on failure; the
+    first batch that still fails is re-raised to the caller.
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_batch_size: int = 5000,
+        max_pending: int = 2,
+        retries: int = 3,
+        backoff: float = 0.5
+    ):
+
+        self.collection = collection
+        self.max_batch_size = max_batch_size
+        self.retries = retries
+        self.backoff = backoff
+
+        self.written = 0
+        self.error = None
+
+        # Set when the producer failed: queued batches are discarded
+        self.aborted = False
+
+        self._queue = queue.Queue(maxsize=max_pending)
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="chroma-writer",
+            daemon=True
+        )
+        self._thread.start()
+
+    # =====================================
+    # PRODUCER SIDE
+    # =====================================
+
+    def submit(self, ids, documents, metadatas, embeddings):
+
+        self._raise_if_failed()
+
+        for start in range(0, len(ids), self.max_batch_size):
+
+            end = start + self.max_batch_size
+
+            self._queue.put((
+                ids[start:end],
+                documents[start:end],
+                metadatas[start:end],
+                embeddings[start:end]
+            ))
+
+    def close(self):
+
+        self._queue.put(None)
+
+        self._thread.join()
+
+        self._raise_if_failed()
+
+    def abort(self):
+
+        # Producer side failed: drop what is still queued, let an
+        # in-flight upsert finish and stop the thread. Never raises, so
+        # the caller's original exception is the one that propagates
+        self.aborted = True
+
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+        self._queue.put(None)
+
+        self._thread.join()
+
+        if self.error is not None:
+            print(f"Writer stopped after an earlier upsert error: {self.error}")
+
+    def _raise_if_failed(self):
+
+        if self.error is not None:
+            raise self.error
+
+    # =====================================
+    # WRITER THREAD
+    # =====================================
+
+    def _run(self):
+
+        while True:
+
+            batch = self._queue.get()
+
+            if batch is None:
+                return
+
+            # Keep draining after a failure so producers never block forever
+            if self.error is not None or self.aborted:
+                continue
+
+            try:
+                self._upsert(*batch)
+            except Exception as e:
+                self.error = e
+
+    def _upsert(self, ids, documents, metadatas, embeddings):
+
+        for attempt in range(1, self.retries + 1):
+
+            try:
+
+                self.collection.upsert(
+                    ids=ids,
+                    documents=documents,
+                    metadatas=metadatas,
+                    embeddings=embeddings
+                )
+
+                self.written += len(ids)
+
+                return
+
+            except Exception as e:
+
+                if attempt == self.retries:
+                    raise
+
+                print(f"Upsert of {len(ids)} chunks failed (attempt {attempt}): {e}")
+
+                time.sleep(self.backoff * attempt)
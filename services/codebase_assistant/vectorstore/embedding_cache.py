@@ -0,0 +1,163 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache.
+
+    Keys are sha256(model_name, text), so identical code embedded by the
+    same model is only encoded once, across re-ingests and across repos
+    (forks, vendored copies). Entries beyond max_entries are evicted
+    least-recently-used first.
+    """
+
+    # SQLite caps the number of bound parameters per statement
+    QUERY_BATCH = 500
+
+    def __init__(
+        self,
+        model_name: str,
+        path="data/cache/embeddings.sqlite",
+        max_entries: int = 1_000_000
+    ):
+
+        self.model_name = model_name
+        self.path = path
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)"
+        )
+        self._conn.commit()
+
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    # =====================================
+    # LOOKUP
+    # =====================================
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+
+        keys = [self._key(text) for text in texts]
+
+        found = {}
+
+        with self._lock:
+
+            for start in range(0, len(keys), self.QUERY_BATCH):
+
+                batch = keys[start:start + self.QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                        [time.time(), *batch]
+                    )
+
+            self._conn.commit()
+
+        vectors = [found.get(key) for key in keys]
+
+        hits = sum(1 for vector in vectors if vector is not None)
+
+        self.hits += hits
+        self.misses += len(vectors) - hits
+
+        return vectors
+
+    # =====================================
+    # STORE
+    # =====================================
+
+    def put_many(self, texts: List[str], vectors):
+
+        now = time.time()
+
+        rows = [
+            (self._key(text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+
+        with self._lock:
+
+            before = self._conn.total_changes
+
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                rows
+            )
+
+            self._count += self._conn.total_changes - before
+
+            if self._count > self.max_entries:
+                self._evict(self._count - self.max_entries)
+
+            self._conn.commit()
+
+    def _evict(self, n: int):
+
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            "SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (n,)
+        )
+
+        self._count -= n
+        self.evictions += n
+
+    # =====================================
+    # STATS
+    # =====================================
+
+    def stats(self):
+
+        lookups = self.hits + self.misses
+
+        return {
+            "entries": self._count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def _key(self, text: str) -> str:
+
+        digest = hashlib.sha256()
+
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8", errors="surrogatepass"))
+
+        return digest.hexdigest()
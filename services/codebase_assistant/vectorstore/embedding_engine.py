@@ -0,0 +1,119 @@
+import atexit
+import os
+import time
+from typing import List
+
+import numpy as np
+
+
+class EmbeddingEngine:
+    """
+    Batched SentenceTransformer encoding tuned for mixed-length code.
+
+    Texts are sorted by length before batching so each batch pads to a
+    similar length (tiny functions are not padded up to whole files),
+    then results are scattered back into the caller's order. With
+    processes != 1 encoding is spread over a sentence-transformers
+    multi-process pool, one CPU worker per process.
+    """
+
+    def __init__(self, model, batch_size: int = 64, processes: int = 1):
+
+        self.model = model
+        self.batch_size = batch_size
+
+        # processes <= 0 means "use every core"
+        self.processes = processes if processes > 0 else (os.cpu_count() or 1)
+
+        self._pool = None
+
+        self.total_texts = 0
+        self.total_seconds = 0.0
+
+    # =====================================
+    # ENCODE
+    # =====================================
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+
+        if not texts:
+            return np.zeros(
+                (0, self.model.get_sentence_embedding_dimension()),
+                dtype=np.float32
+            )
+
+        # Length-sorted buckets keep padding per batch small
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        sorted_texts = [texts[i] for i in order]
+
+        start = time.perf_counter()
+
+        if self.processes > 1:
+
+            vectors = self.model.encode_multi_process(
+                sorted_texts,
+                self._get_pool(),
+                batch_size=self.batch_size
+            )
+
+        else:
+
+            vectors = self.model.encode(
+                sorted_texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True
+            )
+
+        elapsed = time.perf_counter() - start
+
+        # Scatter back to the original order
+        embeddings = np.empty_like(vectors)
+        embeddings[order] = vectors
+
+        self.total_texts += len(texts)
+        self.total_seconds += elapsed
+
+        print(
+            f"Encoded {len(texts)} chunks in {elapsed:.2f}s "
+            f"({len(texts) / max(elapsed, 1e-9):.1f} chunks/sec)"
+        )
+
+        return embeddings
+
+    # =====================================
+    # MULTI-PROCESS POOL
+    # =====================================
+
+    def _get_pool(self):
+
+        if self._pool is None:
+
+            print(f"Starting embedding pool with {self.processes} CPU processes")
+
+            self._pool = self.model.start_multi_process_pool(
+                target_devices=["cpu"] * self.processes
+            )
+
+            atexit.register(self.close)
+
+        return self._pool
+
+    def close(self):
+
+        if self._pool is not None:
+
+            self.model.stop_multi_process_pool(self._pool)
+
+            self._pool = None
+
+    # =====================================
+    # STATS
+    # =====================================
+
+    def stats(self):
+
+        return {
+            "chunks": self.total_texts,
+            "seconds": round(self.total_seconds, 3),
+            "chunks_per_sec": self.total_texts / self.total_seconds if self.total_seconds else 0.0
+        }
@@ -0,0 +1,213 @@
+import json
+import os
+from typing import List, Dict
+
+from services.codebase_assistant.utils.persistence import ReloadingRegistry, atomic_write_json, file_mtime
+
+
+# ==========================================
+# CATALOG CATEGORIES
+# ==========================================
+
+# File-name categories, matched on lower-cased file-level chunk names
+NAME_CATEGORIES = {
+    "readme": lambda name: "readme" in name,
+    "requirements": lambda name: "requirements" in name,
+    "dockerfile": lambda name: "dockerfile" in name,
+    "entrypoint": lambda name: name in ("main.py", "app.py", "server.py")
+}
+
+# chunk_type values indexed as their own category
+TYPE_CATEGORIES = ("file", "class")
+
+
+# ==========================================
+# PER-REPO CATALOG
+# ==========================================
+
+class RepoCatalog:
+    """
+    Compact index of one repo's chunk ids by intent category.
+
+    Built at ingest time and persisted beside the vector DB, so the
+    overview / setup / API / dependency paths can pick chunk ids with a
+    dictionary lookup and fetch them with a single get(ids=...).
+    """
+
+    def __init__(self, repo_name: str, base_dir="db/catalog"):
+
+        self.repo_name = repo_name
+
+        self.path = os.path.join(base_dir, f"{repo_name}.json")
+
+        # file_path -> chunk ids, so incremental ingest can drop a file
+        self.files = {}
+
+        # category -> ordered set of chunk ids (dict keys keep order)
+        self.categories = {}
+
+        # chunk id -> ["METHOD /path", ...]
+        self.api_routes = {}
+
+    # ======================================
+    # BUILD
+    # ======================================
+
+    def add_chunks(self, chunks: List[Dict]):
+
+        for chunk in chunks:
+
+            meta = chunk["metadata"]
+            chunk_id = chunk["chunk_id"]
+
+            self.files.setdefault(meta["file_path"], []).append(chunk_id)
+
+            chunk_type = meta.get("chunk_type")
+
+            if chunk_type in TYPE_CATEGORIES:
+                self._add(chunk_type, chunk_id)
+
+            if chunk_type == "file":
+
+                name = meta.get("file_name", "").lower()
+
+                for category, matches in NAME_CATEGORIES.items():
+
+                    if matches(name):
+                        self._add(category, chunk_id)
+
+            routes = meta.get("api_routes")
+
+            if routes and routes != "None":
+
+                self._add("api", chunk_id)
+
+                self.api_routes[chunk_id] = [
+                    route.strip() for route in routes.split(",") if route.strip()
+                ]
+
+    def remove_files(self, file_paths):
+
+        removed = set()
+
+        for file_path in file_paths:
+            removed.update(self.files.pop(file_path, []))
+
+        if not removed:
+            return
+
+        for ids in self.categories.values():
+
+            for chunk_id in removed & ids.keys():
+                del ids[chunk_id]
+
+        for chunk_id in removed:
+            self.api_routes.pop(chunk_id, None)
+
+    def _add(self, category: str, chunk_id: str):
+
+        self.categories.setdefault(category, {})[chunk_id] = None
+
+    # ======================================
+    # LOOKUP
+    # ======================================
+
+    def ids(self, *categories, limit=None) -> List[str]:
+
+        # Union in category order, without duplicates
+        result = {}
+
+        for category in categories:
+
+            for chunk_id in self.categories.get(category, {}):
+
+                result[chunk_id] = None
+
+                if limit and len(result) >= limit:
+                    return list(result)
+
+        return list(result)
+
+    def all_api_routes(self) -> List[str]:
+
+        return sorted({
+            route
+            for routes in self.api_routes.values()
+            for route in routes
+        })
+
+    # ======================================
+    # PERSISTENCE
+    # ======================================
+
+    def save(self):
+
+        atomic_write_json(self.path, {
+            "repo_name": self.repo_name,
+            "files": self.files,
+            "categories": {
+                category: list(ids) for category, ids in self.categories.items()
+            },
+            "api_routes": self.api_routes
+        })
+
+        print(f"Catalog saved to {self.path}")
+
+    def load(self):
+
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        self.files = data.get("files", {})
+
+        self.categories = {
+            category: dict.fromkeys(ids)
+            for category, ids in data.get("categories", {}).items()
+        }
+
+        self.api_routes = data.get("api_routes", {})
+
+        return self
+
+
+# ==========================================
+# IN-MEMORY REGISTRY OF ALL CATALOGS
+# ==========================================
+
+class CatalogRegistry(ReloadingRegistry):
+    """
+    Every repo catalog, loaded once at startup and reloaded when its
+    file changes (a re-ingest in this or another process).
+    """
+
+    def __init__(self, base_dir="db/catalog"):
+
+        super().__init__()
+
+        self.base_dir = base_dir
+
+        if os.path.isdir(base_dir):
+
+            for file_name in sorted(os.listdir(base_dir)):
+
+                if file_name.endswith(".json"):
+                    self.get(file_name[:-len(".json")])
+
+        print(f"Catalogs loaded for {len(self)} repos")
+
+    def _open(self, repo_name):
+
+        return RepoCatalog(repo_name, base_dir=self.base_dir)
+
+    def _version(self, catalog):
+
+        return file_mtime(catalog.path)
+
+    def version(self, repo_name: str):
+
+        # The catalog is the last artifact an ingest writes, so its mtime
+        # changes exactly when the repo's indexed contents do
+        return file_mtime(os.path.join(self.base_dir, f"{repo_name}.json"))
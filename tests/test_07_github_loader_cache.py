@@ -0,0 +1,88 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+from services.codebase_assistant.ingestion.github_loader import GitHubLoader
+
+
+print("\n=== TEST 7: SHALLOW CACHED CLONE (LOCAL BARE REPO) ===\n")
+
+
+def git(*args, cwd):
+
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def commit_file(work_dir, name, text, message):
+
+    with open(os.path.join(work_dir, name), "w") as f:
+        f.write(text)
+
+    git("add", name, cwd=work_dir)
+    git("-c", "user.name=test", "-c", "user.email=test@example.com",
+        "commit", "-m", message, cwd=work_dir)
+
+
+tmp = tempfile.mkdtemp()
+
+bare_path = os.path.join(tmp, "demo.git")
+work_path = os.path.join(tmp, "work")
+
+
+# Step 1: create a bare repo with two commits on main
+git("init", "--bare", "--initial-branch=main", bare_path, cwd=tmp)
+git("clone", bare_path, work_path, cwd=tmp)
+git("checkout", "-b", "main", cwd=work_path)
+
+commit_file(work_path, "app.py", "def first():\n    return 1\n", "first")
+commit_file(work_path, "app.py", "def second():\n    return 2\n", "second")
+
+git("push", "origin", "main", cwd=work_path)
+
+
+# file:// so git honours --depth for a local path
+repo_url = f"file://{bare_path}"
+
+loader = GitHubLoader(base_dir=os.path.join(tmp, "codebases"))
+
+
+# Step 2: first clone is shallow
+clone_path = loader.clone_repo(repo_url)
+
+depth = subprocess.run(
+    ["git", "rev-list", "--count", "HEAD"],
+    cwd=clone_path, capture_output=True, text=True, check=True
+).stdout.strip()
+
+print("Commits in clone:", depth)
+
+assert depth == "1"
+assert "second" in open(os.path.join(clone_path, "app.py")).read()
+
+
+# Step 3: new push is picked up with fetch, not a re-clone
+marker = os.path.join(clone_path, ".git", "cache-marker")
+open(marker, "w").close()
+
+commit_file(work_path, "app.py", "def third():\n    return 3\n", "third")
+git("push", "origin", "main", cwd=work_path)
+
+clone_path = loader.clone_repo(repo_url)
+
+assert os.path.exists(marker), "checkout was re-cloned instead of fetched"
+assert "third" in open(os.path.join(clone_path, "app.py")).read()
+
+
+# Step 4: ingest a specific ref
+git("tag", "v1", "HEAD~2", cwd=work_path)
+git("push", "origin", "v1", cwd=work_path)
+
+clone_path = loader.clone_repo(repo_url, ref="v1")
+
+assert "first" in open(os.path.join(clone_path, "app.py")).read()
+
+
+shutil.rmtree(tmp)
+
+print("\nTEST 7 PASSED\n")
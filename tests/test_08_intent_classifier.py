@@ -0,0 +1,108 @@
+import os
+import time
+
+from services.codebase_assistant.vectorstore.chroma_store import ChromaStore
+from services.codebase_assistant.retrieval.intent_router import IntentRouter
+
+
+print("\n=== TEST 8: LOCAL INTENT CLASSIFIER ACCURACY ===\n")
+
+
+# Held out from the classifier's example questions
+LABELLED = [
+    ("What is this repo about?", "overview"),
+    ("Summarize the codebase for a new engineer", "overview"),
+    ("What are the major modules and what do they do?", "overview"),
+    ("Give me an overview of the architecture", "overview"),
+    ("What kind of application is this?", "overview"),
+
+    ("Which endpoints does the API expose?", "api"),
+    ("What routes handle ingestion?", "api"),
+    ("List every GET and POST handler", "api"),
+    ("What is the request body for /ask?", "api"),
+    ("What web API does the service provide?", "api"),
+
+    ("How does a question get answered end to end?", "flow"),
+    ("What happens when I ingest a GitHub repo?", "flow"),
+    ("How does the retriever combine vector and graph results?", "flow"),
+    ("Trace the path of a chunk from parsing to storage", "flow"),
+    ("How does the system decide which chunks to send to the LLM?", "flow"),
+
+    ("How do I set up the project on my machine?", "setup"),
+    ("What do I need to install before running it?", "setup"),
+    ("How can I run the API server?", "setup"),
+    ("Is there a Dockerfile for deployment?", "setup"),
+    ("Which Python version and packages are required?", "setup"),
+
+    ("What does the ingest_local function return?", "specific"),
+    ("How does ChromaStore.search build its filter?", "specific"),
+    ("What parameters does the GitHubLoader constructor accept?", "specific"),
+    ("Explain the _fuse_rankings helper", "specific"),
+    ("Where is OPENAI_API_KEY read?", "specific"),
+
+    ("Where is HybridRetriever.retrieve used?", "usage"),
+    ("Who calls ask_batch?", "usage"),
+    ("Which classes use the LRUCache?", "usage"),
+    ("List the callers of extract_chunks", "usage"),
+    ("What depends on the GraphStore?", "usage"),
+]
+
+
+store = ChromaStore()
+
+router = IntentRouter(vector_store=store)
+
+
+# Step 1: local classifier on its own
+start = time.perf_counter()
+
+local_correct = 0
+low_confidence = 0
+
+for question, expected in LABELLED:
+
+    intent, confidence, margin = router.local_classifier.classify(question)
+
+    if not router.is_confident(confidence, margin):
+        low_confidence += 1
+
+    if intent == expected:
+        local_correct += 1
+    else:
+        print(f"  local miss: {question!r} -> {intent} ({confidence:.2f}, margin {margin:.2f}), expected {expected}")
+
+local_ms = (time.perf_counter() - start) * 1000 / len(LABELLED)
+
+print(f"\nLocal accuracy: {local_correct}/{len(LABELLED)} ({local_ms:.1f} ms/question)")
+print(f"Sent to LLM (confidence < {router.threshold} or margin < {router.min_margin}): {low_confidence}")
+
+assert local_correct / len(LABELLED) >= 0.7
+
+
+# Step 2: existing LLM prompt on the same set, when a key is available
+if os.getenv("OPENAI_API_KEY"):
+
+    start = time.perf_counter()
+
+    llm_correct = 0
+    agree = 0
+
+    for question, expected in LABELLED:
+
+        llm_intent = router.detect_intent_llm(question)
+        local_intent = router.local_classifier.classify(question)[0]
+
+        llm_correct += llm_intent == expected
+        agree += llm_intent == local_intent
+
+    llm_ms = (time.perf_counter() - start) * 1000 / len(LABELLED)
+
+    print(f"\nLLM accuracy: {llm_correct}/{len(LABELLED)} ({llm_ms:.1f} ms/question)")
+    print(f"Local/LLM agreement: {agree}/{len(LABELLED)}")
+
+else:
+
+    print("\nOPENAI_API_KEY not set, skipping LLM comparison")
+
+
+print("\nTEST 8 PASSED\n")
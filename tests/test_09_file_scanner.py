@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+
+from services.codebase_assistant.ingestion.file_scanner import FileScanner
+
+
+print("\n=== TEST 9: FILE SCANNER FILTERS ===\n")
+
+
+def write(root, name, text):
+
+    path = os.path.join(root, name)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w") as f:
+        f.write(text)
+
+
+tmp = tempfile.mkdtemp()
+
+
+# Hand-written files that only look generated to a naive check
+write(tmp, "README.md", "# Demo\n\n" + "An unwrapped paragraph of prose. " * 60 + "\n")
+write(tmp, "settings.py", "# Do not edit these defaults directly\nDEBUG = False\n")
+write(tmp, "app.py", "def main():\n    return 1\n")
+
+# Tool output
+write(tmp, "api_client.py", "# Code generated by openapi-generator. DO NOT EDIT.\nclass Client:\n    pass\n")
+write(tmp, "schema.ts", "// @generated\nexport type Id = string;\n")
+write(tmp, "static/app.js", "var a=1;" * 200 + "\n")
+
+
+scanner = FileScanner(tmp, "demo")
+
+found = sorted(os.path.relpath(f["file_path"], tmp) for f in scanner.scan())
+
+print("Found:", found)
+print("Skipped:", dict(scanner.skip_stats))
+
+
+assert "README.md" in found, "long prose line flagged as generated"
+assert "settings.py" in found, "'do not edit' comment flagged as generated"
+assert "app.py" in found
+
+assert "api_client.py" not in found
+assert "schema.ts" not in found
+assert os.path.join("static", "app.js") not in found
+
+assert scanner.skip_stats["generated"] == 3
+
+
+# Symlinks: linked files are read, linked directories are not entered
+# (a link back up the tree would loop), dangling links are skipped
+links = tempfile.mkdtemp()
+
+write(links, "pkg/real.py", "def real():\n    return 1\n")
+
+os.symlink(os.path.join(links, "pkg", "real.py"), os.path.join(links, "pkg", "alias.py"))
+os.symlink(links, os.path.join(links, "pkg", "loop"))
+os.symlink(os.path.join(links, "missing.py"), os.path.join(links, "dangling.py"))
+
+found = sorted(
+    os.path.relpath(f["file_path"], links) for f in FileScanner(links, "demo").scan()
+)
+
+print("Found with symlinks:", found)
+
+assert found == [os.path.join("pkg", "alias.py"), os.path.join("pkg", "real.py")]
+
+
+shutil.rmtree(links)
+shutil.rmtree(tmp)
+
+print("\nTEST 9 PASSED")
@@ -0,0 +1,218 @@
+import os
+import shutil
+import tempfile
+
+from services.codebase_assistant.ingestion.python_ast_extractor import PythonAstExtractor
+from services.codebase_assistant.graph.dependency_extractor import DependencyExtractor
+from services.codebase_assistant.graph.graph_store import GraphStore
+
+
+print("\n=== TEST 10: INCREMENTAL DEPENDENCY GRAPH PATCHES ===\n")
+
+
+FILES = {
+
+    "pkg/__init__.py": "",
+
+    "pkg/store.py": (
+        "class Store:\n"
+        "\n"
+        "    def search(self, query):\n"
+        "        return self.save(query)\n"
+        "\n"
+        "    def save(self, item):\n"
+        "        return item\n"
+    ),
+
+    "pkg/service.py": (
+        "from pkg.store import Store\n"
+        "\n"
+        "\n"
+        "class Service:\n"
+        "\n"
+        "    def __init__(self):\n"
+        "        self.store = Store()\n"
+        "\n"
+        "    def ask(self, question):\n"
+        "        return self.store.search(question)\n"
+    ),
+
+    "pkg/main.py": (
+        "from pkg.service import Service\n"
+        "\n"
+        "\n"
+        "def run():\n"
+        "    return Service().ask('hi')\n"
+    )
+}
+
+
+tmp = tempfile.mkdtemp()
+
+repo_root = os.path.join(tmp, "repo")
+graph_dir = os.path.join(tmp, "graph")
+
+ast_extractor = PythonAstExtractor()
+
+
+def write(rel_path, text):
+
+    path = os.path.join(repo_root, rel_path)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def file_info(rel_path):
+
+    return {
+        "repo_name": "demo",
+        "file_path": os.path.join(repo_root, rel_path),
+        "file_name": os.path.basename(rel_path),
+        "language": "python"
+    }
+
+
+def chunk_id(rel_path, component):
+
+    return f"demo:{os.path.join(repo_root, rel_path)}:{component}"
+
+
+def chunks_for(rel_path):
+
+    # Same ids and metadata the chunk extractor produces
+    info = file_info(rel_path)
+
+    with open(info["file_path"]) as f:
+        code = f.read()
+
+    chunks = [{
+        "chunk_id": chunk_id(rel_path, info["file_name"]),
+        "code": code,
+        "metadata": {"file_path": info["file_path"], "chunk_type": "file"}
+    }]
+
+    for definition in ast_extractor.extract(code) or []:
+
+        chunks.append({
+            "chunk_id": chunk_id(rel_path, definition["component_id"]),
+            "metadata": {
+                "file_path": info["file_path"],
+                "chunk_type": definition["kind"],
+                "start_line": definition["start_line"]
+            }
+        })
+
+    return chunks
+
+
+def full_build(repo_name):
+
+    extractor = DependencyExtractor(repo_name, repo_root=repo_root, base_dir=graph_dir)
+
+    extractor.reset()
+
+    for rel_path in sorted(FILES):
+        extractor.add_file(file_info(rel_path), chunks_for(rel_path))
+
+    extractor.finalize()
+
+    return GraphStore(repo_name, base_dir=graph_dir).load()
+
+
+def incremental(changed, removed=()):
+
+    extractor = DependencyExtractor("demo", repo_root=repo_root, base_dir=graph_dir)
+
+    assert extractor.has_state()
+
+    extractor.remove_files([file_info(p)["file_path"] for p in list(changed) + list(removed)])
+
+    for rel_path in changed:
+        extractor.add_file(file_info(rel_path), chunks_for(rel_path))
+
+    extractor.finalize()
+
+    return GraphStore("demo", base_dir=graph_dir).load()
+
+
+def edges(graph):
+
+    return {node: sorted(targets) for node, targets in graph.to_dict().items() if targets}
+
+
+def reverse_matches(graph):
+
+    # callers() must agree with the forward edges, overlay included
+    forward = edges(graph)
+
+    nodes = set(forward).union(t for targets in forward.values() for t in targets)
+
+    return all(
+        sorted(graph.callers(node)) == sorted(s for s, t in forward.items() if node in t)
+        for node in nodes
+    )
+
+
+for rel_path, text in FILES.items():
+    write(rel_path, text)
+
+
+# Step 1: full build
+graph = full_build("demo")
+
+ask = chunk_id("pkg/service.py", "Service.ask")
+search = chunk_id("pkg/store.py", "Store.search")
+
+print("Callers of Store.search:", graph.callers(search))
+
+assert graph.callers(search) == [ask]
+assert reverse_matches(graph)
+
+
+# Step 2: rename Store.search -> Store.lookup in one file
+FILES["pkg/store.py"] = FILES["pkg/store.py"].replace("def search", "def lookup")
+write("pkg/store.py", FILES["pkg/store.py"])
+
+graph = incremental(["pkg/store.py"])
+
+print("Overlay after rename:", len(graph.overlay), "nodes")
+
+assert graph.overlay, "rename was not patched into the overlay"
+assert graph.find("search") == []
+assert graph.find("lookup") == [chunk_id("pkg/store.py", "Store.lookup")]
+assert search not in graph.neighbors(ask)
+assert reverse_matches(graph)
+assert edges(graph) == edges(full_build("demo_full_1"))
+
+
+# Step 3: delete a file
+del FILES["pkg/main.py"]
+os.remove(os.path.join(repo_root, "pkg/main.py"))
+
+graph = incremental([], removed=["pkg/main.py"])
+
+print("Callers of Service.ask after delete:", graph.callers(ask))
+
+assert graph.find("run") == []
+assert graph.callers(ask) == []
+assert reverse_matches(graph)
+assert edges(graph) == edges(full_build("demo_full_2"))
+
+
+# Step 4: compaction drops the tombstones
+graph.max_overlay = 0
+graph.patch({})
+
+graph = GraphStore("demo", base_dir=graph_dir).load()
+
+assert not graph.overlay
+assert chunk_id("pkg/main.py", "run") not in graph.nodes
+assert edges(graph) == edges(full_build("demo_full_3"))
+
+
+shutil.rmtree(tmp)
+
+print("\nTEST 10 PASSED")
@@ -0,0 +1,124 @@
+import functools
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from services.codebase_assistant.vectorstore import chroma_store
+from services.codebase_assistant.vectorstore.chroma_store import ChromaStore
+from services.codebase_assistant.vectorstore.repo_catalog import CatalogRegistry
+from services.codebase_assistant.retrieval import hybrid_retriever
+from services.codebase_assistant.retrieval.hybrid_retriever import HybridRetriever
+from services.codebase_assistant.retrieval.lexical_index import LexicalIndex, LexicalIndexRegistry
+from services.codebase_assistant.graph.graph_store import GraphStore
+
+
+print("\n=== TEST 11: LEXICAL-ONLY SEEDS THROUGH GRAPH EXPANSION ===\n")
+
+
+class FakeModel:
+    """
+    Offline stand-in for the sentence-transformers model: texts that
+    mention "vectorword" point one way, everything else the other.
+    """
+
+    def __init__(self, name):
+
+        self.name = name
+
+    def get_sentence_embedding_dimension(self):
+
+        return 2
+
+    def encode(self, texts, **kwargs):
+
+        return np.asarray(
+            [[float(text.count("vectorword")), 1.0] for text in texts],
+            dtype=np.float32
+        )
+
+
+tmp = tempfile.mkdtemp()
+
+chroma_store.SentenceTransformer = FakeModel
+
+hybrid_retriever.ChromaStore = functools.partial(
+    ChromaStore,
+    persist_dir=os.path.join(tmp, "chroma"),
+    embedding_cache_path=None
+)
+
+
+def make_chunk(file_name, code):
+
+    file_path = f"/repo/{file_name}"
+
+    return {
+        "chunk_id": f"demo:{file_path}:{file_name}",
+        "component_id": file_name,
+        "code": code,
+        "metadata": {
+            "repo_name": "demo",
+            "file_path": file_path,
+            "file_name": file_name,
+            "chunk_type": "file"
+        }
+    }
+
+
+# vector_hit wins the vector search, lexical_hit only BM25, and helper
+# is reachable from lexical_hit through the graph alone
+vector_hit = make_chunk("store.py", "def vectorword():\n    return 1\n")
+lexical_hit = make_chunk("service.py", "def lexword():\n    return lexword(lexword)\n")
+helper = make_chunk("helper.py", "def unrelated():\n    return 2\n")
+
+chunks = [vector_hit, lexical_hit, helper]
+
+retriever = HybridRetriever(graph_dir=os.path.join(tmp, "graph"))
+
+retriever.catalogs = CatalogRegistry(os.path.join(tmp, "catalog"))
+retriever.lexical_indexes = LexicalIndexRegistry(os.path.join(tmp, "lexical"))
+
+retriever.vector_store.store_chunks(chunks)
+
+index = LexicalIndex("demo", base_dir=os.path.join(tmp, "lexical"))
+index.add_chunks(chunks)
+index.save()
+
+GraphStore("demo", base_dir=os.path.join(tmp, "graph")).save({
+    lexical_hit["chunk_id"]: [helper["chunk_id"]]
+})
+
+
+query = "vectorword lexword"
+
+assert retriever.vector_store.search(query, "demo", top_k=1)["ids"][0] == [vector_hit["chunk_id"]]
+assert [chunk_id for chunk_id, _ in index.search(query, top_k=1)] == [lexical_hit["chunk_id"]]
+
+
+for mode in ("bfs", "ppr"):
+
+    retriever.expand_mode = mode
+    retriever.result_cache.invalidate()
+
+    # Used to fail with DuplicateIDError: the lexical-only seed came
+    # back from expansion and was fetched twice
+    results = retriever.retrieve(query, "demo", top_k=1, expand_k=2)
+
+    print(f"{mode}: {len(results)} chunks")
+
+    assert lexical_hit["code"] in results
+    assert vector_hit["code"] in results
+    assert helper["code"] in results
+    assert len(results) == len(set(results))
+
+
+fetched = retriever._fetch_ids("demo", [helper["chunk_id"], helper["chunk_id"]])
+
+assert fetched["ids"] == [helper["chunk_id"]]
+
+
+shutil.rmtree(tmp)
+
+print("\nTEST 11 PASSED")
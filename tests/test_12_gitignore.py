@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+
+from services.codebase_assistant.ingestion.gitignore import GitIgnoreRules, is_ignored
+from services.codebase_assistant.ingestion.file_scanner import FileScanner
+
+
+print("\n=== TEST 12: GITIGNORE MATCHING ===\n")
+
+
+def ignored(lines, rel_path, is_dir=False, base_dir=""):
+
+    return is_ignored([GitIgnoreRules(base_dir, lines)], rel_path, is_dir)
+
+
+# Unanchored names match at any depth, anchored ones from the base only
+assert ignored(["*.log"], "debug.log")
+assert ignored(["*.log"], "logs/deep/debug.log")
+assert ignored(["/build"], "build", is_dir=True)
+assert not ignored(["/build"], "src/build", is_dir=True)
+assert ignored(["docs/*.md"], "docs/intro.md")
+assert not ignored(["docs/*.md"], "docs/guide/intro.md")
+
+# * and ? stop at /, ** does not
+assert not ignored(["src/*"], "src/a/b.py")
+assert ignored(["src/**/b.py"], "src/a/c/b.py")
+assert ignored(["src/**/b.py"], "src/b.py")
+assert ignored(["**/cache"], "a/b/cache", is_dir=True)
+assert ignored(["out/**"], "out/x/y.py")
+assert ignored(["file?.py"], "file1.py")
+assert not ignored(["file?.py"], "file10.py")
+
+# Directory-only patterns skip files of the same name
+assert ignored(["tmp/"], "tmp", is_dir=True)
+assert not ignored(["tmp/"], "tmp", is_dir=False)
+
+# Last matching rule wins; ! re-includes
+assert not ignored(["*.py", "!keep.py"], "keep.py")
+assert ignored(["*.py", "!keep.py", "keep.py"], "keep.py")
+
+# Comments, blank lines, escaped # and !
+assert not ignored(["# *.py", "", "   "], "a.py")
+assert ignored(["\\#notes.txt"], "#notes.txt")
+assert ignored(["\\!important.txt"], "!important.txt")
+
+# Nested .gitignore: paths outside its directory are not its business
+assert ignored(["*.json"], "pkg/data.json", base_dir="pkg")
+assert not ignored(["*.json"], "other/data.json", base_dir="pkg")
+assert not ignored(["*.json"], "pkg.json", base_dir="pkg")
+
+# Character classes
+assert ignored(["[abc].py"], "b.py")
+assert not ignored(["[abc].py"], "d.py")
+assert ignored(["[a-c].py"], "b.py")
+assert ignored(["[!a-c].py"], "d.py")
+assert not ignored(["[!a-c].py"], "b.py")
+
+# ] first in a class is a member; regex metacharacters are literal
+assert ignored(["[]x].py"], "].py")
+assert ignored(["[]x].py"], "x.py")
+assert ignored(["[\\^].py"], "^.py")
+assert not ignored(["[.].py"], "a.py")
+
+# Unterminated or invalid classes never raise
+assert ignored(["[]x.py"], "[]x.py")
+assert ignored(["foo["], "foo[")
+assert GitIgnoreRules("", ["[z-a].py"]).rules == []
+assert ignored(["[z-a].py", "*.tmp"], "a.tmp")
+
+
+# A bad pattern in a real .gitignore must not abort the scan
+tmp = tempfile.mkdtemp()
+
+with open(os.path.join(tmp, ".gitignore"), "w") as f:
+    f.write("[]x.py\n[z-a].py\nskip_*.py\n")
+
+for name in ("app.py", "skip_me.py", "x.py"):
+
+    with open(os.path.join(tmp, name), "w") as f:
+        f.write("def main():\n    return 1\n")
+
+scanner = FileScanner(tmp, "demo")
+
+found = sorted(f["file_name"] for f in scanner.scan())
+
+print("Found:", found)
+
+assert found == ["app.py", "x.py"]
+assert scanner.skip_stats["gitignored"] == 1
+
+
+shutil.rmtree(tmp)
+
+print("\nTEST 12 PASSED")
@@ -0,0 +1,106 @@
+import ast
+
+from services.codebase_assistant.ingestion.python_ast_extractor import PythonAstExtractor
+
+
+print("\n=== TEST 13: AST DEFINITION CHUNKER ===\n")
+
+
+CODE = (
+    "import functools\n"
+    "\n"
+    "\n"
+    "class Store:\n"
+    "\n"
+    "    @property\n"
+    "    def size(self):\n"
+    "        return self._size\n"
+    "\n"
+    "    @size.setter\n"
+    "    def size(self, value):\n"
+    "        self._size = value\n"
+    "\n"
+    "    class Meta:\n"
+    "        def options(self):\n"
+    "            return {}\n"
+    "\n"
+    "    def search(self, query):\n"
+    "\n"
+    "        def score(hit):\n"
+    "            return hit\n"
+    "\n"
+    "        return score(query)\n"
+    "\n"
+    "\f\n"
+    "@functools.lru_cache()\n"
+    "async def fetch(url):\n"
+    "    return url\n"
+    "\n"
+    "\n"
+    "try:\n"
+    "    def fast():\n"
+    "        return 1\n"
+    "except ImportError:\n"
+    "    def fast():\n"
+    "        return 2\n"
+)
+
+
+extractor = PythonAstExtractor()
+
+definitions = extractor.extract(CODE)
+
+by_id = {definition["component_id"]: definition for definition in definitions}
+
+for definition in definitions:
+    print(f"  {definition['kind']:8} {definition['component_id']:24} {definition['start_line']}-{definition['end_line']}")
+
+
+# Step 1: qualified names and enclosing classes
+assert by_id["Store"]["kind"] == "class"
+assert by_id["Store.Meta"]["class_name"] == "Meta"
+assert by_id["Store.Meta.options"]["class_name"] == "Meta"
+assert by_id["Store.search"]["class_name"] == "Store"
+
+# Nested functions keep the enclosing class
+assert by_id["Store.search.score"]["class_name"] == "Store"
+assert by_id["fetch"]["class_name"] is None
+
+
+# Step 2: decorators are part of the span
+size = by_id["Store.size"]
+
+assert size["start_line"] == 6
+assert size["code"].startswith("    @property\n")
+assert size["code"].endswith("return self._size\n")
+
+fetch = by_id["fetch"]
+
+assert fetch["code"].startswith("@functools.lru_cache()\n")
+assert "async def fetch" in fetch["code"]
+
+
+# Step 3: redefinitions get distinct ids
+assert by_id["Store.size@10"]["qualname"] == "Store.size"
+assert "@size.setter" in by_id["Store.size@10"]["code"]
+
+assert by_id["fast"]["start_line"] == 32
+assert by_id["fast@35"]["code"].strip().endswith("return 2")
+
+assert len(by_id) == len(definitions)
+
+
+# Step 4: a form feed line does not shift the spans after it
+assert fetch["start_line"] == 26
+assert CODE.split("\n")[fetch["start_line"] - 1] == "@functools.lru_cache()"
+
+
+# Step 5: a tree parsed by the caller gives the same result
+assert extractor.extract(CODE, tree=ast.parse(CODE)) == definitions
+
+
+# Step 6: unparsable code is left to the regex fallback
+assert extractor.extract("def broken(:\n    pass\n") is None
+
+
+print("\nTEST 13 PASSED")
@@ -0,0 +1,153 @@
+import re
+
+from services.codebase_assistant.ingestion.token_splitter import TokenWindowSplitter
+from services.codebase_assistant.llm.context_packer import ContextPacker
+
+
+print("\n=== TEST 14: TOKEN WINDOWS AND CONTEXT PACKING ===\n")
+
+
+class FakeEncoding:
+    """
+    Offline stand-in for a tiktoken encoding: every word, run of
+    whitespace and punctuation mark is one token, and decoding is
+    lossless, so counts are easy to reason about.
+    """
+
+    def encode(self, text, disallowed_special=()):
+
+        return re.findall(r"\w+|\s+|[^\w\s]", text)
+
+    def decode(self, tokens):
+
+        return "".join(tokens)
+
+
+def words(n, start=0):
+
+    # "w0 w1 w2 ..." is 2 * n - 1 tokens
+    return " ".join(f"w{i}" for i in range(start, start + n))
+
+
+# ==============================
+# TOKEN WINDOW SPLITTER
+# ==============================
+
+splitter = TokenWindowSplitter(max_tokens=20, overlap=4, max_windows=3)
+splitter._encoding = FakeEncoding()
+
+
+# Step 1: short text is returned as is, without encoding
+windows, truncated = splitter.split("def f(): pass")
+
+assert windows == ["def f(): pass"] and not truncated
+
+
+# Step 2: long in characters but within the token limit stays whole
+text = "x" * 50
+
+assert splitter.split(text) == ([text], False)
+
+
+# Step 3: windows are max_tokens long and overlap by overlap tokens
+text = words(16)
+
+windows, truncated = splitter.split(text)
+
+print("Windows:", windows)
+
+assert not truncated
+assert len(windows) == 2
+assert windows[0] == FakeEncoding().decode(FakeEncoding().encode(text)[:20])
+assert all(len(FakeEncoding().encode(window)) <= 20 for window in windows)
+
+# The second window starts 16 tokens in, 4 before the first one ends
+assert windows[1].startswith("w8 ")
+assert windows[0].endswith("w9 ")
+
+# The tail is covered exactly once
+assert windows[-1].endswith("w15")
+
+
+# Step 4: past max_windows the rest is dropped and flagged
+windows, truncated = splitter.split(words(200))
+
+assert truncated
+assert len(windows) == 3
+assert "w199" not in "".join(windows)
+
+
+# Step 5: overlap must leave a stride
+try:
+    TokenWindowSplitter(max_tokens=8, overlap=8)
+    raise AssertionError("overlap >= max_tokens accepted")
+except ValueError:
+    pass
+
+
+# ==============================
+# CONTEXT PACKER
+# ==============================
+
+packer = ContextPacker(max_tokens=100, max_chunk_tokens=40, min_chunk_tokens=10)
+packer._encoding = FakeEncoding()
+
+marker_tokens = packer.count_tokens(ContextPacker.TRUNCATION_MARKER)
+
+
+# Step 6: duplicates and contained chunks are dropped, order is kept
+small = "def helper(): return 1"
+large = "class Service:\n    " + small + "\n"
+other = "def other(): return 2"
+
+packed, stats = packer.pack([large, small, other, large, "   "])
+
+print("Packed:", packed, stats)
+
+assert packed == [large, other]
+# The blank chunk counts with the duplicates
+assert stats["duplicates"] == 2
+assert stats["contained"] == 1
+assert stats["tokens"] == packer.count_tokens(large) + packer.count_tokens(other)
+
+
+# Step 7: a chunk over max_chunk_tokens is cut to it, with the marker
+long_chunk = words(50)
+
+packed, stats = packer.pack([long_chunk])
+
+assert stats["trimmed"] == 1
+assert packed[0].endswith(ContextPacker.TRUNCATION_MARKER)
+assert packer.count_tokens(packed[0]) <= 40
+assert packer.count_tokens(packed[0]) >= 40 - marker_tokens
+
+
+# A trimmed chunk is no stand-in for the text it contains
+packed, stats = packer.pack([long_chunk, "w1"])
+
+assert packed[1] == "w1" and stats["contained"] == 0
+
+
+# Step 8: the budget is never exceeded; tiny leftovers are skipped
+chunks = [words(20, start=100 * i) for i in range(4)]
+
+packed, stats = packer.pack(chunks, reserved_tokens=10)
+
+print("Budget stats:", stats)
+
+assert stats["tokens"] <= 100
+assert sum(packer.count_tokens(chunk) for chunk in packed) + 10 <= 100
+
+# 39 + 39 tokens fit whole, 12 are left: worth a trimmed head
+assert packed[:2] == chunks[:2]
+assert packed[2].endswith(ContextPacker.TRUNCATION_MARKER)
+assert stats["skipped"] == 1
+
+packed, stats = packer.pack(chunks, reserved_tokens=20)
+
+# Only 2 tokens left after two whole chunks: below min_chunk_tokens
+assert packed == chunks[:2]
+assert stats["skipped"] == 2
+
+
+print("\nTEST 14 PASSED")
@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+
+from services.codebase_assistant.retrieval.lexical_index import LexicalIndex, tokenize
+
+
+print("\n=== TEST 15: BM25 LEXICAL INDEX ===\n")
+
+
+def chunk(file_path, component_id, code):
+
+    return {
+        "chunk_id": f"demo:{file_path}:{component_id}",
+        "component_id": component_id,
+        "code": code,
+        "metadata": {"file_path": file_path, "file_name": file_path.rsplit("/", 1)[-1]}
+    }
+
+
+CHUNKS = [
+    chunk("store.py", "ChromaStore.store_chunks", "def store_chunks(self, chunks):\n    self.writer.submit(chunks)"),
+    chunk("store.py", "ChromaStore.search", "def search(self, query):\n    return self.collection.query(query)"),
+    chunk("graph.py", "GraphStore.neighbors", "def neighbors(self, node_id):\n    return self.edges[node_id]"),
+    chunk("graph.py", "GraphStore.callers", "def callers(self, node_id):\n    return self.rev_edges[node_id]"),
+    chunk("api.py", "ask", "def ask(question):\n    return llm.answer(question)"),
+]
+
+
+# Step 1: identifiers are indexed whole and split on _ and case
+terms = tokenize("ChromaStore.store_chunks(self, HTTPServer)")
+
+print("Terms:", terms)
+
+for term in ("chromastore", "chroma", "store", "store_chunks", "chunks", "httpserver", "http", "server"):
+    assert term in terms
+
+# Stopwords and one-letter names carry no signal
+assert "self" not in terms
+assert tokenize("for x in range") == ["range"]
+
+
+# Step 2: exact identifiers rank their chunk first
+tmp = tempfile.mkdtemp()
+
+index = LexicalIndex("demo", base_dir=tmp)
+index.add_chunks(CHUNKS)
+
+hits = index.search("where is store_chunks called?")
+
+print("Hits:", hits)
+
+assert hits[0][0] == "demo:store.py:ChromaStore.store_chunks"
+
+assert index.search("GraphStore callers")[0][0] == "demo:graph.py:GraphStore.callers"
+
+assert index.search("nothing matches this") == []
+
+
+# Step 3: terms in most chunks are skipped
+assert index.search("def return") == []
+
+
+# Step 4: re-adding a chunk replaces it instead of counting it twice
+total_len = index.total_len
+
+index.add_chunks([CHUNKS[0]])
+
+assert index.total_len == total_len
+assert index.files["store.py"].count(CHUNKS[0]["chunk_id"]) == 1
+
+edited = dict(CHUNKS[0], code="def store_chunks(self, rows):\n    pass")
+
+index.add_chunks([edited])
+
+assert index.search("writer submit") == []
+assert index.search("rows")[0][0] == CHUNKS[0]["chunk_id"]
+
+
+# Step 5: removing a file drops its chunks and their postings
+index.remove_files(["graph.py"])
+
+assert "graph.py" not in index.files
+assert "neighbors" not in index.postings
+assert all("graph.py" not in chunk_id for chunk_id, _ in index.search("node_id edges"))
+assert index.total_len == sum(index.doc_len.values())
+
+
+# Step 6: save and load round trip, removal works on the loaded copy
+index.save()
+
+loaded = LexicalIndex("demo", base_dir=tmp).load()
+
+assert loaded.postings == index.postings
+assert loaded.files == index.files
+assert loaded.search("rows") == index.search("rows")
+
+loaded.remove_files(["api.py"])
+
+assert loaded.search("question answer") == []
+assert loaded.total_len == sum(loaded.doc_len.values())
+
+assert LexicalIndex("missing", base_dir=tmp).load() is None
+
+
+shutil.rmtree(tmp)
+
+print("\nTEST 15 PASSED")
@@ -0,0 +1,187 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from services.codebase_assistant.graph.graph_store import GraphStore, GraphStoreRegistry, StringTable, name_keys
+
+
+print("\n=== TEST 16: CSR GRAPH STORE ===\n")
+
+
+GRAPH = {
+    "demo:api.py:api.py": ["demo:api.py:ask"],
+    "demo:api.py:ask": ["demo:svc.py:Service.answer", "demo:store.py:Store.search"],
+    "demo:svc.py:Service.answer": ["demo:store.py:Store.search", "demo:store.py:Store.search"],
+    "demo:store.py:Store.search": ["demo:store.py:Store.save"],
+}
+
+
+def versions(graph):
+
+    return sorted(name for name in os.listdir(graph.path) if name.startswith("v"))
+
+
+# Step 1: string table
+table = StringTable.build(sorted(["b", "a", "é", "ä:x", "\U0001F600"]))
+
+assert len(table) == 5
+assert list(table) == sorted(["b", "a", "é", "ä:x", "\U0001F600"])
+assert table.index("é") == list(table).index("é")
+assert "b" in table and "c" not in table
+assert StringTable.build([]).index("a") is None
+
+
+# Step 2: names a node is found by
+assert name_keys("demo:store.py:Store.search") == {"Store.search", "search"}
+assert name_keys("demo:pkg/store.py:store.py") == {"store.py", "py", "store"}
+assert name_keys("demo:a.py:fast@12") == {"fast"}
+
+
+# Step 3: save, then everything reads back from mapped arrays
+tmp = tempfile.mkdtemp()
+
+graph = GraphStore("demo", base_dir=tmp)
+graph.save(GRAPH)
+
+loaded = GraphStore("demo", base_dir=tmp).load()
+
+print(f"Loaded {len(loaded)} nodes, {loaded.edge_count} edges, version {loaded.version}")
+
+assert isinstance(loaded.edges, np.memmap)
+assert isinstance(loaded.nodes.blob, np.memmap)
+
+assert len(loaded) == 5
+assert loaded.edge_count == 5
+
+# Duplicate edges are stored once, in first-seen order
+assert loaded.neighbors("demo:svc.py:Service.answer") == ["demo:store.py:Store.search"]
+assert loaded.neighbors("demo:api.py:ask") == GRAPH["demo:api.py:ask"]
+
+# Pure targets are nodes too
+assert loaded.get("demo:store.py:Store.save") == []
+assert loaded.get("demo:missing.py:x") is None
+assert loaded.neighbors("demo:missing.py:x") == []
+
+assert sorted(loaded.callers("demo:store.py:Store.search")) == [
+    "demo:api.py:ask", "demo:svc.py:Service.answer"
+]
+
+assert loaded.find("search") == ["demo:store.py:Store.search"]
+assert loaded.find("Store.search") == ["demo:store.py:Store.search"]
+assert loaded.find("api") == ["demo:api.py:api.py"]
+assert loaded.find("nothing") == []
+
+assert loaded.to_dict() == graph.to_dict()
+
+
+# Step 4: neighbourhood walk
+node_ids, sources, targets = loaded.subgraph(["demo:api.py:ask"], max_hops=1, max_nodes=10)
+
+assert node_ids[0] == "demo:api.py:ask"
+assert set(node_ids) == {"demo:api.py:ask", "demo:svc.py:Service.answer", "demo:store.py:Store.search"}
+assert len(sources) == len(targets) == 2
+
+node_ids, _, _ = loaded.subgraph(["demo:api.py:api.py"], max_hops=5, max_nodes=3)
+
+assert len(node_ids) == 3
+
+
+# Step 5: patches live in an overlay next to the CSR arrays
+loaded.patch({
+    "demo:store.py:Store.search": [],
+    "demo:new.py:helper": ["demo:store.py:Store.save"],
+    "demo:never.py:gone": []
+})
+
+patched = GraphStore("demo", base_dir=tmp).load()
+
+assert patched.version == loaded.version
+assert patched.neighbors("demo:store.py:Store.search") == []
+assert "demo:new.py:helper" in patched.callers("demo:store.py:Store.save")
+assert "demo:store.py:Store.search" not in patched.callers("demo:store.py:Store.save")
+assert patched.find("helper") == ["demo:new.py:helper"]
+assert "demo:never.py:gone" not in patched.overlay
+
+# An emptied node that is still called stays findable
+assert patched.find("search") == ["demo:store.py:Store.search"]
+
+
+# Step 6: compaction writes a new version and swaps CURRENT
+patched.max_overlay = 1
+
+patched.patch({"demo:api.py:ask": ["demo:new.py:helper"]})
+
+with open(os.path.join(tmp, "demo", "CURRENT")) as f:
+    current = f.read()
+
+assert current == patched.version != loaded.version
+assert patched.overlay == {}
+
+# The previous version stays for readers that still have it open
+assert versions(patched) == sorted([loaded.version, current])
+
+compacted = GraphStore("demo", base_dir=tmp).load()
+
+assert compacted.neighbors("demo:api.py:ask") == ["demo:new.py:helper"]
+assert compacted.to_dict() == patched.to_dict()
+
+compacted.save(GRAPH)
+
+assert versions(compacted) == sorted([current, compacted.version])
+
+
+# Step 7: the registry reopens a graph only when it changes
+registry = GraphStoreRegistry(base_dir=tmp)
+
+first = registry.get("demo")
+
+assert registry.get("demo") is first
+
+compacted.patch({"demo:api.py:api.py": []})
+
+second = registry.get("demo")
+
+assert second is not first
+assert second.neighbors("demo:api.py:api.py") == []
+
+assert registry.get("missing") is None
+
+
+# Step 8: a graph in the flat layout still loads
+legacy_dir = os.path.join(tmp, "legacy")
+os.makedirs(legacy_dir)
+
+nodes = ["demo:a.py:a", "demo:a.py:b"]
+
+with open(os.path.join(legacy_dir, "nodes.json"), "w") as f:
+    json.dump(nodes, f)
+
+np.save(os.path.join(legacy_dir, "offsets.npy"), np.asarray([0, 1, 1], dtype=np.int64))
+np.save(os.path.join(legacy_dir, "edges.npy"), np.asarray([1], dtype=np.int32))
+
+legacy = GraphStore("legacy", base_dir=tmp).load()
+
+assert legacy.version == ""
+assert legacy.neighbors("demo:a.py:a") == ["demo:a.py:b"]
+assert legacy.callers("demo:a.py:b") == ["demo:a.py:a"]
+assert legacy.find("b") == ["demo:a.py:b"]
+
+# The first save moves it to a version directory; the flat files are
+# the previous version until the next one
+legacy.save(legacy.to_dict())
+
+assert os.path.exists(os.path.join(legacy_dir, "nodes.json"))
+assert GraphStore("legacy", base_dir=tmp).load().neighbors("demo:a.py:a") == ["demo:a.py:b"]
+
+legacy.save(legacy.to_dict())
+
+assert not os.path.exists(os.path.join(legacy_dir, "nodes.json"))
+assert len(versions(legacy)) == 2
+
+
+shutil.rmtree(tmp)
+
+print("\nTEST 16 PASSED")
@@ -0,0 +1,115 @@
+import time
+
+from services.codebase_assistant.retrieval import reranker
+from services.codebase_assistant.retrieval.reranker import CrossEncoderReranker
+
+
+print("\n=== TEST 17: CROSS-ENCODER RERANK BUDGET ===\n")
+
+
+class FakeCrossEncoder:
+    """
+    Offline stand-in for the cross-encoder: a pair scores the number of
+    times the chunk mentions "relevant", and every pair costs delay_ms.
+    """
+
+    def __init__(self, name, device=None):
+
+        self.name = name
+        self.delay_ms = 0
+        self.pairs = []
+
+    def predict(self, pairs):
+
+        time.sleep(self.delay_ms * len(pairs) / 1000)
+
+        self.pairs.extend(pairs)
+
+        return [float(chunk.count("relevant")) for _, chunk in pairs]
+
+
+reranker.CrossEncoder = FakeCrossEncoder
+
+
+CHUNKS = [f"chunk {i} " + "relevant " * (i % 5) for i in range(12)]
+
+
+# Step 1: chunks come back by score, cut to top_n
+ranker = CrossEncoderReranker(top_n=4, batch_size=5, budget_ms=1000, max_chars=60)
+
+ranked = ranker.rerank("question", CHUNKS)
+
+print("Ranked:", [chunk.split()[1] for chunk in ranked])
+
+assert len(ranked) == 4
+assert all(chunk.count("relevant") == 4 for chunk in ranked[:2])
+assert ranked[2].count("relevant") == 3
+
+assert ranker.reranked == 1 and ranker.fallbacks == 0
+
+# Every pair scored once
+assert len(ranker.model.pairs) == len(CHUNKS)
+
+# Only the head of a long chunk is scored, the whole chunk returned
+long_chunk = "x" * 100 + " relevant" * 3
+
+ranked = ranker.rerank("question", [CHUNKS[1], long_chunk])
+
+assert ranked == [CHUNKS[1], long_chunk]
+assert ranker.model.pairs[-1][1] == "x" * 60
+
+# Per-call top_n wins over the default
+assert len(ranker.rerank("question", CHUNKS, top_n=2)) == 2
+
+
+# Step 2: nothing to reorder
+assert ranker.rerank("question", CHUNKS[:1]) == CHUNKS[:1]
+assert ranker.rerank("question", []) == []
+
+
+# Step 3: batches are sized from the measured per-pair cost
+ranker = CrossEncoderReranker(top_n=4, batch_size=8, budget_ms=1000)
+
+assert ranker._batch_size(1000) == 4
+
+ranker._observe(4, 100)
+
+assert ranker.pair_ms == 25
+assert ranker._batch_size(60) == 2
+assert ranker._batch_size(0) == 0
+
+# One slow batch moves the estimate only part of the way
+ranker._observe(1, 125)
+
+assert ranker.pair_ms == 0.7 * 25 + 0.3 * 125
+
+
+# Step 4: over budget, retrieval order is kept and still cut to top_n
+ranker = CrossEncoderReranker(top_n=4, batch_size=4, budget_ms=30)
+
+ranker.model.delay_ms = 20
+
+start = time.perf_counter()
+
+ranked = ranker.rerank("question", CHUNKS)
+
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+print(f"Over budget: {elapsed_ms:.0f} ms, kept {len(ranked)}")
+
+assert ranked == CHUNKS[:4]
+assert ranker.fallbacks == 1 and ranker.reranked == 0
+
+# The probe batch blew the budget, so no second batch was started
+assert len(ranker.model.pairs) == 4
+
+
+# Step 5: a known slow model only gets batches that fit the budget
+ranked = ranker.rerank("question", CHUNKS)
+
+assert ranked == CHUNKS[:4]
+assert ranker.fallbacks == 2
+assert len(ranker.model.pairs) <= 4 + 1
+
+
+print("\nTEST 17 PASSED")